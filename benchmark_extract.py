@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark der Extraktion (EpubChapterExtractor.process) auf synthetischen EPUBs.
+
+Jedes Szenario beschreibt die Form eines Buches (siehe synthetic_epub.py).
+Pro Lauf wird in einem frischen Prozess in einen leeren Ordner extrahiert und
+Folgendes gemessen: Laufzeit, maximaler Speicher (Peak RSS) und Kapitel pro
+Sekunde. Die Ergebnisse landen in einer JSON-Datei; mit --compare werden sie
+gegen eine gespeicherte Baseline geprüft.
+
+Beispiele:
+    python benchmark_extract.py -o baseline.json
+    python benchmark_extract.py --parser html.parser --compare baseline.json
+    python benchmark_extract.py --scenario many --scenario giant --jobs 4
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    # Windows: kein Peak RSS
+    resource = None
+
+from synthetic_epub import make_epub
+
+
+# Form der Testbücher (Parameter von SyntheticEpubWriter)
+SCENARIOS = {
+    "small": {"chapters": 10, "chapter_size": 20000},
+    "medium": {"chapters": 500, "chapter_size": 20000},
+    "many": {"chapters": 5000, "chapter_size": 2000},
+    "nested": {"chapters": 200, "chapter_size": 20000, "depth": 25},
+    "images": {"chapters": 200, "chapter_size": 10000, "images": 5},
+    "giant": {"chapters": 10, "chapter_size": 20000, "giant_mb": 50},
+}
+
+# Gemessene Größen, bei denen ein höherer Wert schlechter ist
+COMPARED_METRICS = ("wall_s", "peak_rss_mb")
+DEFAULT_THRESHOLD = 0.10
+
+
+def _peak_rss_mb():
+    """Maximaler Speicher dieses Prozesses und seiner Kindprozesse in MB (None ohne resource)."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux: Kilobytes, macOS: Bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_once(epub_path, output_dir, options, conn):
+    """Läuft in einem eigenen Prozess, damit der Peak RSS nur diese Extraktion misst."""
+    try:
+        from extract_book import EpubChapterExtractor
+        from book_manifest import load_manifest
+
+        start = time.perf_counter()
+        extractor = EpubChapterExtractor(epub_path, output_dir, log_callback=lambda message: None,
+                                         **options)
+        extractor.process()
+        wall = time.perf_counter() - start
+        chapters = len(load_manifest(output_dir)["chapters"])
+        conn.send({"wall_s": wall, "peak_rss_mb": _peak_rss_mb(), "chapters": chapters})
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_scenario(epub_path, options, repeat, work_dir):
+    """
+    Misst eine Extraktion repeat-mal, jeweils in einem neuen Prozess und leeren Ordner.
+
+    Returns:
+        dict: Median von Laufzeit und Peak RSS, Einzelwerte und Kapitel pro Sekunde.
+    """
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for run in range(repeat):
+        output_dir = Path(work_dir) / f"out_{run}"
+        parent_conn, child_conn = context.Pipe(duplex=False)
+        process = context.Process(target=_run_once, args=(str(epub_path), str(output_dir), options, child_conn))
+        process.start()
+        child_conn.close()
+        try:
+            result = parent_conn.recv()
+        except EOFError:
+            result = {"error": f"Prozess beendet mit Code {process.exitcode}"}
+        process.join()
+        shutil.rmtree(output_dir, ignore_errors=True)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        runs.append(result)
+
+    wall = statistics.median(run["wall_s"] for run in runs)
+    rss = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+    chapters = runs[0]["chapters"]
+    return {
+        "wall_s": round(wall, 4),
+        "wall_runs_s": [round(run["wall_s"], 4) for run in runs],
+        "peak_rss_mb": round(statistics.median(rss), 1) if rss else None,
+        "chapters": chapters,
+        "chapters_per_s": round(chapters / wall, 1) if wall > 0 else None,
+        "epub_mb": round(os.path.getsize(epub_path) / (1024 * 1024), 2),
+    }
+
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Vergleicht Ergebnisse mit einer Baseline.
+
+    Args:
+        results (dict): Szenario -> Messwerte (aktueller Lauf).
+        baseline (dict): Szenario -> Messwerte (gespeicherter Lauf).
+        threshold (float): Erlaubte Verschlechterung (0.10 = 10 %).
+
+    Returns:
+        list[str]: Beschreibungen der Regressionen (leer = alles in Ordnung).
+    """
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                regressions.append(f"{scenario}: {metric} {old} -> {new} (+{change:.0%})")
+    return regressions
+
+
+def _format_row(scenario, result, previous=None):
+    row = (f"{scenario:<8} {result['wall_s']:>9.3f} s {result['chapters_per_s'] or 0:>10.1f} Kap/s "
+           f"{result['chapters']:>6} Kap")
+    if result["peak_rss_mb"] is not None:
+        row += f" {result['peak_rss_mb']:>8.1f} MB"
+    if previous and previous.get("wall_s"):
+        row += f"  ({(result['wall_s'] - previous['wall_s']) / previous['wall_s']:+.0%} Zeit)"
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Misst die Extraktion auf synthetischen EPUBs und vergleicht mit einer Baseline."
+    )
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Nur dieses Szenario messen (mehrfach möglich). Standard: alle.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Läufe pro Szenario, gewertet wird der Median (Standard: %(default)s).")
+    parser.add_argument("--backend", default="auto", help="Backend des Extractors (Standard: %(default)s).")
+    parser.add_argument("--parser", default="auto", help="HTML-Konverter (Standard: %(default)s).")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Prozesse für die Konvertierung.")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Ordner für die erzeugten Test-EPUBs (werden wiederverwendet).")
+    parser.add_argument("-o", "--output", default="benchmark_results.json",
+                        help="JSON-Datei für die Ergebnisse (Standard: %(default)s).")
+    parser.add_argument("--compare", default=None, help="Baseline (JSON) zum Vergleich.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Erlaubte Verschlechterung gegenüber der Baseline (Standard: %(default)s).")
+
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    options = {"backend": args.backend, "parser": args.parser, "jobs": args.jobs}
+    cache_dir = Path(args.cache_dir or Path(tempfile.gettempdir()) / "epub_benchmark")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="epub_benchmark_") as work_dir:
+        for scenario in args.scenario or list(SCENARIOS):
+            shape = SCENARIOS[scenario]
+            epub_path = cache_dir / (scenario + "_" + "_".join(f"{k}{v}" for k, v in sorted(shape.items()))
+                                     + ".epub")
+            if not epub_path.exists():
+                print(f"Erzeuge {epub_path.name} ...")
+                make_epub(epub_path, **shape)
+            results[scenario] = dict(run_scenario(epub_path, options, args.repeat, work_dir), shape=shape)
+            print(_format_row(scenario, results[scenario], baseline.get(scenario)))
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": options,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Ergebnisse gespeichert: {args.output}")
+
+    if args.compare:
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print("\nREGRESSION gegenüber der Baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("Keine Regression gegenüber der Baseline.")
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
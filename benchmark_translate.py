@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark der Übersetzungs-Reihenfolge (--schedule) ohne echte API.
+
+Ein synthetisches Buch mit gemischten Kapitelgrößen wird extrahiert und dann
+mit jeder Strategie übersetzt. Statt der API wartet jede Anfrage eine
+simulierte Latenz (Grundlatenz + Tokens / Durchsatz), wie sie ein
+LLM-Endpunkt ungefähr zeigt. Gemessen werden die Gesamtdauer (Makespan),
+die Zeit bis zur ersten fertigen Datei und bis zur Hälfte der Dateien.
+
+Beispiel:
+    python benchmark_translate.py --chapters 60 --size-sigma 1.2 --workers 8
+"""
+
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+from synthetic_epub import make_epub
+from extract_book import EpubChapterExtractor
+from translate_book import KimiTranslator, SCHEDULES, ENGINES
+from token_estimate import estimate_tokens
+
+
+class SimulatedTranslator(KimiTranslator):
+    """KimiTranslator, dessen Anfragen nur eine modellierte Latenz abwarten."""
+
+    def __init__(self, *args, base_latency=0.05, tokens_per_second=4000, **kwargs):
+        super().__init__(*args, api_key="benchmark", **kwargs)
+        self.base_latency = base_latency
+        self.tokens_per_second = tokens_per_second
+
+    def _latency(self, text_chunk):
+        return self.base_latency + estimate_tokens(text_chunk) / self.tokens_per_second
+
+    def _translate_chunk(self, text_chunk, system_prompt=None, endpoint=None):
+        time.sleep(self._latency(text_chunk))
+        return text_chunk
+
+    async def _translate_chunk_async(self, text_chunk, system_prompt=None, endpoint=None):
+        await asyncio.sleep(self._latency(text_chunk))
+        return text_chunk
+
+
+def run_policy(source_dir, work_dir, schedule, options):
+    """
+    Übersetzt eine frische Kopie der Extraktion mit einer Strategie.
+
+    Returns:
+        dict: Makespan und Zeitpunkte der ersten bzw. halben fertigen Dateien (Sekunden).
+    """
+    target = Path(work_dir) / schedule
+    shutil.rmtree(target, ignore_errors=True)
+    shutil.copytree(source_dir, target)
+
+    finished = []
+    start = time.perf_counter()
+
+    def progress(current, total):
+        finished.append(time.perf_counter() - start)
+
+    translator = SimulatedTranslator(target, schedule=schedule, log_callback=lambda message: None,
+                                     progress_callback=progress, **options)
+    translator.process_files()
+    return {
+        "makespan_s": round(translator.makespan, 3),
+        "first_file_s": round(finished[0], 3) if finished else None,
+        "half_files_s": round(finished[(len(finished) - 1) // 2], 3) if finished else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Vergleicht die Scheduling-Strategien des Übersetzers mit simulierter API-Latenz."
+    )
+    parser.add_argument("--chapters", type=int, default=60, help="Anzahl Kapitel (Standard: %(default)s).")
+    parser.add_argument("--chapter-size", type=int, default=15000,
+                        help="Mittlere Kapitelgröße in Zeichen (Standard: %(default)s).")
+    parser.add_argument("--size-sigma", type=float, default=1.2,
+                        help="Streuung der Kapitelgrößen (Standard: %(default)s).")
+    parser.add_argument("--giant-mb", type=float, default=0.3,
+                        help="Zusätzliches großes Kapitel in MB (Standard: %(default)s).")
+    parser.add_argument("--workers", type=int, default=8, help="Gleichzeitige Anfragen (Standard: %(default)s).")
+    parser.add_argument("--engine", choices=ENGINES, default="async")
+    parser.add_argument("--size-unit", choices=("tokens", "bytes"), default="tokens")
+    parser.add_argument("--base-latency", type=float, default=0.05,
+                        help="Simulierte Grundlatenz je Anfrage in Sekunden (Standard: %(default)s).")
+    parser.add_argument("--tokens-per-second", type=float, default=4000,
+                        help="Simulierter Durchsatz je Anfrage (Standard: %(default)s).")
+    parser.add_argument("-o", "--output", default=None, help="Optional: Ergebnisse als JSON speichern.")
+
+    args = parser.parse_args()
+
+    options = {"max_workers": args.workers, "engine": args.engine, "size_unit": args.size_unit,
+               "base_latency": args.base_latency, "tokens_per_second": args.tokens_per_second}
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="translate_benchmark_") as work_dir:
+        epub_path = Path(work_dir) / "buch.epub"
+        make_epub(epub_path, chapters=args.chapters, chapter_size=args.chapter_size,
+                  size_sigma=args.size_sigma, giant_mb=args.giant_mb)
+        source_dir = Path(work_dir) / "extrahiert"
+        EpubChapterExtractor(epub_path, source_dir, log_callback=lambda message: None).process()
+
+        print(f"{'Strategie':<10} {'Makespan':>10} {'1. Datei':>10} {'50 % Dateien':>13}")
+        for schedule in SCHEDULES:
+            results[schedule] = run_policy(source_dir, work_dir, schedule, options)
+            result = results[schedule]
+            print(f"{schedule:<10} {result['makespan_s']:>9.2f}s {result['first_file_s']:>9.2f}s "
+                  f"{result['half_files_s']:>12.2f}s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Ein Fehler ist aufgetreten: {e}")
+        sys.exit(1)
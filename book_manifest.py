@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Manifest einer Extraktion.
+
+Der Extractor schreibt ``manifest.json`` in den Ausgabeordner. Es enthält die
+Kapitel in Lesereihenfolge (Spine) mit Quelldokument, Titel, Dateiname,
+Größe und Inhalts-Hash. Übersetzer und Merger lesen die Kapitelliste von
+hier, statt den Ordner zu durchsuchen und die Reihenfolge aus den
+Dateinamen zu raten.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+TRANSLATION_SUFFIX = "_DE.txt"
+FAILURE_SUFFIX = "_FAILURE_DE.txt"
+SEGMENTS_SUFFIX = ".segments.jsonl"
+# Journal der übersetzten Teilstücke eines Kapitels (nur bis die Übersetzung fertig ist)
+JOURNAL_SUFFIX = ".chunks.jsonl"
+# Bisher empfangener Text eines gestreamten Teilstücks (nur bis es fertig ist)
+PARTIAL_SUFFIX = ".partial"
+
+
+def content_hash(text):
+    """SHA-256 (hex) des UTF-8-kodierten Textes."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TextStats:
+    """
+    Größe und Hash eines Textes. Kann schrittweise befüllt werden, wenn der Text
+    nie vollständig im Speicher liegt (gestreamte Extraktion).
+    """
+
+    __slots__ = ("bytes", "chars", "_sha256")
+
+    def __init__(self, text=""):
+        self.bytes = 0
+        self.chars = 0
+        self._sha256 = hashlib.sha256()
+        if text:
+            self.update(text)
+
+    def update(self, text):
+        data = text.encode("utf-8")
+        self.bytes += len(data)
+        self.chars += len(text)
+        self._sha256.update(data)
+
+    @property
+    def sha256(self):
+        return self._sha256.hexdigest()
+
+
+def chapter_entry(spine_index, href, title, file_name, stats, source_fingerprint=None,
+                  removed=None, segments=None):
+    """
+    Erzeugt einen Manifest-Eintrag für ein extrahiertes Kapitel.
+
+    Args:
+        spine_index (int): Position in der Lesereihenfolge.
+        href (str): Pfad des Quelldokuments im EPUB.
+        title (str): Gefundener Kapiteltitel (oder None).
+        file_name (str): Name der Textdatei im Ausgabeordner.
+        stats (TextStats): Größe und Hash des extrahierten Textes.
+        source_fingerprint (str, optional): Kennung des Quelldokuments, um es bei
+                                            erneuter Extraktion wiederzuerkennen.
+        removed (tuple, optional): (Zeichen, Bytes), die bei der Bereinigung entfernt wurden.
+        segments (int, optional): Anzahl der Absätze (Segmente) des Kapitels.
+
+    Returns:
+        dict: Der Eintrag.
+    """
+    removed_chars, removed_bytes = removed or (0, 0)
+    return {
+        "spine_index": spine_index,
+        "href": href,
+        "title": title,
+        "file": file_name,
+        "bytes": stats.bytes,
+        "chars": stats.chars,
+        "sha256": stats.sha256,
+        "source_fingerprint": source_fingerprint,
+        "removed_chars": removed_chars,
+        "removed_bytes": removed_bytes,
+        "segments": segments,
+    }
+
+
+def translation_name(file_name):
+    """'Kapitel.txt' -> 'Kapitel_DE.txt'"""
+    return f"{Path(file_name).stem}{TRANSLATION_SUFFIX}"
+
+
+def failure_name(file_name):
+    """'Kapitel.txt' -> 'Kapitel_FAILURE_DE.txt'"""
+    return f"{Path(file_name).stem}{FAILURE_SUFFIX}"
+
+
+def segments_name(file_name):
+    """'Kapitel.txt' -> 'Kapitel.segments.jsonl'"""
+    return f"{Path(file_name).stem}{SEGMENTS_SUFFIX}"
+
+
+def journal_name(file_name):
+    """'Kapitel.txt' -> 'Kapitel.chunks.jsonl'"""
+    return f"{Path(file_name).stem}{JOURNAL_SUFFIX}"
+
+
+def partial_name(file_name, chunk_index):
+    """'Kapitel.txt', 3 -> 'Kapitel.0003.partial'"""
+    return f"{Path(file_name).stem}.{chunk_index:04d}{PARTIAL_SUFFIX}"
+
+
+def load_manifest(directory):
+    """
+    Lädt das Manifest eines Ausgabeordners.
+
+    Args:
+        directory (str): Der Ausgabeordner der Extraktion.
+
+    Returns:
+        dict: Das Manifest oder None, wenn keines existiert (z.B. ältere Extraktion).
+    """
+    path = Path(directory) / MANIFEST_NAME
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if not isinstance(manifest.get("chapters"), list):
+        raise ValueError(f"Ungültiges Manifest: {path}")
+    return manifest
+
+
+def save_manifest(directory, chapters, source=None, extraction=None):
+    """
+    Schreibt das Manifest atomar (erst in eine temporäre Datei, dann umbenennen).
+
+    Args:
+        directory (str): Der Ausgabeordner.
+        chapters (list[dict]): Einträge aus chapter_entry(), in Lesereihenfolge.
+        source (str, optional): Name der EPUB-Datei.
+        extraction (dict, optional): Einstellungen, die den extrahierten Text beeinflussen.
+
+    Returns:
+        Path: Pfad des geschriebenen Manifests.
+    """
+    path = Path(directory) / MANIFEST_NAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "source": source,
+        "extraction": extraction or {},
+        "chapters": chapters,
+    }
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+    return path
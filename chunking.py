@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Zerlegung der Kapiteltexte in Teilstücke für die API.
+
+Jedes Teilstück bleibt unter einem Tokenbudget. Getrennt wird möglichst an
+Absätzen, erst wenn ein Absatz allein zu groß ist an Zeilen, dann an
+Satzenden, dann an Wörtern; nur ein einzelnes übergroßes "Wort" (etwa eine
+lange URL) wird hart geteilt. Die Teilstücke ergeben aneinandergehängt
+wieder genau den Text, der Leerraum an den Schnittstellen bleibt am Ende
+des vorderen Teilstücks.
+
+Das Budget richtet sich nach dem Modell: Systemprompt, Teilstück und
+Übersetzung müssen zusammen in sein Kontextfenster passen. Für Modelle, die
+MODEL_CONTEXT_TOKENS nicht (oder anders) kennt, lässt sich das Fenster
+angeben (--context-tokens MODELL=TOKENS, siehe parse_context_tokens).
+"""
+
+import re
+
+from token_estimate import estimate_tokens
+
+DEFAULT_CHUNK_TOKENS = 1500
+
+# Kontextfenster bekannter Modelle in Tokens; der längste passende Präfix gilt
+MODEL_CONTEXT_TOKENS = {
+    "moonshot-v1-8k": 8192,
+    "moonshot-v1-32k": 32768,
+    "moonshot-v1-128k": 131072,
+    "kimi-k2": 131072,
+    "gpt-3.5-turbo": 16385,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "deepseek-chat": 65536,
+}
+# Die Übersetzung ist oft länger als das Original (z.B. Englisch -> Deutsch)
+OUTPUT_RATIO = 1.5
+# Reserve für die Verpackung der Nachrichten
+_CONTEXT_MARGIN = 256
+
+# Trennstellen vom gröbsten zum feinsten; getrennt wird hinter dem Treffer
+_BOUNDARIES = (
+    re.compile(r"\n[ \t]*\n\s*"),                              # Absatz (Leerzeile)
+    re.compile(r"\n\s*"),                                      # Zeile
+    re.compile(r"[.!?…][\"'»«“”‘’)\]]*\s+|[。！？][」』）]*"),   # Satzende
+    re.compile(r"\s+"),                                        # Wort
+)
+
+
+def context_tokens(model_name, overrides=None):
+    """
+    Kontextfenster des Modells in Tokens oder None, wenn unbekannt.
+
+    Args:
+        model_name (str): Modellname.
+        overrides (dict, optional): Präfix -> Tokens; ergänzt bzw. ersetzt
+                                    Einträge aus MODEL_CONTEXT_TOKENS.
+    """
+    known = dict(MODEL_CONTEXT_TOKENS, **(overrides or {}))
+    matches = [prefix for prefix in known if model_name.startswith(prefix)]
+    if not matches:
+        return None
+    return known[max(matches, key=len)]
+
+
+def parse_context_tokens(values):
+    """
+    Liest Kontextfenster in der Form "MODELL=TOKENS" (z.B. von der Kommandozeile).
+
+    Args:
+        values (iterable): Einträge wie "llama-3-70b=8192".
+
+    Returns:
+        dict: Modell(-präfix) -> Tokens.
+    """
+    overrides = {}
+    for value in values or []:
+        model, sep, tokens = value.partition("=")
+        try:
+            tokens = int(tokens)
+        except ValueError:
+            tokens = 0
+        if not sep or not model.strip() or tokens <= 0:
+            raise ValueError(f"Ungültiges Kontextfenster: {value!r} (erwartet MODELL=TOKENS)")
+        overrides[model.strip()] = tokens
+    return overrides
+
+
+def chunk_budget(model_name, prompt_tokens, requested=None, overrides=None):
+    """
+    Tokenbudget eines Teilstücks.
+
+    Args:
+        model_name (str): Modellname (für das Kontextfenster).
+        prompt_tokens (int): Tokens des Systemprompts.
+        requested (int, optional): Gewünschtes Budget (Standard: DEFAULT_CHUNK_TOKENS).
+        overrides (dict, optional): Eigene Kontextfenster (siehe context_tokens).
+
+    Returns:
+        int: requested, höchstens so viel, dass Systemprompt, Teilstück und
+             Übersetzung in das Kontextfenster eines bekannten Modells passen.
+    """
+    budget = requested or DEFAULT_CHUNK_TOKENS
+    context = context_tokens(model_name, overrides)
+    if context is not None:
+        budget = min(budget, int((context - prompt_tokens - _CONTEXT_MARGIN) / (1 + OUTPUT_RATIO)))
+    return max(budget, 1)
+
+
+def _split_after(text, pattern):
+    """Teilt text hinter jedem Treffer von pattern; die Teile ergeben wieder text."""
+    parts = []
+    start = 0
+    for match in pattern.finditer(text):
+        if match.end() > start:
+            parts.append(text[start:match.end()])
+            start = match.end()
+    if start < len(text):
+        parts.append(text[start:])
+    return parts
+
+
+def _pieces(text, budget, count_tokens, level=0):
+    """Zerlegt text rekursiv in Stücke, die einzeln ins Budget passen."""
+    tokens = count_tokens(text)
+    if tokens <= budget:
+        yield text, tokens
+        return
+    if level == len(_BOUNDARIES):
+        # Kein Leerraum mehr: nach Zeichen teilen
+        size = max(1, len(text) * budget // tokens)
+        for start in range(0, len(text), size):
+            yield from _pieces(text[start:start + size], budget, count_tokens, level)
+        return
+    parts = _split_after(text, _BOUNDARIES[level])
+    if len(parts) == 1:
+        yield from _pieces(text, budget, count_tokens, level + 1)
+        return
+    for part in parts:
+        yield from _pieces(part, budget, count_tokens, level + 1)
+
+
+def split_into_chunks(text, budget, count_tokens=estimate_tokens):
+    """
+    Zerlegt einen Text in Teilstücke von höchstens budget Tokens.
+
+    Args:
+        text (str): Der Text.
+        budget (int): Tokenbudget je Teilstück.
+        count_tokens (callable): Zählt die Tokens eines Textes (siehe token_estimate.token_counter).
+
+    Returns:
+        list: Teilstücke mit Text; "".join(...) ergibt wieder text. Reiner
+              Leerraum bildet kein eigenes Teilstück (das wäre eine leere
+              Anfrage), sondern hängt am benachbarten, auch über das Budget.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    has_text = False
+    if not text:
+        return chunks
+    for piece, tokens in _pieces(text, budget, count_tokens):
+        blank = not piece.strip()
+        if has_text and not blank and current_tokens + tokens > budget:
+            chunks.append("".join(current))
+            current = []
+            current_tokens = 0
+            has_text = False
+        current.append(piece)
+        current_tokens += tokens
+        has_text = has_text or not blank
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def trailing_whitespace(text):
+    """Leerraum am Ende eines Teilstücks (die Trennstelle zum nächsten)."""
+    return text[len(text.rstrip()):]
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Adaptive Parallelität für die Übersetzung (AIMD, wie die TCP-Staukontrolle).
+
+Solange alle Anfragen gelingen und die Latenz stabil bleibt, wächst die Zahl
+gleichzeitiger Anfragen um eins pro "Runde" (so viele Erfolge wie gerade
+Anfragen erlaubt sind). Bei Überlast (HTTP 429, 5xx, Timeout) oder einem
+Latenzsprung wird sie multiplikativ verkleinert, nie unter die Untergrenze
+und nie über die Obergrenze.
+"""
+
+import threading
+
+
+class AimdController:
+    """
+    Bestimmt die erlaubte Zahl gleichzeitiger Anfragen (limit).
+
+    Verwendung:
+        token = controller.started()
+        ... Anfrage ...
+        controller.succeeded(token, latency, size)   # oder controller.overloaded(token, "429")
+
+    Das Token verhindert, dass eine Welle von Fehlern, die alle vor der letzten
+    Absenkung losgeschickt wurden, die Parallelität mehrfach halbiert.
+
+    Attribute:
+        limit (int): Aktuell erlaubte Anzahl gleichzeitiger Anfragen.
+        floor (int): Untergrenze.
+        ceiling (int): Obergrenze.
+    """
+
+    def __init__(self, floor=1, ceiling=50, start=None, decrease_factor=0.5, spike_factor=2.0,
+                 spike_count=3, min_size=1000, on_change=None):
+        """
+        Args:
+            floor (int): Untergrenze der Parallelität.
+            ceiling (int): Obergrenze der Parallelität.
+            start (int, optional): Startwert (Standard: floor).
+            decrease_factor (float): Faktor bei Überlast (0.5 = halbieren).
+            spike_factor (float): Ein Erfolg gilt als Latenzsprung, wenn seine Latenz je
+                                  Zeichen diesen Faktor über dem gleitenden Mittel liegt.
+            spike_count (int): So viele langsame Anfragen in Folge gelten als Latenzsprung.
+            min_size (int): Kleinere Anfragen zählen wie diese Größe (ihre Latenz ist
+                            vor allem Grundlatenz und sonst kein Latenzsprung).
+            on_change (func, optional): Funktion(alt, neu, grund), wenn sich limit ändert.
+        """
+        if floor < 1 or ceiling < floor:
+            raise ValueError(f"Ungültige Grenzen für die Parallelität: {floor}..{ceiling}")
+        self.floor = floor
+        self.ceiling = ceiling
+        self.limit = min(max(start or floor, floor), ceiling)
+        self.decrease_factor = decrease_factor
+        self.spike_factor = spike_factor
+        self.spike_count = spike_count
+        self.min_size = min_size
+        self.on_change = on_change
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._successes = 0
+        self._samples = 0
+        self._slow = 0           # Langsame Anfragen in Folge
+        self._baseline = None    # Gleitendes Mittel der Latenz je Zeichen
+
+    def started(self):
+        """Vor dem Senden einer Anfrage aufrufen. Liefert das Token für das Ergebnis."""
+        return self._generation
+
+    def succeeded(self, token, latency, size=1):
+        """
+        Meldet eine erfolgreiche Anfrage.
+
+        Args:
+            token: Rückgabe von started().
+            latency (float): Dauer der Anfrage in Sekunden.
+            size (int): Größe der Anfrage (Zeichen), um die Latenz zu normieren.
+        """
+        change = None
+        with self._lock:
+            per_char = latency / max(size, self.min_size)
+            slow = self._samples >= 10 and per_char > self.spike_factor * self._baseline
+            self._slow = self._slow + 1 if slow else 0
+            # Das Mittel folgt auch langsamen Anfragen, damit eine dauerhaft
+            # langsamere API nicht ewig als Latenzsprung gilt
+            self._samples += 1
+            if self._baseline is None:
+                self._baseline = per_char
+            else:
+                self._baseline += 0.1 * (per_char - self._baseline)
+
+            if self._slow >= self.spike_count:
+                # Mehrere langsame Anfragen in Folge, nicht nur ein Ausreißer
+                self._slow = 0
+                change = self._decrease(token, "Latenzsprung")
+            elif not slow:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.ceiling:
+                    self._successes = 0
+                    change = (self.limit, self.limit + 1, "stabil")
+                    self.limit += 1
+        self._notify(change)
+
+    def overloaded(self, token, reason):
+        """Meldet eine abgelehnte oder abgebrochene Anfrage (429, 5xx, Timeout)."""
+        with self._lock:
+            change = self._decrease(token, reason)
+        self._notify(change)
+
+    def _decrease(self, token, reason):
+        if token != self._generation:
+            # Anfrage lief schon vor der letzten Absenkung
+            return None
+        self._generation += 1
+        self._successes = 0
+        old = self.limit
+        self.limit = max(self.floor, int(self.limit * self.decrease_factor))
+        return (old, self.limit, reason) if self.limit != old else None
+
+    def _notify(self, change):
+        if change and self.on_change:
+            self.on_change(*change)
@@ -16,6 +16,9 @@ except ImportError:
     print("Bitte installiere sie mit: pip install odfpy")
     sys.exit(1)
 
+from book_manifest import translation_name, TRANSLATION_SUFFIX
+from workspace import open_workspace
+
 
 class OdtMerger:
     """
@@ -28,7 +31,7 @@ class OdtMerger:
         Initialisiert den Merger.
 
         Args:
-            input_dir (str): Verzeichnis mit den .txt Dateien.
+            input_dir (str): Verzeichnis mit den .txt Dateien oder Workspace-Datei (.sqlite).
             output_file (str): Pfad zur Ausgabedatei (.odt).
         """
         self.input_dir = Path(input_dir)
@@ -36,7 +39,8 @@ class OdtMerger:
         self.log_callback = log_callback
         self.progress_callback = progress_callback
 
-        if not self.input_dir.exists():
+        self.workspace = open_workspace(self.input_dir)
+        if not self.workspace.exists():
             raise FileNotFoundError(f"Verzeichnis nicht gefunden: {self.input_dir}")
 
         # Das ODT-Dokument erstellen
@@ -73,42 +77,69 @@ class OdtMerger:
         self.para_style.addElement(ParagraphProperties(marginbottom="0.2cm"))
         self.doc.automaticstyles.addElement(self.para_style)
 
-    def _natural_sort_key(self, path):
+    def _natural_sort_key(self, name):
         """
         Hilfsfunktion für natürliche Sortierung (z.B. damit 'Kapitel 2' vor 'Kapitel 10' kommt).
         Zerlegt den Dateinamen in Text- und Zahlenblöcke.
         """
         return [int(text) if text.isdigit() else text.lower()
-                for text in re.split(r'(\d+)', path.name)]
+                for text in re.split(r'(\d+)', name)]
 
-    def process(self):
+    def _discover_chapters(self):
         """
-        Liest die Dateien, fügt sie hinzu und speichert das ODT.
+        Liefert die übersetzten Kapitel als Liste von (Dateiname, Titel).
+
+        Mit Manifest in exakter Lesereihenfolge (Spine). Ohne Manifest (ältere
+        Extraktionen) werden die '_DE.txt' Dateien gesucht und natürlich sortiert.
         """
+        manifest = self.workspace.load_manifest()
+        if manifest is not None:
+            return [
+                (translation_name(chapter["file"]), chapter.get("title"))
+                for chapter in manifest["chapters"]
+            ]
+
         # Suche nur nach den erfolgreich übersetzten deutschen Dateien
-        files = list(self.input_dir.glob("*_DE.txt"))
+        files = [name for name in self.workspace.names() if name.endswith(TRANSLATION_SUFFIX)]
 
         # Sortiere natürlich (wichtig bei Kapitel 1, 2, 10...)
         files.sort(key=self._natural_sort_key)
+        return [(f, None) for f in files]
+
+    def process(self):
+        """
+        Liest die Dateien, fügt sie hinzu und speichert das ODT.
+        """
+        try:
+            self._merge()
+        finally:
+            self.workspace.close()
+
+    def _merge(self):
+        chapters = self._discover_chapters()
 
-        if not files:
+        if not chapters:
             self._log("Keine Dateien mit der Endung '_DE.txt' gefunden.")
             return
 
-        total_files = len(files)
+        total_files = len(chapters)
         self._log(f"Füge {total_files} Dateien zusammen...")
 
-        for index, file_path in enumerate(files):
-            self._log(f" -> Verarbeite: {file_path.name}")
-            
+        for index, (file_name, chapter_title) in enumerate(chapters):
             if self.progress_callback:
                 self.progress_callback(index + 1, total_files)
 
-            # Titel aus dem Dateinamen ableiten (ohne _DE.txt)
-            chapter_title = file_path.name.replace("_DE.txt", "").replace("_", " ")
+            try:
+                content = self.workspace.read_text(file_name)
+            except FileNotFoundError:
+                self._log(f" -> Fehlt (nicht übersetzt): {file_name}")
+                continue
+
+            self._log(f" -> Verarbeite: {file_name}")
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if not chapter_title:
+                # Titel aus dem Dateinamen ableiten (ohne _DE.txt)
+                chapter_title = file_name.replace(TRANSLATION_SUFFIX, "").replace("_", " ")
 
             # Füge die Kapitelüberschrift hinzu
             # Beim allerersten Kapitel brauchen wir vielleicht keinen Seitenumbruch,
@@ -136,7 +167,8 @@ class OdtMerger:
 
 def main():
     parser = argparse.ArgumentParser(description="Fügt Textdateien zu einem ODT-Dokument zusammen.")
-    parser.add_argument("ordner", help="Pfad zum Ordner mit den '_DE.txt' Dateien.")
+    parser.add_argument("ordner", help="Pfad zum Ordner mit den '_DE.txt' Dateien "
+                                       "oder zur Workspace-Datei (.sqlite).")
     parser.add_argument("-o", "--output", help="Name der Ausgabedatei.", default="Mein_Uebersetztes_Buch.odt")
 
     args = parser.parse_args()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Wiederholte Absätze eines Buches finden (Deduplizierung vor der Übersetzung).
+
+Viele Bücher wiederholen Text wörtlich: Epigraphe, wiederkehrende Hinweise,
+Inhaltsverzeichnisse in Navigation und Text. Solche Absätze werden als
+eigenes Teilstück einmal übersetzt und an jeder Stelle eingesetzt.
+
+Verglichen wird der normalisierte Absatz (Leerraum innerhalb der Zeilen
+zusammengefasst, leere Zeilen entfernt). Sehr kurze Absätze werden nicht
+herausgelöst: Jede Wiederholung teilt ihr Teilstück, und eine zusätzliche
+Anfrage kostet mehr, als ein paar Wörter einsparen. Die Grenze liegt so,
+dass Epigraphe und wiederkehrende Hinweise noch erfasst werden; für
+Trennzeilen wie "* * *" lässt sie sich senken (--dedup-min-chars).
+"""
+
+from collections import Counter
+
+from book_manifest import content_hash
+from segments import split_segments
+
+# Mindestlänge eines Absatzes (normalisiert, Zeichen), damit er herausgelöst wird
+DEDUP_MIN_CHARS = 40
+
+
+def normalize_paragraph(paragraph):
+    """Fasst Leerraum innerhalb der Zeilen zusammen und entfernt leere Zeilen."""
+    lines = (" ".join(line.split()) for line in paragraph.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def paragraph_key(paragraph):
+    """Schlüssel eines Absatzes für den Vergleich (SHA-256 des normalisierten Textes)."""
+    return content_hash(normalize_paragraph(paragraph))
+
+
+class RepeatedParagraphs:
+    """
+    Zählt die Absätze aller Kapitel und liefert die wiederholten.
+
+    Attribute:
+        min_chars (int): Mindestlänge eines wiederholten Absatzes.
+        keys (set): Schlüssel der wiederholten Absätze (nach find()).
+        occurrences (int): Vorkommen der wiederholten Absätze insgesamt.
+        repeated_chars (int): Zeichen, die durch die Wiederholungen eingespart werden können.
+        total_chars (int): Zeichen aller Absätze.
+    """
+
+    def __init__(self, min_chars=DEDUP_MIN_CHARS):
+        self.min_chars = min_chars
+        self._counts = Counter()
+        self._lengths = {}
+        self.keys = set()
+        self.occurrences = 0
+        self.repeated_chars = 0
+        self.total_chars = 0
+
+    def add_text(self, text):
+        """Zählt die Absätze eines Kapiteltextes."""
+        for paragraph in split_segments(text):
+            normalized = normalize_paragraph(paragraph)
+            self.total_chars += len(normalized)
+            if len(normalized) < self.min_chars:
+                continue
+            key = content_hash(normalized)
+            self._counts[key] += 1
+            self._lengths[key] = len(normalized)
+
+    def find(self):
+        """
+        Bestimmt die wiederholten Absätze.
+
+        Returns:
+            set: Schlüssel (paragraph_key) der Absätze, die mehr als einmal vorkommen.
+        """
+        self.keys = {key for key, count in self._counts.items() if count > 1}
+        self.occurrences = sum(self._counts[key] for key in self.keys)
+        self.repeated_chars = sum((self._counts[key] - 1) * self._lengths[key] for key in self.keys)
+        # Die Zählung wird nicht mehr gebraucht
+        self._counts.clear()
+        self._lengths.clear()
+        return self.keys
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mehrere API-Endpunkte bzw. API-Keys gemeinsam nutzen (Pool).
+
+Ein einzelner Zugang begrenzt den Durchsatz auf sein Kontingent. Der Pool
+verteilt die Anfragen auf mehrere Einträge (Base URL, API-Key, Modell,
+Gewicht, maximale Parallelität, optional eigene Kontingente). Jede Anfrage
+geht an den Endpunkt mit den wenigsten offenen Anfragen im Verhältnis zu
+seinem Gewicht (least outstanding requests).
+
+Ein Endpunkt, der mehrmals hintereinander versagt (Verbindung, Timeout,
+429, 5xx, ungültiger Key), wird gesperrt und bekommt keine neuen Anfragen.
+Nach einer Wartezeit erhält er eine einzelne Probe-Anfrage: Gelingt sie,
+ist er wieder dabei, sonst verdoppelt sich die Wartezeit. Der letzte
+gesunde Endpunkt wird nie gesperrt; fällt alles aus, greifen die normalen
+Wiederholungen.
+
+Die Einträge stehen in einer JSON-Liste; fehlende Felder kommen von der
+Kommandozeile (--base_url, --api_key, --model):
+
+    [
+      {"api_key": "sk-...", "weight": 2, "max_concurrency": 20},
+      {"api_key": "sk-...", "rpm": 200},
+      {"base_url": "https://api.example.com/v1", "api_key": "...", "model": "kimi-k2.5"}
+    ]
+"""
+
+import json
+import time
+import threading
+from urllib.parse import urlparse
+
+from rate_limit import RateLimiter
+
+# So viele Fehler hintereinander sperren einen Endpunkt
+DRAIN_AFTER = 3
+# Wartezeit bis zur ersten Probe in Sekunden; verdoppelt sich bis PROBE_MAX
+PROBE_AFTER = 30.0
+PROBE_MAX = 600.0
+# Wartezeit, wenn gerade kein Endpunkt frei ist
+POLL_INTERVAL = 0.05
+
+
+class Endpoint:
+    """
+    Ein Eintrag des Pools.
+
+    Attribute:
+        base_url (str), api_key (str), model (str): Der Zugang.
+        weight (float): Anteil an der Last im Verhältnis zu den anderen.
+        max_concurrency (int): Höchstens so viele offene Anfragen (None = unbegrenzt).
+        rate_limiter (RateLimiter): Eigene Kontingente (rpm/tpm) oder None.
+        client, async_client: Die API-Clients (vom Übersetzer gesetzt).
+    """
+
+    def __init__(self, base_url, api_key, model, weight=1.0, max_concurrency=None, rpm=None, tpm=None,
+                 name=None):
+        if weight <= 0:
+            raise ValueError(f"Gewicht muss positiv sein: {weight}")
+        self.base_url = base_url
+        self.api_key = api_key
+        self.model = model
+        self.weight = weight
+        self.max_concurrency = max_concurrency or None
+        self.rate_limiter = RateLimiter(rpm, tpm) if rpm or tpm else None
+        self.name = name or f"{urlparse(base_url).netloc or base_url} {model} (Key …{api_key[-4:]})"
+        self.client = None
+        self.async_client = None
+        # Zustand, geschützt durch das Lock des Pools
+        self.outstanding = 0
+        self.waiting = 0           # Anfragen, die auf sein Kontingent warten
+        self.failures = 0          # Fehler hintereinander
+        self.drained = False
+        self.probing = False
+        self.probe_at = 0.0
+        self.probe_after = PROBE_AFTER
+        self.requests = 0
+        self.errors = 0
+
+    def __str__(self):
+        return self.name
+
+    def describe(self):
+        parts = [f"Gewicht {self.weight:g}"]
+        if self.max_concurrency:
+            parts.append(f"max. {self.max_concurrency} gleichzeitig")
+        if self.rate_limiter:
+            parts.append(self.rate_limiter.describe())
+        return f"{self.name} ({', '.join(parts)})"
+
+
+class EndpointPool:
+    """Verteilt Anfragen auf Endpunkte und überwacht ihren Zustand (thread-sicher)."""
+
+    def __init__(self, endpoints, drain_after=DRAIN_AFTER, on_change=None):
+        """
+        Args:
+            endpoints (list): Endpoint-Objekte (mindestens eins).
+            drain_after (int): Fehler hintereinander, nach denen gesperrt wird.
+            on_change (callable, optional): Funktion(Meldung) bei Sperre und Wiederaufnahme.
+        """
+        if not endpoints:
+            raise ValueError("Der Pool braucht mindestens einen Endpunkt.")
+        self.endpoints = list(endpoints)
+        self.drain_after = drain_after
+        self.on_change = on_change
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def acquire(self, reserved=None):
+        """
+        Wählt den Endpunkt für die nächste Anfrage und zählt sie als offen.
+
+        Args:
+            reserved (Endpoint, optional): Endpunkt aus give_back(), auf dessen
+                Kontingent gewartet wurde; er wird genommen, sobald er frei ist.
+                Ist er inzwischen gesperrt, wird normal gewählt.
+
+        Returns:
+            Endpoint: Der Endpunkt oder None, wenn gerade keiner frei ist
+                      (der Aufrufer wartet POLL_INTERVAL und fragt erneut).
+        """
+        with self._lock:
+            if reserved is not None and not reserved.drained:
+                if not self._has_capacity(reserved):
+                    return None
+                endpoint = reserved
+            else:
+                endpoint = self._choose()
+                if endpoint is None:
+                    return None
+            if reserved is not None:
+                reserved.waiting -= 1
+            return self._take(endpoint)
+
+    def _choose(self):
+        now = time.monotonic()
+        # Gesperrte Endpunkte bekommen nach ihrer Wartezeit eine einzelne Probe
+        for endpoint in self.endpoints:
+            if endpoint.drained and not endpoint.probing and now >= endpoint.probe_at:
+                endpoint.probing = True
+                return endpoint
+        candidates = [endpoint for endpoint in self.endpoints
+                      if not endpoint.drained and self._has_capacity(endpoint)]
+        if not candidates:
+            return None
+        # Wer auf das Kontingent eines Endpunkts wartet, zählt bei der Wahl mit
+        return min(candidates, key=lambda endpoint: (endpoint.outstanding + endpoint.waiting + 1) / endpoint.weight)
+
+    @staticmethod
+    def _has_capacity(endpoint):
+        return endpoint.max_concurrency is None or endpoint.outstanding < endpoint.max_concurrency
+
+    @staticmethod
+    def _take(endpoint):
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        return endpoint
+
+    def give_back(self, endpoint):
+        """
+        Gibt einen Endpunkt aus acquire() ungenutzt zurück, um auf sein
+        Kontingent zu warten; danach mit acquire(reserved=endpoint) wieder nehmen.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.requests -= 1
+            endpoint.waiting += 1
+            # Eine nicht gesendete Probe wird bei nächster Gelegenheit nachgeholt
+            endpoint.probing = False
+
+    def cancel_wait(self, endpoint):
+        """Die Anfrage aus give_back() wird nicht mehr gesendet (z.B. Abbruch)."""
+        with self._lock:
+            endpoint.waiting -= 1
+
+    def release(self, endpoint, fault=None, completed=True):
+        """
+        Meldet das Ende einer Anfrage.
+
+        Args:
+            endpoint (Endpoint): Der Endpunkt aus acquire().
+            fault (str, optional): Kurzer Grund, wenn der Endpunkt versagt hat
+                                   (Fehler der Anfrage selbst zählen nicht).
+            completed (bool): False, wenn die Anfrage abgebrochen wurde; sie
+                              zählt dann weder als Erfolg noch als Fehler.
+        """
+        message = None
+        with self._lock:
+            endpoint.outstanding -= 1
+            if not completed:
+                # Eine abgebrochene Probe wird bei nächster Gelegenheit wiederholt
+                endpoint.probing = False
+            elif fault is None:
+                endpoint.failures = 0
+                if endpoint.drained:
+                    endpoint.drained = endpoint.probing = False
+                    endpoint.probe_after = PROBE_AFTER
+                    message = f"Endpunkt wieder aufgenommen: {endpoint}"
+            else:
+                endpoint.errors += 1
+                endpoint.failures += 1
+                if endpoint.probing:
+                    # Probe gescheitert: länger warten
+                    endpoint.probing = False
+                    endpoint.probe_after = min(endpoint.probe_after * 2, PROBE_MAX)
+                    endpoint.probe_at = time.monotonic() + endpoint.probe_after
+                elif (not endpoint.drained and endpoint.failures >= self.drain_after
+                      and any(other is not endpoint and not other.drained for other in self.endpoints)):
+                    endpoint.drained = True
+                    endpoint.probe_at = time.monotonic() + endpoint.probe_after
+                    message = (f"Endpunkt gesperrt nach {endpoint.failures} Fehlern ({fault}): {endpoint}, "
+                               f"Probe in {endpoint.probe_after:.0f} s")
+        if message and self.on_change:
+            self.on_change(message)
+
+    def outstanding(self):
+        """Offene Anfragen aller Endpunkte zusammen."""
+        with self._lock:
+            return sum(endpoint.outstanding for endpoint in self.endpoints)
+
+    def has_alternative(self, endpoint):
+        """True, wenn ein anderer Endpunkt gerade Anfragen annimmt."""
+        with self._lock:
+            return any(other is not endpoint and not other.drained for other in self.endpoints)
+
+    def describe(self):
+        """Anfragen und Fehler je Endpunkt für das Log."""
+        with self._lock:
+            return "; ".join(f"{endpoint}: {endpoint.requests} Anfragen, {endpoint.errors} Fehler"
+                             + (" (gesperrt)" if endpoint.drained else "")
+                             for endpoint in self.endpoints)
+
+
+def load_endpoints(path, base_url=None, api_key=None, model=None):
+    """
+    Liest die Pool-Einträge aus einer JSON-Datei.
+
+    Args:
+        path (str): Die Datei (Liste wie in der Moduldokumentation).
+        base_url, api_key, model (str, optional): Werte für fehlende Felder.
+
+    Returns:
+        list: Einträge als dict mit base_url, api_key, model, weight,
+              max_concurrency, rpm, tpm und name.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: Erwartet wird eine nicht leere Liste von Einträgen.")
+    result = []
+    for number, entry in enumerate(entries, start=1):
+        entry = {"base_url": base_url, "api_key": api_key, "model": model, **entry}
+        missing = [key for key in ("base_url", "api_key", "model") if not entry.get(key)]
+        if missing:
+            raise ValueError(f"{path}: Eintrag {number} ohne {', '.join(missing)}.")
+        result.append({key: entry.get(key) for key in
+                       ("base_url", "api_key", "model", "weight", "max_concurrency", "rpm", "tpm", "name")})
+        # Fehlendes oder leeres Gewicht (null): Standard 1
+        weight = entry.get("weight")
+        try:
+            weight = 1.0 if weight is None else float(weight)
+        except (TypeError, ValueError):
+            weight = 0.0
+        if not weight > 0:
+            raise ValueError(f"{path}: Eintrag {number}: Gewicht muss eine positive Zahl sein "
+                             f"(ist {entry.get('weight')!r}).")
+        result[-1]["weight"] = weight
+    return result
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Schlanker EPUB-Leser, der direkt auf dem ZIP-Archiv arbeitet.
+
+Im Gegensatz zu ``ebooklib.epub.read_epub`` werden hier nur ``container.xml``
+und die OPF-Datei (Manifest + Spine) geparst. Die XHTML-Dokumente werden erst
+beim Zugriff einzeln aus dem Archiv gelesen und entpackt; Bilder, Schriften
+und Stylesheets werden nie angefasst.
+"""
+
+import io
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from urllib.parse import unquote
+
+
+CONTAINER_PATH = "META-INF/container.xml"
+
+NS_CONTAINER = "urn:oasis:names:tc:opendocument:xmlns:container"
+NS_OPF = "http://www.idpf.org/2007/opf"
+
+# Medientypen, die als Textdokumente behandelt werden
+DOCUMENT_MEDIA_TYPES = ("application/xhtml+xml", "text/html")
+
+
+class EpubStructureError(Exception):
+    """Das Archiv ist kein EPUB oder die Paketstruktur ist beschädigt."""
+
+
+class EpubDocument:
+    """
+    Ein Inhaltsdokument aus der Spine des Buches.
+
+    Der Inhalt wird nicht beim Anlegen, sondern erst über ``read()`` geladen.
+
+    Attribute:
+        index (int): Position in der Lesereihenfolge (Spine), beginnend bei 0.
+        href (str): Pfad des Dokuments innerhalb des Archivs.
+        idref (str): ID des Manifest-Eintrags.
+        linear (bool): False, wenn die Spine ``linear="no"`` angibt.
+        properties (str): Manifest-Eigenschaften (z.B. "nav").
+        fingerprint (str): Kennung des Rohinhalts (CRC und Größe aus dem ZIP),
+                           ohne dass das Dokument entpackt werden muss; None,
+                           wenn das Backend keine liefern kann.
+        size (int): Entpackte Größe in Bytes (None, wenn unbekannt).
+        guide_type (str): Typ aus dem EPUB2-Guide (z.B. "toc", "copyright-page") oder None.
+    """
+
+    __slots__ = ("index", "href", "idref", "linear", "properties", "fingerprint", "size",
+                 "guide_type", "_loader", "_opener")
+
+    def __init__(self, index, href, idref, linear=True, properties="", loader=None,
+                 fingerprint=None, size=None, opener=None, guide_type=None):
+        self.index = index
+        self.href = href
+        self.idref = idref
+        self.linear = linear
+        self.properties = properties or ""
+        self.fingerprint = fingerprint
+        self.size = size
+        self.guide_type = guide_type
+        self._loader = loader
+        self._opener = opener
+
+    def read(self):
+        """Liest den (entpackten) Inhalt des Dokuments als Bytes."""
+        return self._loader(self.href)
+
+    def open(self):
+        """Öffnet das Dokument als binäres Datei-Objekt, ohne es ganz zu entpacken."""
+        if self._opener is None:
+            return io.BytesIO(self.read())
+        return self._opener(self.href)
+
+    def __repr__(self):
+        return f"EpubDocument({self.index}, {self.href!r})"
+
+
+class EpubZipReader:
+    """
+    Liest Paketinformationen und einzelne Dokumente direkt aus dem EPUB-Archiv.
+
+    Verwendung:
+        with EpubZipReader("buch.epub") as reader:
+            for doc in reader.documents():
+                html = doc.read()
+    """
+
+    def __init__(self, epub_path):
+        """
+        Öffnet das Archiv und parst Container und OPF.
+
+        Args:
+            epub_path (str): Pfad zur EPUB-Datei.
+
+        Raises:
+            EpubStructureError: Wenn Container, OPF oder Spine fehlen oder ungültig sind.
+        """
+        self.epub_path = Path(epub_path)
+        try:
+            self._zip = zipfile.ZipFile(self.epub_path)
+        except (zipfile.BadZipFile, OSError) as e:
+            raise EpubStructureError(f"Kein gültiges ZIP-Archiv: {e}")
+
+        try:
+            self.opf_path = self._find_opf_path()
+            self.opf_dir = posixpath.dirname(self.opf_path)
+            self._parse_opf()
+        except Exception:
+            self._zip.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    def _parse_xml(self, member):
+        try:
+            data = self._zip.read(member)
+        except KeyError:
+            raise EpubStructureError(f"Datei fehlt im Archiv: {member}")
+        try:
+            return ET.fromstring(data)
+        except ET.ParseError as e:
+            raise EpubStructureError(f"Ungültiges XML in {member}: {e}")
+
+    def _find_opf_path(self):
+        root = self._parse_xml(CONTAINER_PATH)
+        rootfile = root.find(f".//{{{NS_CONTAINER}}}rootfile")
+        if rootfile is None or not rootfile.get("full-path"):
+            raise EpubStructureError("container.xml enthält keinen rootfile-Eintrag.")
+        return rootfile.get("full-path")
+
+    def _resolve_href(self, href):
+        """Wandelt ein href aus der OPF in einen Pfad innerhalb des Archivs um."""
+        href = unquote(href.split("#", 1)[0])
+        return posixpath.normpath(posixpath.join(self.opf_dir, href))
+
+    def _parse_opf(self):
+        root = self._parse_xml(self.opf_path)
+
+        manifest = root.find(f"{{{NS_OPF}}}manifest")
+        spine = root.find(f"{{{NS_OPF}}}spine")
+        if manifest is None or spine is None:
+            raise EpubStructureError("OPF enthält kein Manifest oder keine Spine.")
+
+        # id -> (href, media-type, properties)
+        self.manifest = {}
+        for item in manifest.findall(f"{{{NS_OPF}}}item"):
+            item_id = item.get("id")
+            href = item.get("href")
+            if not item_id or not href:
+                continue
+            self.manifest[item_id] = (
+                self._resolve_href(href),
+                item.get("media-type", ""),
+                item.get("properties", ""),
+            )
+
+        self.spine = []
+        for itemref in spine.findall(f"{{{NS_OPF}}}itemref"):
+            idref = itemref.get("idref")
+            if idref not in self.manifest:
+                raise EpubStructureError(f"Spine verweist auf unbekannte ID: {idref}")
+            linear = itemref.get("linear", "yes").strip().lower() != "no"
+            self.spine.append((idref, linear))
+
+        if not self.spine:
+            raise EpubStructureError("Die Spine ist leer.")
+
+        # EPUB2-Guide: href -> Typ (z.B. "toc", "copyright-page")
+        self.guide = {}
+        guide = root.find(f"{{{NS_OPF}}}guide")
+        if guide is not None:
+            for ref in guide.findall(f"{{{NS_OPF}}}reference"):
+                if ref.get("href") and ref.get("type"):
+                    self.guide[self._resolve_href(ref.get("href"))] = ref.get("type")
+
+    def documents(self):
+        """
+        Liefert die XHTML-Dokumente in Lesereihenfolge.
+
+        Returns:
+            list[EpubDocument]: Ein Eintrag pro Spine-Dokument. Der Inhalt ist noch nicht geladen.
+
+        Raises:
+            EpubStructureError: Wenn ein Spine-Dokument im Archiv fehlt.
+        """
+        names = set(self._zip.namelist())
+        docs = []
+        for idref, linear in self.spine:
+            href, media_type, properties = self.manifest[idref]
+            if media_type not in DOCUMENT_MEDIA_TYPES:
+                continue
+            if href not in names:
+                raise EpubStructureError(f"Spine-Dokument fehlt im Archiv: {href}")
+            info = self._zip.getinfo(href)
+            docs.append(EpubDocument(len(docs), href, idref, linear, properties, self.read,
+                                     fingerprint=f"crc32:{info.CRC:08x}:{info.file_size}",
+                                     size=info.file_size, opener=self.open,
+                                     guide_type=self.guide.get(href)))
+        return docs
+
+    def read(self, href):
+        """Entpackt ein einzelnes Mitglied des Archivs."""
+        return self._zip.read(href)
+
+    def open(self, href):
+        """Öffnet ein Mitglied des Archivs als Datei-Objekt (für gestreamtes Lesen)."""
+        return self._zip.open(href)
+
+    def info(self, href):
+        """Liefert die ZipInfo (Größe, CRC) eines Mitglieds, ohne es zu entpacken."""
+        return self._zip.getinfo(href)
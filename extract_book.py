@@ -4,7 +4,13 @@
 import sys
 import os
 import argparse
+import codecs
 import re
+from collections import deque
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import freeze_support
 from pathlib import Path
 import warnings
 
@@ -12,14 +18,669 @@ import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module='ebooklib')
 
 try:
-    import ebooklib
-    from ebooklib import epub
     from bs4 import BeautifulSoup
 except ImportError as e:
-    print(f"Fehler: Fehlende Bibliothek. Bitte installiere sie mit: pip install ebooklib beautifulsoup4")
+    print(f"Fehler: Fehlende Bibliothek. Bitte installiere sie mit: pip install beautifulsoup4")
     print(f"Details: {e}")
     sys.exit(1)
 
+# ebooklib wird nur noch als Rückfallebene für beschädigte Bücher benötigt
+try:
+    import ebooklib
+    from ebooklib import epub
+except ImportError:
+    ebooklib = None
+
+# lxml ist optional und beschleunigt die HTML-Konvertierung deutlich
+try:
+    from lxml import etree, html as lxml_html
+    from bs4.dammit import UnicodeDammit
+except ImportError:
+    lxml_html = None
+
+from epub_reader import EpubZipReader, EpubDocument, EpubStructureError
+from token_estimate import estimate_tokens_from_chars
+from book_manifest import TextStats, chapter_entry, translation_name, failure_name, segments_name
+from workspace import open_workspace
+from segments import (
+    split_segments, iter_segments, make_segments, dump_segments, read_segments, rebuild_text
+)
+
+BACKENDS = ("auto", "stream", "ebooklib")
+HTML_PARSERS = ("auto", "lxml", "html.parser")
+
+# Semantische Typen (epub:type bzw. Guide), die keinen zu übersetzenden Buchtext enthalten
+NON_CONTENT_TYPES = (
+    "cover", "toc", "landmarks", "page-list", "copyright-page",
+    "index", "bibliography", "loi", "lot",
+)
+# Standard-Richtlinie: diese Kategorien werden nicht extrahiert ("nonlinear" = linear="no")
+DEFAULT_SKIP_TYPES = NON_CONTENT_TYPES + ("nonlinear",)
+SEMANTICS_SNIFF_SIZE = 8192
+
+# Dokumente ab dieser Größe werden gestreamt konvertiert (siehe StreamingHtmlConverter)
+DEFAULT_STREAM_THRESHOLD = 8 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Version des erzeugten Textformats. Erhöhen, wenn sich die Konvertierung ändert,
+# damit eine erneute Extraktion alle Kapitel neu erzeugt.
+EXTRACTION_FORMAT = 4
+
+# Elemente, nach denen ein Absatzumbruch eingefügt wird
+BLOCK_TAGS = ('p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li')
+TITLE_TAGS = ('h1', 'h2', 'title')
+
+# Elemente, deren Inhalt BeautifulSoup bei get_text() nicht ausgibt
+NON_TEXT_TAGS = ('script', 'style', 'template')
+PRESERVE_WHITESPACE_TAGS = ('pre', 'textarea')
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+# --- Filter für unsichtbares / nicht zu übersetzendes Markup ---
+# Elemente, die samt Inhalt entfernt werden (zusätzlich: Seitenumbruch-Marker und versteckte Elemente)
+NOISE_TAGS = ('svg',)
+VOID_TAGS = ('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+             'source', 'track', 'wbr')
+# Weiches Trennzeichen, Zero-Width-Space, Word-Joiner, BOM. ZWJ/ZWNJ bleiben erhalten,
+# da sie in manchen Schriften (z.B. Persisch, Indisch) orthographisch sind.
+_INVISIBLE_CHARS = dict.fromkeys(map(ord, '\u00ad\u200b\u2060\ufeff'))
+_SPACE_RUN = re.compile(r'[ \t\f\v]{2,}|[\t\f\v]')
+_HIDDEN_STYLE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden', re.I)
+_LETTER = re.compile(r'[^\W\d_]')
+
+# Kolumnentitel (OCR): kurze Zeile mit Seitenzahl am Anfang oder Ende, die sich im
+# Seitenabstand wiederholt. Nur auf Wunsch entfernt (strip_headers).
+_LEADING_PAGE_NUMBER = re.compile(r'^(\d{1,4})\s+(\D+)$')
+_TRAILING_PAGE_NUMBER = re.compile(r'^(\D+?)\s+(\d{1,4})$')
+RUNNING_HEADER_MAX_LENGTH = 80
+RUNNING_HEADER_MIN_REPEATS = 3
+RUNNING_HEADER_MIN_GAP = 1000
+RUNNING_HEADER_MAX_GAP = 4000
+
+_XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+_BODY_TAG = re.compile(rb'<body\b[^>]*>', re.I)
+_SECTION_TAG = re.compile(rb'<(?:section|nav)\b[^>]*>', re.I)
+_EPUB_TYPE_ATTR = re.compile(rb'\bepub:type\s*=\s*["\']([^"\']*)["\']', re.I)
+_CHARSET_DECLARATION = re.compile(rb'(?:encoding|charset)\s*=\s*["\']?([A-Za-z0-9_.:-]+)', re.I)
+
+
+def _is_noise(tag, attrs):
+    """
+    Prüft, ob ein Element samt Inhalt verworfen wird: SVG, Seitenumbruch-Marker
+    (epub:type="pagebreak", role="doc-pagebreak") und versteckte Elemente.
+
+    Args:
+        tag (str): Tag-Name (klein geschrieben).
+        attrs (dict): Attribute des Elements.
+    """
+    if tag.rsplit(':', 1)[-1] in NOISE_TAGS:
+        return True
+    if not attrs:
+        return False
+    if 'pagebreak' in (attrs.get('epub:type') or '').split():
+        return True
+    if attrs.get('role') == 'doc-pagebreak':
+        return True
+    if 'hidden' in attrs or (attrs.get('aria-hidden') or '').lower() == 'true':
+        return True
+    return bool(_HIDDEN_STYLE.search(attrs.get('style') or ''))
+
+
+def _clean_line(line):
+    """Entfernt unsichtbare Zeichen und überflüssigen Leerraum in einer Zeile."""
+    line = line.translate(_INVISIBLE_CHARS)
+    return _SPACE_RUN.sub(' ', line).strip(' ')
+
+
+def _iter_lines(pieces):
+    """Zerlegt beliebig geschnittene Textstücke in Zeilen (ohne Zeilenumbruch)."""
+    rest = ""
+    for piece in pieces:
+        lines = (rest + piece).split("\n")
+        rest = lines.pop()
+        yield from lines
+    yield rest
+
+
+def _join_lines(lines):
+    """
+    Setzt bereinigte Zeilen wieder zusammen: höchstens eine Leerzeile zwischen
+    Absätzen, keine Leerzeilen am Anfang und Ende.
+
+    Yields:
+        str: Textstücke, die aneinandergehängt den Text ergeben.
+    """
+    started = False
+    blank = False
+    for line in lines:
+        if not line:
+            blank = started
+            continue
+        if started:
+            yield ("\n\n" if blank else "\n") + line
+        else:
+            yield line
+        started = True
+        blank = False
+
+
+class RunningHeaderDetector:
+    """
+    Erkennt Kolumnentitel aus OCR-Büchern (z.B. "DER ROMAN 123").
+
+    Eine Zeile gilt als Kolumnentitel, wenn sie kurz ist und aus Text mit einer
+    Seitenzahl am Anfang oder am Ende besteht, sonst ohne Ziffern. Dieselbe Zeile
+    muss mindestens RUNNING_HEADER_MIN_REPEATS-mal mit verschiedenen Seitenzahlen
+    vorkommen, und zwar im Abstand von Buchseiten (Median zwischen
+    RUNNING_HEADER_MIN_GAP und RUNNING_HEADER_MAX_GAP Zeichen). Zeilen mit
+    weiteren Zahlen ("12. März 1914", "Brief 4, Seite 2") sind nie Kolumnentitel.
+
+    Kurze nummerierte Überschriften ("Tag 12", "Tag 13") im Seitenabstand sind
+    davon nicht zu unterscheiden; deshalb werden Kolumnentitel nur auf Wunsch
+    entfernt (clean_text(strip_headers=True), --strip-running-headers).
+    """
+
+    def __init__(self):
+        self._offsets = {}
+        self._numbers = {}
+        self._position = 0
+
+    @staticmethod
+    def key(line):
+        """Vergleichsschlüssel einer Kandidatenzeile (Seitenzahl durch # ersetzt) oder None."""
+        return RunningHeaderDetector._split(line)[1]
+
+    @staticmethod
+    def _split(line):
+        """Zerlegt eine Kandidatenzeile in (Seitenzahl, Schlüssel), sonst (None, None)."""
+        if len(line) > RUNNING_HEADER_MAX_LENGTH:
+            return None, None
+        match = _LEADING_PAGE_NUMBER.match(line)
+        if match and _LETTER.search(match.group(2)):
+            return match.group(1), "# " + match.group(2)
+        match = _TRAILING_PAGE_NUMBER.match(line)
+        if match and _LETTER.search(match.group(1)):
+            return match.group(2), match.group(1) + " #"
+        return None, None
+
+    def add(self, line):
+        number, key = self._split(line)
+        if key is not None:
+            self._offsets.setdefault(key, []).append(self._position)
+            self._numbers.setdefault(key, set()).add(number)
+        self._position += len(line) + 1
+
+    def headers(self):
+        """Liefert die Schlüssel der erkannten Kolumnentitel."""
+        result = set()
+        for key, offsets in self._offsets.items():
+            if len(offsets) < RUNNING_HEADER_MIN_REPEATS or len(self._numbers[key]) < 2:
+                continue
+            gaps = sorted(b - a for a, b in zip(offsets, offsets[1:]))
+            if RUNNING_HEADER_MIN_GAP <= gaps[len(gaps) // 2] <= RUNNING_HEADER_MAX_GAP:
+                result.add(key)
+        return result
+
+
+def clean_text(text, strip_headers=False):
+    """
+    Normalisiert extrahierten Text: unsichtbare Zeichen (weiches Trennzeichen,
+    Zero-Width-Space), doppelte Leerzeichen, Leerraum an Zeilenenden und leere
+    Zeilen werden entfernt.
+
+    Args:
+        text (str): Text aus der HTML-Konvertierung.
+        strip_headers (bool, optional): Zusätzlich Kolumnentitel mit Seitenzahlen
+                                        entfernen (siehe RunningHeaderDetector).
+
+    Returns:
+        str: Der bereinigte Text.
+    """
+    lines = [_clean_line(line) for line in text.split("\n")]
+    if strip_headers:
+        detector = RunningHeaderDetector()
+        for line in lines:
+            detector.add(line)
+        headers = detector.headers()
+        if headers:
+            lines = [line for line in lines if RunningHeaderDetector.key(line) not in headers]
+    return "".join(_join_lines(lines))
+
+
+def _finish_text(text, chapter_title, clean, removed, strip_headers=False):
+    """Gemeinsamer Abschluss der Konverter (Newlines zusammenfassen, optional bereinigen)."""
+    # Bereinigung von zu vielen aufeinanderfolgenden Newlines (mehr als 2)
+    text = re.sub(r'\n{3,}', '\n\n', text).strip()
+    if clean:
+        cleaned = clean_text(text, strip_headers)
+        removed = (removed[0] + len(text) - len(cleaned),
+                   removed[1] + len(text.encode('utf-8')) - len(cleaned.encode('utf-8')))
+        text = cleaned
+    return text, chapter_title, removed
+
+
+def html_to_text_soup(html_content, clean=False, strip_headers=False):
+    """
+    Konvertiert HTML-Inhalt mit BeautifulSoup ('html.parser') in formatierten Text.
+    Versucht, Absätze und Zeilenumbrüche beizubehalten.
+
+    Args:
+        html_content (bytes/str): Der HTML-Inhalt des Kapitels.
+        clean (bool, optional): Unsichtbares Markup verwerfen und den Text bereinigen
+                                (siehe _is_noise und clean_text).
+        strip_headers (bool, optional): Bei der Bereinigung auch Kolumnentitel entfernen.
+
+    Returns:
+        str: Der extrahierte Reintext.
+        str: Ein gefundener Titel (oder None).
+        tuple: (Zeichen, Bytes), die durch die Bereinigung entfernt wurden.
+    """
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    # Nur den <body> auswerten. Die Rohdokumente enthalten im <head> meist den
+    # Buchtitel, den ebooklib beim Auslesen verworfen hat.
+    root = soup.body or soup
+
+    removed_chars = removed_bytes = 0
+    if clean:
+        for tag in root.find_all(lambda t: _is_noise(t.name, t.attrs)):
+            if tag.decomposed:
+                continue
+            dropped = tag.get_text()
+            removed_chars += len(dropped)
+            removed_bytes += len(dropped.encode('utf-8'))
+            tag.decompose()
+
+    # Versuche, einen Titel für das Kapitel zu finden (meistens h1 oder h2)
+    title_tag = root.find(list(TITLE_TAGS))
+    chapter_title = title_tag.get_text(strip=True) if title_tag else None
+
+    # Formatierung beibehalten:
+    # Ersetze <br> durch newline
+    for br in root.find_all("br"):
+        br.replace_with("\n")
+
+    # Umgebe Block-Elemente (p, div, h1, etc.) mit Newlines, damit Absätze im
+    # Textfile erkennbar bleiben. Auch vor dem Element: 'html.parser' schließt
+    # ein offenes <p> bei "<p>eins<p>zwei" nicht, sondern verschachtelt es
+    # (lxml schließt es wie ein Browser); so ergeben beide dieselben Absätze.
+    for tag in root.find_all(list(BLOCK_TAGS)):
+        tag.insert_before("\n\n")
+        tag.insert_after("\n\n")
+
+    # Get text extrahiert den Text, strip=True entfernt überschüssige Whitespaces am Anfang/Ende
+    text = root.get_text()
+
+    return _finish_text(text, chapter_title, clean, (removed_chars, removed_bytes), strip_headers)
+
+
+def _iter_tree_events(root):
+    """
+    Liefert ("start", element) und ("end", element) in Dokumentreihenfolge.
+
+    Anders als etree.iterwalk werden auch Kommentare und Processing Instructions
+    geliefert, damit deren nachfolgender Text (tail) nicht verloren geht.
+    """
+    yield "start", root
+    stack = [(root, iter(root))]
+    while stack:
+        parent, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            yield "end", parent
+            continue
+        yield "start", child
+        stack.append((child, iter(child)))
+
+
+def html_to_text_lxml(html_content, clean=False, strip_headers=False):
+    """
+    Schneller Pfad für html_to_text_soup auf Basis von lxml.
+
+    Statt einen Soup-Baum aufzubauen und ihn dreimal zu durchlaufen, wird der
+    lxml-Baum in einem einzigen Durchgang abgelaufen. Die Ausgabe (Absätze,
+    Zeilenumbrüche, Titel) entspricht der von html_to_text_soup, auch bei
+    fehlerhaftem Markup: lxml schließt ein offenes <p> oder <li> selbst,
+    html.parser verschachtelt es; da beide Konverter vor und nach jedem
+    Block-Element einen Absatz setzen, ergibt sich derselbe Text
+    (tests/test_html_parity.py).
+
+    Args:
+        html_content (bytes/str): Der HTML-Inhalt des Kapitels.
+        clean (bool, optional): Unsichtbares Markup verwerfen und den Text bereinigen.
+        strip_headers (bool, optional): Bei der Bereinigung auch Kolumnentitel entfernen.
+
+    Returns:
+        str: Der extrahierte Reintext.
+        str: Ein gefundener Titel (oder None).
+        tuple: (Zeichen, Bytes), die durch die Bereinigung entfernt wurden.
+    """
+    # Gleiche Zeichensatz-Erkennung wie BeautifulSoup
+    if isinstance(html_content, bytes):
+        html_content = UnicodeDammit(html_content, is_html=True).unicode_markup or ""
+    # lxml lehnt Unicode-Strings mit Encoding-Deklaration ab
+    html_content = _XML_DECLARATION.sub("", html_content, count=1)
+    if not html_content.strip():
+        return "", None, (0, 0)
+
+    try:
+        document = lxml_html.document_fromstring(html_content)
+    except etree.ParserError:
+        return "", None, (0, 0)
+    root = document.find("body")
+    if root is None:
+        root = document
+
+    parts = []
+    title_start = None
+    title_element = None
+    chapter_title = None
+    skip_depth = 0
+    preserve_depth = 0
+    noise_element = None
+    removed = [0, 0]
+
+    def add(string):
+        # BeautifulSoup reduziert reine Whitespace-Strings außerhalb von <pre>
+        # auf einen Zeilenumbruch bzw. ein Leerzeichen.
+        if not preserve_depth and not string.strip(_ASCII_SPACES):
+            string = "\n" if "\n" in string else " "
+        if noise_element is not None:
+            removed[0] += len(string)
+            removed[1] += len(string.encode('utf-8'))
+        else:
+            parts.append(string)
+
+    for event, element in _iter_tree_events(root):
+        tag = element.tag
+        if not isinstance(tag, str):
+            # Kommentare und Processing Instructions: nur der nachfolgende Text zählt
+            if event == "end" and element.tail and not skip_depth:
+                add(element.tail)
+            continue
+
+        if event == "start":
+            if (clean and noise_element is None and tag not in VOID_TAGS
+                    and element is not root and _is_noise(tag, element.attrib)):
+                noise_element = element
+            if tag in NON_TEXT_TAGS:
+                skip_depth += 1
+            elif tag in PRESERVE_WHITESPACE_TAGS:
+                preserve_depth += 1
+            if tag in BLOCK_TAGS and noise_element is None and element is not root:
+                parts.append("\n\n")
+            if (chapter_title is None and title_element is None and noise_element is None
+                    and tag in TITLE_TAGS):
+                title_element, title_start = element, len(parts)
+            if tag == "br":
+                if noise_element is None:
+                    parts.append("\n")
+            elif element.text and not skip_depth:
+                add(element.text)
+        else:
+            if tag in NON_TEXT_TAGS:
+                skip_depth -= 1
+            elif tag in PRESERVE_WHITESPACE_TAGS:
+                preserve_depth -= 1
+            if element is title_element:
+                # Titel wie get_text(strip=True); <br>-Ersetzungen fallen beim strip() weg
+                chapter_title = "".join(s.strip() for s in parts[title_start:])
+                title_element = None
+            if element is noise_element:
+                noise_element = None
+            elif tag in BLOCK_TAGS and noise_element is None:
+                parts.append("\n\n")
+            if element.tail and element is not root and not skip_depth:
+                add(element.tail)
+
+    return _finish_text("".join(parts), chapter_title, clean, tuple(removed), strip_headers)
+
+
+def _sniff_epub_types(head):
+    """
+    Liest die EPUB3-Semantik (epub:type) des Dokuments aus dem Dokumentanfang.
+
+    Ausgewertet werden das <body>-Tag und das erste <section>/<nav> danach, nicht
+    aber Inline-Elemente im Text.
+
+    Args:
+        head (bytes): Die ersten Bytes des Dokuments.
+
+    Returns:
+        list[str]: Gefundene Typen, z.B. ["frontmatter", "copyright-page"].
+    """
+    body = _BODY_TAG.search(head)
+    if not body:
+        return []
+    types = []
+    section = _SECTION_TAG.search(head, body.end())
+    for tag in (body.group(0), section.group(0) if section else b""):
+        match = _EPUB_TYPE_ATTR.search(tag)
+        if match:
+            types.extend(match.group(1).decode("ascii", "ignore").split())
+    return types
+
+
+def _sniff_encoding(head):
+    """Ermittelt den Zeichensatz aus BOM, XML-Deklaration oder <meta charset> (Standard: UTF-8)."""
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    match = _CHARSET_DECLARATION.search(head)
+    if match:
+        encoding = match.group(1).decode("ascii", "ignore")
+        try:
+            return codecs.lookup(encoding).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def _decode_stream(file_obj, chunk_size):
+    """Liest ein binäres Datei-Objekt stückweise und liefert dekodierte Text-Stücke."""
+    head = file_obj.read(max(chunk_size, 1024))
+    decoder = codecs.getincrementaldecoder(_sniff_encoding(head[:1024]))(errors="replace")
+    chunk = head
+    while chunk:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+        chunk = file_obj.read(chunk_size)
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+class StreamingHtmlConverter(HTMLParser):
+    """
+    Inkrementelle (SAX-artige) Variante von html_to_text_soup für sehr große Dokumente.
+
+    Es wird kein Baum aufgebaut: Der HTML-Text wird stückweise eingelesen und die
+    Absätze werden als Generator geliefert, sobald sie abgeschlossen sind. Der
+    Speicherbedarf hängt damit vom längsten Absatz ab, nicht vom Dokument.
+    Das Ergebnis entspricht (aneinandergehängt) dem Text von html_to_text_soup.
+
+    Mit clean=True werden unsichtbare Elemente (siehe _is_noise) verworfen; die
+    Bereinigung des Textes selbst (clean_text) erfolgt beim Schreiben.
+
+    Verwendung:
+        converter = StreamingHtmlConverter()
+        for paragraph in converter.paragraphs(text_chunks):
+            f.write(paragraph)
+        title = converter.title
+    """
+
+    def __init__(self, clean=False):
+        super().__init__(convert_charrefs=True)
+        self.title = None
+        self.clean = clean
+        self.removed_chars = 0
+        self.removed_bytes = 0
+        self._noise_tag = None
+        self._noise_nesting = 0
+        self._data = []          # Text seit dem letzten Tag
+        self._raw = []           # Stücke des aktuellen Absatzes
+        self._paragraphs = []    # abgeschlossene, noch nicht ausgelieferte Absätze
+        self._body_seen = False
+        self._body_closed = False
+        self._skip_depth = 0
+        self._preserve_depth = 0
+        self._title_tag = None
+        self._title_nesting = 0
+        self._title_parts = []
+
+    def _flush_data(self):
+        """Behandelt den Text zwischen zwei Tags wie einen BeautifulSoup-String."""
+        if not self._data:
+            return
+        string = "".join(self._data)
+        self._data = []
+        if self._skip_depth or self._body_closed:
+            return
+        if not self._preserve_depth and not string.strip(_ASCII_SPACES):
+            string = "\n" if "\n" in string else " "
+        if self._noise_tag:
+            self.removed_chars += len(string)
+            self.removed_bytes += len(string.encode('utf-8'))
+            return
+        if self._title_tag:
+            self._title_parts.append(string.strip())
+        self._raw.append(string)
+
+    def _end_paragraph(self):
+        if self._raw:
+            self._paragraphs.append("".join(self._raw))
+            self._raw = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_data()
+        if tag == "body" and not self._body_seen:
+            # Alles vor dem <body> (Kopfbereich) verwerfen, wie html_to_text_soup
+            self._body_seen = True
+            self._raw = []
+            self._paragraphs = []
+            self.title = None
+            self._title_tag = None
+            self._title_parts = []
+            return
+        if self._noise_tag == tag:
+            self._noise_nesting += 1
+        elif (self.clean and self._noise_tag is None and tag not in VOID_TAGS
+                and _is_noise(tag, dict(attrs))):
+            self._noise_tag = tag
+            self._noise_nesting = 1
+        if tag in NON_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_depth += 1
+        if self._title_tag == tag:
+            self._title_nesting += 1
+        elif (self.title is None and self._title_tag is None and self._noise_tag is None
+                and tag in TITLE_TAGS):
+            self._title_tag = tag
+            self._title_nesting = 1
+        if self._skip_depth or self._body_closed or self._noise_tag is not None:
+            return
+        if tag == "br":
+            self._raw.append("\n")
+        elif tag in BLOCK_TAGS:
+            # Absatzgrenze auch vor dem Block, wie in html_to_text_soup
+            self._raw.append("\n\n")
+            self._end_paragraph()
+
+    def handle_endtag(self, tag):
+        self._flush_data()
+        if tag == "body":
+            self._body_closed = self._body_seen
+            return
+        if tag in NON_TEXT_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_depth = max(0, self._preserve_depth - 1)
+        if self._title_tag == tag:
+            self._title_nesting -= 1
+            if self._title_nesting == 0:
+                self.title = "".join(self._title_parts)
+                self._title_tag = None
+                self._title_parts = []
+        if self._noise_tag == tag:
+            self._noise_nesting -= 1
+            if self._noise_nesting == 0:
+                self._noise_tag = None
+            return
+        if self._noise_tag:
+            return
+        if tag in BLOCK_TAGS and not self._skip_depth and not self._body_closed:
+            self._raw.append("\n\n")
+            self._end_paragraph()
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_comment(self, data):
+        self._flush_data()
+
+    def handle_decl(self, decl):
+        self._flush_data()
+
+    def handle_pi(self, data):
+        self._flush_data()
+
+    def unknown_decl(self, data):
+        self._flush_data()
+
+    def paragraphs(self, chunks):
+        """
+        Verarbeitet die Text-Stücke und liefert den bereinigten Text absatzweise.
+
+        Wie in html_to_text_soup werden mehr als zwei Zeilenumbrüche zusammengefasst
+        und Leerraum am Anfang und Ende entfernt, nur eben über Absatzgrenzen hinweg.
+
+        Args:
+            chunks (iterable[str]): Das HTML-Dokument in beliebig großen Stücken.
+
+        Yields:
+            str: Textstücke, die aneinandergehängt den Kapiteltext ergeben.
+        """
+        carry = ""        # Leerraum am Ende des letzten Stücks (noch nicht geschrieben)
+        started = False
+
+        def normalize(paragraph):
+            nonlocal carry, started
+            text = carry + paragraph
+            body = text.rstrip()
+            carry = text[len(body):]
+            if not started:
+                body = body.lstrip()
+                if not body:
+                    carry = ""
+                    return ""
+                started = True
+            return re.sub(r'\n{3,}', '\n\n', body)
+
+        for chunk in chunks:
+            self.feed(chunk)
+            if not self._body_seen:
+                # Kopfbereich: erst ausgeben, wenn klar ist, ob ein <body> folgt
+                continue
+            paragraphs, self._paragraphs = self._paragraphs, []
+            for paragraph in paragraphs:
+                text = normalize(paragraph)
+                if text:
+                    yield text
+
+        self.close()
+        self._flush_data()
+        self._end_paragraph()
+        if self._title_tag:
+            self.title = "".join(self._title_parts)
+        for paragraph in self._paragraphs:
+            text = normalize(paragraph)
+            if text:
+                yield text
+        self._paragraphs = []
+
 
 class EpubChapterExtractor:
     """
@@ -27,24 +688,82 @@ class EpubChapterExtractor:
 
     Attribute:
         epub_path (Path): Der Pfad zur EPUB-Datei.
-        output_dir (Path): Das Verzeichnis, in dem die Textdateien gespeichert werden.
+        output_dir (Path): Das Verzeichnis, in dem die Textdateien gespeichert werden,
+                           oder eine Workspace-Datei (.sqlite).
+        backend (str): "stream" liest nur Spine-Dokumente direkt aus dem ZIP,
+                       "ebooklib" lädt das ganze Buch, "auto" versucht "stream"
+                       und fällt bei beschädigten Büchern auf ebooklib zurück.
+        parser (str): HTML-Konverter ("lxml", "html.parser" oder "auto").
+        jobs (int): Anzahl Prozesse für die HTML-Konvertierung (1 = seriell).
+        stream_threshold (int): Ab dieser Größe (Bytes) wird ein Dokument gestreamt konvertiert.
+        skip_types (frozenset): Nicht-Inhalts-Kategorien, die nicht extrahiert werden.
     """
 
-    def __init__(self, epub_path, output_dir=None, log_callback=None, progress_callback=None):
+    def __init__(self, epub_path, output_dir=None, log_callback=None, progress_callback=None,
+                 backend="auto", parser="auto", jobs=1, stream_threshold=DEFAULT_STREAM_THRESHOLD,
+                 skip_types=DEFAULT_SKIP_TYPES, clean=True, strip_headers=False):
         """
         Initialisiert den Extractor.
 
         Args:
             epub_path (str): Pfad zur Eingabe-EPUB-Datei.
-            output_dir (str, optional): Pfad zum Ausgabeordner. Wenn None, wird ein Ordner
-                                        basierend auf dem Dateinamen erstellt.
+            output_dir (str, optional): Pfad zum Ausgabeordner oder zu einer Workspace-Datei
+                                        (.sqlite, siehe workspace.py). Wenn None, wird ein
+                                        Ordner basierend auf dem Dateinamen erstellt.
             log_callback (func, optional): Funktion zum Protokollieren von Nachrichten.
             progress_callback (func, optional): Funktion(current, total) für Fortschritt.
+            backend (str, optional): "auto" (Standard), "stream" oder "ebooklib".
+            parser (str, optional): "auto" (Standard: lxml, falls installiert),
+                                    "lxml" oder "html.parser".
+            jobs (int, optional): Anzahl paralleler Prozesse für die Konvertierung.
+                                  1 (Standard) arbeitet seriell, 0 nutzt alle CPU-Kerne.
+            stream_threshold (int, optional): Dokumente ab dieser entpackten Größe (Bytes)
+                                              werden absatzweise gestreamt in die Datei
+                                              geschrieben. 0 = immer, None = nie.
+            skip_types (iterable, optional): Kategorien aus NON_CONTENT_TYPES bzw. "nonlinear",
+                                             die übersprungen (nicht übersetzt) werden.
+                                             Standard: alle.
+            clean (bool, optional): Unsichtbares Markup (Seitenumbrüche, versteckte Elemente,
+                                    SVG) und weiche Trennzeichen entfernen und Leerraum
+                                    normalisieren (Standard: True).
+            strip_headers (bool, optional): Bei der Bereinigung auch wiederkehrende
+                                            Kolumnentitel mit Seitenzahl entfernen
+                                            (OCR-Bücher, Standard: False).
         """
         self.epub_path = Path(epub_path)
         self.log_callback = log_callback
         self.progress_callback = progress_callback
 
+        if backend not in BACKENDS:
+            raise ValueError(f"Unbekanntes Backend: {backend} (erlaubt: {', '.join(BACKENDS)})")
+        if backend == "ebooklib" and ebooklib is None:
+            raise ImportError("Backend 'ebooklib' benötigt: pip install ebooklib")
+        self.backend = backend
+
+        if parser not in HTML_PARSERS:
+            raise ValueError(f"Unbekannter Parser: {parser} (erlaubt: {', '.join(HTML_PARSERS)})")
+        if parser == "auto":
+            parser = "lxml" if lxml_html is not None else "html.parser"
+        elif parser == "lxml" and lxml_html is None:
+            self._log("Warnung: lxml ist nicht installiert -> verwende 'html.parser'.")
+            parser = "html.parser"
+        self.parser = parser
+        self.clean = clean
+        self.strip_headers = clean and strip_headers
+        self._converter = partial(html_to_text_lxml if parser == "lxml" else html_to_text_soup,
+                                  clean=clean, strip_headers=self.strip_headers)
+
+        if jobs < 0:
+            raise ValueError("jobs darf nicht negativ sein.")
+        self.jobs = jobs or os.cpu_count() or 1
+        self.stream_threshold = stream_threshold
+
+        unknown = set(skip_types) - set(DEFAULT_SKIP_TYPES)
+        if unknown:
+            raise ValueError(f"Unbekannte Kategorie(n): {', '.join(sorted(unknown))} "
+                             f"(erlaubt: {', '.join(DEFAULT_SKIP_TYPES)})")
+        self.skip_types = frozenset(skip_types)
+
         if not self.epub_path.exists():
             raise FileNotFoundError(f"Die Datei '{self.epub_path}' wurde nicht gefunden.")
 
@@ -53,6 +772,7 @@ class EpubChapterExtractor:
         else:
             # Erstelle einen Ordner mit dem Namen des Ebooks im gleichen Verzeichnis
             self.output_dir = self.epub_path.parent / self.epub_path.stem
+        self.workspace = open_workspace(self.output_dir)
 
     def _log(self, message):
         if self.log_callback:
@@ -82,6 +802,7 @@ class EpubChapterExtractor:
         """
         Konvertiert HTML-Inhalt in formatierten Text.
         Versucht, Absätze und Zeilenumbrüche beizubehalten.
+        Verwendet den im Konstruktor gewählten Parser.
 
         Args:
             html_content (bytes/str): Der HTML-Inhalt des Kapitels.
@@ -89,94 +810,436 @@ class EpubChapterExtractor:
         Returns:
             str: Der extrahierte Reintext.
             str: Ein gefundener Titel (oder None).
+            tuple: (Zeichen, Bytes), die durch die Bereinigung entfernt wurden.
+        """
+        return self._converter(html_content)
+
+    def _open_documents(self):
+        """
+        Öffnet das Buch mit dem gewählten Backend.
+
+        Returns:
+            tuple: (Liste von EpubDocument, Funktion zum Schließen des Buches)
+        """
+        if self.backend in ("auto", "stream"):
+            reader = None
+            try:
+                reader = EpubZipReader(self.epub_path)
+                return reader.documents(), reader.close
+            except EpubStructureError as e:
+                if reader:
+                    reader.close()
+                if self.backend == "stream" or ebooklib is None:
+                    raise
+                self._log(f"Warnung: {e} -> Rückfall auf ebooklib.")
+
+        book = epub.read_epub(self.epub_path)
+        guide = {ref.get("href", "").split("#", 1)[0]: ref.get("type") for ref in book.guide}
+        # Lesereihenfolge aus der Spine (nicht die Manifest-Reihenfolge), damit
+        # spine_index bei beiden Backends dasselbe bedeutet
+        documents = []
+        for idref, flag in book.spine:
+            item = book.get_item_with_id(idref)
+            if item is None:
+                self._log(f"Warnung: Spine verweist auf unbekannte ID: {idref} -> übersprungen.")
+                continue
+            if item.get_type() != ebooklib.ITEM_DOCUMENT:
+                continue
+            documents.append(EpubDocument(
+                len(documents), item.get_name(), idref,
+                linear=str(flag).lower() != "no",
+                properties=" ".join(getattr(item, "properties", None) or []),
+                loader=lambda href, item=item: item.get_content(),
+                guide_type=guide.get(item.get_name())))
+        return documents, lambda: None
+
+    def _classify(self, item):
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        Ordnet ein Dokument einer Nicht-Inhalts-Kategorie zu.
 
-        # Versuche, einen Titel für das Kapitel zu finden (meistens h1 oder h2)
-        title_tag = soup.find(['h1', 'h2', 'title'])
-        chapter_title = title_tag.get_text(strip=True) if title_tag else None
+        Berücksichtigt werden die Manifest-Eigenschaft "nav", der EPUB2-Guide,
+        EPUB3-Semantik (epub:type an <body> bzw. dem ersten <section>/<nav>) und
+        das Spine-Attribut linear="no".
 
-        # Formatierung beibehalten:
-        # Ersetze <br> durch newline
-        for br in soup.find_all("br"):
-            br.replace_with("\n")
+        Returns:
+            str: Kategorie (z.B. "toc", "copyright-page", "nonlinear") oder None für Inhalt.
+        """
+        types = []
+        if "nav" in item.properties.split():
+            types.append("toc")
+        if item.guide_type:
+            types.append(item.guide_type)
+        with item.open() as f:
+            types.extend(_sniff_epub_types(f.read(SEMANTICS_SNIFF_SIZE)))
 
-        # Ersetze Block-Elemente (p, div, h1, etc.) durch Text + Newlines,
-        # damit Absätze im Textfile erkennbar bleiben.
-        for tag in soup.find_all(['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li']):
-            tag.insert_after("\n\n")
+        for epub_type in types:
+            if epub_type in NON_CONTENT_TYPES:
+                return epub_type
+        if not item.linear:
+            return "nonlinear"
+        return None
+
+    def _convert_documents(self, documents, skip=frozenset()):
+        """
+        Liest und konvertiert die Dokumente, seriell oder in einem Prozess-Pool.
 
-        # Get text extrahiert den Text, strip=True entfernt überschüssige Whitespaces am Anfang/Ende
-        text = soup.get_text()
+        Die Ergebnisse werden immer in Lesereihenfolge geliefert. Im Pool-Modus sind
+        höchstens ``jobs * 4`` Dokumente gleichzeitig unterwegs, damit bei sehr
+        vielen Dateien nicht das ganze Buch im Speicher landet.
 
-        # Bereinigung von zu vielen aufeinanderfolgenden Newlines (mehr als 2)
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        Args:
+            documents (list[EpubDocument]): Die Dokumente in Lesereihenfolge.
+            skip (set, optional): Spine-Indizes, die hier weder gelesen noch konvertiert
+                                  werden (Text und Titel sind dann None).
+
+        Yields:
+            tuple: (EpubDocument, Text, Titel, entfernte (Zeichen, Bytes))
+        """
+        if self.jobs <= 1 or len(documents) - len(skip) <= 1:
+            for item in documents:
+                if item.index in skip:
+                    yield item, None, None, (0, 0)
+                    continue
+                yield (item,) + self._html_to_text(item.read())
+            return
 
-        return text.strip(), chapter_title
+        self._log(f"Konvertiere mit {self.jobs} Prozessen...")
+        executor = ProcessPoolExecutor(max_workers=self.jobs)
+        pending = deque()
+        remaining = iter(documents)
+
+        def submit(item):
+            if item.index in skip:
+                pending.append((item, None))
+            else:
+                pending.append((item, executor.submit(self._converter, item.read())))
+
+        try:
+            for item in remaining:
+                submit(item)
+                if len(pending) >= self.jobs * 4:
+                    break
+            while pending:
+                item, future = pending.popleft()
+                next_item = next(remaining, None)
+                if next_item is not None:
+                    submit(next_item)
+                if future is None:
+                    yield item, None, None, (0, 0)
+                    continue
+                yield (item,) + future.result()
+        finally:
+            # Bei Abbruch (z.B. durch den Fortschritts-Callback) nichts mehr starten
+            for _, future in pending:
+                if future is not None:
+                    future.cancel()
+            executor.shutdown(wait=True)
 
     def process(self):
         """
         Führt den Extraktionsprozess aus:
-        1. Lädt das Buch.
+        1. Lädt das Buch (nur Paketstruktur, Dokumente werden einzeln gelesen).
         2. Iteriert durch die Kapitel.
         3. Extrahiert Text und Titel.
         4. Speichert die Dateien.
         """
         self._log(f"Lese Buch: {self.epub_path}")
-        book = epub.read_epub(self.epub_path)
+        documents, close_book = self._open_documents()
+        try:
+            self._extract_documents(documents)
+        finally:
+            close_book()
+            self.workspace.close()
+
+        self._log("\nExtraktion abgeschlossen.")
+
+    def _extraction_settings(self):
+        """Einstellungen, die den extrahierten Text verändern (für den Abgleich mit dem Manifest)."""
+        return {"format": EXTRACTION_FORMAT, "skip_types": sorted(self.skip_types),
+                "clean": self.clean, "strip_headers": self.strip_headers}
 
+    def _should_stream(self, item):
+        """Sehr große Dokumente werden gestreamt statt als Baum konvertiert."""
+        if self.stream_threshold is None:
+            return False
+        if self.stream_threshold == 0:
+            return True
+        return item.size is not None and item.size >= self.stream_threshold
+
+    def _stream_to_file(self, item):
+        """
+        Konvertiert ein Dokument gestreamt direkt in eine temporäre Datei.
+
+        Mit Bereinigung wird zeilenweise bereinigt (wie clean_text). Werden dabei
+        Kolumnentitel erkannt (nur mit strip_headers), entfernt sie ein zweiter
+        Durchgang über die Datei.
+
+        Returns:
+            tuple: (temporäre Datei, gefundener Titel, TextStats, entfernte (Zeichen, Bytes))
+        """
+        converter = StreamingHtmlConverter(clean=self.clean)
+        raw = TextStats()
+        stats = TextStats()
+        detector = RunningHeaderDetector()
+        tmp_file = self.workspace.temp_path(f".stream_{item.index:05d}.tmp")
+
+        def counted(pieces):
+            for piece in pieces:
+                raw.update(piece)
+                yield piece
+
+        def cleaned_lines(pieces):
+            for line in _iter_lines(pieces):
+                line = _clean_line(line)
+                if self.strip_headers:
+                    detector.add(line)
+                yield line
+
+        with item.open() as source, open(tmp_file, 'w', encoding='utf-8') as f:
+            pieces = counted(converter.paragraphs(_decode_stream(source, STREAM_CHUNK_SIZE)))
+            if self.clean:
+                pieces = _join_lines(cleaned_lines(pieces))
+            for piece in pieces:
+                f.write(piece)
+                stats.update(piece)
+
+        headers = detector.headers() if self.strip_headers else None
+        if headers:
+            # Zweiter Durchgang: Kolumnentitel entfernen
+            filtered_file = tmp_file.with_name(tmp_file.name + ".2")
+            stats = TextStats()
+            with open(tmp_file, 'r', encoding='utf-8', newline='') as source, \
+                    open(filtered_file, 'w', encoding='utf-8') as f:
+                lines = (line for line in _iter_lines(iter(lambda: source.read(STREAM_CHUNK_SIZE), ""))
+                         if RunningHeaderDetector.key(line) not in headers)
+                for piece in _join_lines(lines):
+                    f.write(piece)
+                    stats.update(piece)
+            os.replace(filtered_file, tmp_file)
+
+        removed = (converter.removed_chars + raw.chars - stats.chars,
+                   converter.removed_bytes + raw.bytes - stats.bytes)
+        return tmp_file, converter.title, stats, removed
+
+    def _segment_file(self, item, tmp_file):
+        """
+        Zerlegt eine gestreamt geschriebene Kapiteldatei in Segmente.
+
+        Returns:
+            tuple: (temporäre '.segments.jsonl' Datei, Anzahl Segmente)
+        """
+        segments_file = tmp_file.with_name(tmp_file.name + ".segments")
+        segment_count = 0
+        with open(tmp_file, 'r', encoding='utf-8', newline='') as source, \
+                open(segments_file, 'w', encoding='utf-8') as f:
+            pieces = iter(lambda: source.read(STREAM_CHUNK_SIZE), "")
+            for line in dump_segments(make_segments(item.index, iter_segments(pieces))):
+                f.write(line)
+                segment_count += 1
+        return segments_file, segment_count
+
+    def _restamp_segments(self, file_name, spine_index):
+        """Kapitel davor eingefügt/entfernt: Segment-IDs mit dem neuen Spine-Index vergeben."""
+        segments = read_segments(self.workspace, file_name)
+        self.workspace.write_text(segments_name(file_name), "".join(
+            dump_segments(make_segments(spine_index, (segment["text"] for segment in segments)))))
+
+    def _discard_translation(self, file_name, existing_names):
+        """Entfernt veraltete Übersetzungen eines geänderten Kapitels."""
+        for name in (translation_name(file_name), failure_name(file_name)):
+            if name in existing_names:
+                self.workspace.remove(name)
+                self._log(f"Veraltete Übersetzung entfernt: {name}")
+        # Teilübersetzungen eines abgebrochenen Laufs passen nicht mehr
+        self.workspace.clear_chunks(file_name)
+
+    def _extract_documents(self, documents):
+        """
+        Konvertiert die Dokumente und schreibt eine Textdatei pro Kapitel, ihre
+        Absätze mit stabilen IDs ('.segments.jsonl', siehe segments.py) sowie
+        das Manifest (Kapitel in Lesereihenfolge) für Übersetzer und Merger.
+
+        Die Extraktion ist inkrementell: Kapitel, deren Quelldokument sich seit dem
+        letzten Lauf nicht geändert hat, werden weder konvertiert noch geschrieben.
+        Geänderte Kapitel behalten ihren Dateinamen; ihre alte Übersetzung wird
+        entfernt, damit sie neu übersetzt werden. Ein nur verschobenes Kapitel
+        (gleicher Text, anderer Spine-Index) behält seine Übersetzung und
+        bekommt neue Segment-IDs.
+
+        Args:
+            documents (list[EpubDocument]): Die Dokumente in Lesereihenfolge.
+        """
         # Erstelle Ausgabeverzeichnis
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self._log(f"Extrahiere Dateien nach: {self.output_dir}")
+        self.workspace.prepare()
+        self._log(f"Extrahiere Dateien nach: {self.workspace}")
+
+        settings = self._extraction_settings()
+        existing_names = self.workspace.names()
+        previous = {}
+        manifest = self.workspace.load_manifest()
+        if manifest is not None:
+            previous = {chapter["href"]: chapter for chapter in manifest["chapters"]}
+        same_settings = manifest is not None and manifest.get("extraction") == settings
+
+        # Dateinamen, die bereits einem anderen Quelldokument gehören
+        reserved_names = {chapter["file"]: href for href, chapter in previous.items()}
+
+        # Unveränderte Dokumente müssen nicht einmal entpackt werden
+        # (Fehlt nur die Textdatei, wird sie schnell aus den Segmenten erzeugt.)
+        unchanged = set()
+        if same_settings:
+            for item in documents:
+                chapter = previous.get(item.href)
+                if (chapter and item.fingerprint
+                        and chapter.get("source_fingerprint") == item.fingerprint
+                        and segments_name(chapter["file"]) in existing_names):
+                    unchanged.add(item.index)
+
+        # Nicht-Inhalt (Inhaltsverzeichnis, Impressum, Register, linear="no", ...)
+        categories = {}
+        if self.skip_types:
+            for item in documents:
+                if item.index not in unchanged:
+                    categories[item.index] = self._classify(item)
+        skipped = {}      # Kategorie -> [Dokumente, Zeichen]
+
+        # Riesige Dokumente werden nicht im Pool, sondern gestreamt konvertiert
+        streamed = {item.index for item in documents
+                    if item.index not in unchanged and self._should_stream(item)}
 
         # Zähler für Kapitel ohne klaren Titel, um Kollisionen zu vermeiden
         count = 1
 
         # Wir iterieren durch die Dokumente des Buches
-        items = list(book.get_items_of_type(ebooklib.ITEM_DOCUMENT))
-        total_items = len(items)
+        total_items = len(documents)
         processed_count = 0
+        chapters = []
+        used_names = set()
+        written_count = 0
 
-        for item in items:
+        removed_chars = removed_bytes = 0
+        for item, text, found_title, removed in self._convert_documents(documents, unchanged | streamed):
             processed_count += 1
             if self.progress_callback:
                 self.progress_callback(processed_count, total_items)
-            
+
+            chapter = previous.get(item.href)
+            if item.index in unchanged:
+                # Unverändert seit dem letzten Lauf
+                if chapter["spine_index"] != item.index:
+                    self._restamp_segments(chapter["file"], item.index)
+                if chapter["file"] not in existing_names:
+                    rebuild_text(self.workspace, chapter["file"])
+                    self._log(f"Aus Segmenten wiederhergestellt: {chapter['file']}")
+                    written_count += 1
+                chapter = dict(chapter, spine_index=item.index)
+                chapters.append(chapter)
+                used_names.add(chapter["file"])
+                count += 1
+                removed_chars += chapter.get("removed_chars", 0)
+                removed_bytes += chapter.get("removed_bytes", 0)
+                continue
+
+            tmp_file = None
+            if item.index in streamed:
+                self._log(f"Konvertiere gestreamt: {item.href}")
+                tmp_file, found_title, stats, removed = self._stream_to_file(item)
+            else:
+                stats = TextStats(text)
+
             # Wir überspringen Navigationsdateien u.ä., falls möglich,
             # aber oft enthalten Dokumente den eigentlichen Text.
 
-            content = item.get_content()
-            text, found_title = self._html_to_text(content)
-
-            # Wenn die Datei fast leer ist, überspringen (oft leere Wrapper)
-            if len(text.strip()) < 10:
+            # Wenn die Datei fast leer ist, überspringen (oft leere Wrapper).
+            # Der Text ist bereits an den Rändern bereinigt.
+            category = categories.get(item.index)
+            if stats.chars < 10 or category in self.skip_types:
+                if tmp_file:
+                    tmp_file.unlink()
+                if stats.chars >= 10:
+                    self._log(f"Übersprungen ({category}): {item.href}")
+                    counts = skipped.setdefault(category, [0, 0])
+                    counts[0] += 1
+                    counts[1] += stats.chars
                 continue
 
-            # Bestimme den Dateinamen
-            if found_title:
-                filename = self._sanitize_filename(found_title)
+            if chapter and chapter["file"] not in used_names:
+                # Bekanntes Quelldokument behält seinen Dateinamen
+                full_filename = chapter["file"]
             else:
-                filename = f"Kapitel_{count:03d}"
+                # Bestimme den Dateinamen
+                if found_title:
+                    filename = self._sanitize_filename(found_title)
+                else:
+                    filename = f"Kapitel_{count:03d}"
 
-            # Dateiendung hinzufügen
-            full_filename = f"{filename}.txt"
+                # Dateiendung hinzufügen
+                full_filename = f"{filename}.txt"
 
-            # Überprüfen, ob Datei schon existiert (bei doppelten Kapitelnamen)
-            output_file = self.output_dir / full_filename
-            dup_counter = 1
-            while output_file.exists():
-                full_filename = f"{filename}_{dup_counter}.txt"
-                output_file = self.output_dir / full_filename
-                dup_counter += 1
+                # Doppelte Kapitelnamen: Namen aus diesem Lauf und aus dem Manifest
+                # (andere Quelldokumente) sind vergeben
+                dup_counter = 1
+                while (full_filename in used_names
+                       or reserved_names.get(full_filename, item.href) != item.href):
+                    full_filename = f"{filename}_{dup_counter}.txt"
+                    dup_counter += 1
+
+            used_names.add(full_filename)
+            same_text = (chapter and chapter["file"] == full_filename
+                         and chapter["sha256"] == stats.sha256
+                         and full_filename in existing_names
+                         and segments_name(full_filename) in existing_names)
+            if same_text:
+                # Text unverändert (z.B. nur Markup geändert oder Kapitel verschoben):
+                # nichts schreiben, die Übersetzung bleibt gültig
+                if tmp_file:
+                    tmp_file.unlink()
+                segment_count = chapter.get("segments")
+                if chapter["spine_index"] != item.index:
+                    self._restamp_segments(full_filename, item.index)
+            elif tmp_file:
+                segments_file, segment_count = self._segment_file(item, tmp_file)
+            else:
+                segments = list(make_segments(item.index, split_segments(text)))
+                segment_count = len(segments)
+
+            entry = chapter_entry(item.index, item.href, found_title, full_filename, stats,
+                                  source_fingerprint=item.fingerprint, removed=removed,
+                                  segments=segment_count)
+            chapters.append(entry)
+            count += 1
+            removed_chars += removed[0]
+            removed_bytes += removed[1]
+
+            if same_text:
+                continue
+
+            if chapter and chapter["file"] == full_filename:
+                self._discard_translation(full_filename, existing_names)
 
             # Speichern
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(text)
+            if tmp_file:
+                self.workspace.import_file(segments_file, segments_name(full_filename))
+                self.workspace.import_file(tmp_file, full_filename)
+            else:
+                self.workspace.write_text(segments_name(full_filename), "".join(dump_segments(segments)))
+                self.workspace.write_text(full_filename, text)
+            written_count += 1
 
             self._log(f"Gespeichert: {full_filename}")
-            count += 1
 
-        self._log("\nExtraktion abgeschlossen.")
+        self.workspace.save_manifest(chapters, source=self.epub_path.name, extraction=settings)
+        self._log(f"{len(chapters) - written_count} Kapitel unverändert, {written_count} geschrieben.")
+        if skipped:
+            skipped_chars = sum(chars for _, chars in skipped.values())
+            details = ", ".join(f"{category}: {docs}" for category, (docs, _) in sorted(skipped.items()))
+            self._log(f"Nicht-Inhalt übersprungen ({details}): {skipped_chars} Zeichen, "
+                      f"ca. {estimate_tokens_from_chars(skipped_chars)} Tokens eingespart.")
+        if removed_chars:
+            total_chars = removed_chars + sum(chapter["chars"] for chapter in chapters)
+            self._log(f"Bereinigung: {removed_bytes / 1024:.1f} KB entfernt "
+                      f"({100 * removed_chars / total_chars:.1f} % des Textes), "
+                      f"ca. {estimate_tokens_from_chars(removed_chars)} Tokens eingespart.")
 
 
 def main():
@@ -193,18 +1256,71 @@ def main():
     )
     parser.add_argument(
         "-o", "--output",
-        help="Optional: Zielordner für die Textdateien.",
+        help="Optional: Zielordner für die Textdateien oder Workspace-Datei (.sqlite).",
         default=None
     )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="auto",
+        help="Leseverfahren: 'stream' (nur Spine-Dokumente aus dem ZIP), "
+             "'ebooklib' (ganzes Buch laden) oder 'auto' (stream mit Rückfall auf ebooklib)."
+    )
+    parser.add_argument(
+        "--parser",
+        choices=HTML_PARSERS,
+        default="auto",
+        help="HTML-Konverter: 'lxml' (schnell), 'html.parser' (BeautifulSoup) "
+             "oder 'auto' (lxml, falls installiert)."
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Anzahl Prozesse für die HTML-Konvertierung (Standard: 1, 0 = alle CPU-Kerne)."
+    )
+    parser.add_argument(
+        "--skip-types",
+        default=",".join(DEFAULT_SKIP_TYPES),
+        help="Kommagetrennte Kategorien, die nicht extrahiert und damit nicht übersetzt "
+             "werden ('none' = alles extrahieren). Standard: %(default)s"
+    )
+    parser.add_argument(
+        "--stream-threshold",
+        type=float,
+        default=DEFAULT_STREAM_THRESHOLD / (1024 * 1024),
+        help="Dokumente ab dieser Größe (MB) gestreamt konvertieren, ohne sie ganz "
+             "in den Speicher zu laden (Standard: %(default)g, 0 = immer)."
+    )
+    parser.add_argument(
+        "--no-clean",
+        action="store_true",
+        help="Text nicht bereinigen (Seitenumbrüche, versteckte Elemente und weiche "
+             "Trennzeichen bleiben erhalten)."
+    )
+    parser.add_argument(
+        "--strip-running-headers",
+        action="store_true",
+        help="Wiederkehrende Kolumnentitel mit Seitenzahl (z.B. 'DER ROMAN 123' aus "
+             "OCR-Scans) entfernen. Kann kurze nummerierte Überschriften im "
+             "Seitenabstand ('Tag 12', 'Tag 13') mit erfassen."
+    )
 
     args = parser.parse_args()
+    skip_types = [t.strip() for t in args.skip_types.split(",") if t.strip() and t.strip() != "none"]
 
     try:
-        extractor = EpubChapterExtractor(args.epub_datei, args.output)
+        extractor = EpubChapterExtractor(args.epub_datei, args.output,
+                                         backend=args.backend, parser=args.parser,
+                                         jobs=args.jobs,
+                                         stream_threshold=int(args.stream_threshold * 1024 * 1024),
+                                         skip_types=skip_types, clean=not args.no_clean,
+                                         strip_headers=args.strip_running_headers)
         extractor.process()
     except Exception as e:
         print(f"Ein Fehler ist aufgetreten: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
+    freeze_support()
     main()
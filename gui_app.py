@@ -6,13 +6,14 @@ import json
 import time
 import os
 import traceback
+from multiprocessing import freeze_support
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QLineEdit, QPushButton, QFileDialog, QTextEdit, 
     QProgressBar, QGroupBox, QFormLayout, QSpinBox, QMessageBox,
-    QSplitter
+    QSplitter, QComboBox, QCheckBox
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QObject
 
@@ -20,8 +21,10 @@ from PyQt6.QtCore import Qt, QThread, pyqtSignal, QObject
 # Wir gehen davon aus, dass die Dateien im selben Verzeichnis liegen
 try:
     from extract_book import EpubChapterExtractor
-    from translate_book import KimiTranslator
+    from translate_book import KimiTranslator, TranslationCancelled, ENGINES
     from create_open_document import OdtMerger
+    from rate_limit import lookup_limits, set_limits
+    from translation_cache import default_cache_path
 except ImportError as e:
     print(f"Fehler beim Importieren der Module: {e}")
     print("Bitte stellen Sie sicher, dass extract_book.py, translate_book.py und create_open_document.py im selben Verzeichnis sind.")
@@ -37,9 +40,12 @@ class WorkerSignals(QObject):
     log = pyqtSignal(str)
     finished = pyqtSignal()
     error = pyqtSignal(str)
+    concurrency = pyqtSignal(int) # aktuelle Parallelität (adaptiv)
+    chunk_progress = pyqtSignal(str) # Fortschritt des zuletzt gestreamten Teilstücks
 
 class Worker(QThread):
-    def __init__(self, epub_path, output_dir, api_key, base_url, model_name, workers):
+    def __init__(self, epub_path, output_dir, api_key, base_url, model_name, workers, engine="async",
+                 adaptive=False, rpm=None, tpm=None, use_cache=True, pack=False, stream=False, hedge=False):
         super().__init__()
         self.epub_path = Path(epub_path)
         self.output_dir = Path(output_dir)
@@ -47,6 +53,14 @@ class Worker(QThread):
         self.base_url = base_url
         self.model_name = model_name
         self.workers = workers
+        self.engine = engine
+        self.adaptive = adaptive
+        self.rpm = rpm
+        self.tpm = tpm
+        self.use_cache = use_cache
+        self.pack = pack
+        self.stream = stream
+        self.hedge = hedge
         self.signals = WorkerSignals()
         self.is_running = True
 
@@ -98,18 +112,34 @@ class Worker(QThread):
             self.log_message("\n--- Phase 2: Übersetzung ---")
             
             # Callback Wrapper für Translator
+            # Der Übersetzer erkennt den Abbruch an TranslationCancelled (keine Failure-Dateien)
             def translate_progress(current, total):
-                if not self.is_running: raise Exception("Vom Benutzer abgebrochen.")
+                if not self.is_running: raise TranslationCancelled("Vom Benutzer abgebrochen.")
                 self.report_progress(current, total, f"Übersetze Datei {current}/{total}")
 
+            def chunk_progress(label, received, expected):
+                if not self.is_running: raise TranslationCancelled("Vom Benutzer abgebrochen.")
+                # Die Übersetzung ist meist etwa so lang wie das Original
+                self.signals.chunk_progress.emit(f"{label}: {min(received / expected, 0.99):.0%}")
+
             translator = KimiTranslator(
                 input_dir=extractor.output_dir, # Nutze das Verzeichnis vom Extractor
                 api_key=self.api_key,
                 base_url=self.base_url,
                 model_name=self.model_name,
                 max_workers=self.workers,
+                engine=self.engine,
+                adaptive=self.adaptive,
+                rpm=self.rpm,
+                tpm=self.tpm,
+                cache_path=default_cache_path() if self.use_cache else None,
+                pack=self.pack,
+                stream=self.stream,
+                hedge=self.hedge,
+                chunk_progress_callback=chunk_progress,
                 log_callback=self.log_message,
-                progress_callback=translate_progress
+                progress_callback=translate_progress,
+                concurrency_callback=self.signals.concurrency.emit
             )
             translator.process_files()
 
@@ -167,6 +197,13 @@ class MainWindow(QMainWindow):
             "base_url": "https://api.moonshot.ai/v1",
             "model_name": "kimi-k2.5",
             "workers": 3,
+            "engine": "async",
+            "adaptive": False,
+            "rate_limits": [],
+            "use_cache": True,
+            "pack": False,
+            "stream": False,
+            "hedge": False,
             "last_epub_dir": str(Path.home()),
             "last_output_dir": str(Path.home())
         }
@@ -252,10 +289,58 @@ class MainWindow(QMainWindow):
         settings_layout.addRow("Model Name:", self.model_edit)
 
         self.workers_spin = QSpinBox()
-        self.workers_spin.setRange(1, 10)
+        # Die async-Engine hält problemlos 50-200 Anfragen gleichzeitig offen
+        self.workers_spin.setRange(1, 200)
         self.workers_spin.setValue(self.config.get("workers", 3))
         settings_layout.addRow("Parallele Worker:", self.workers_spin)
 
+        self.engine_combo = QComboBox()
+        self.engine_combo.addItems(ENGINES)
+        self.engine_combo.setCurrentText(self.config.get("engine", "async"))
+        settings_layout.addRow("Engine:", self.engine_combo)
+
+        # Passt die Parallelität an die API an (429/Latenz), Worker = Obergrenze
+        self.adaptive_check = QCheckBox("Parallelität automatisch anpassen (Worker = Obergrenze)")
+        self.adaptive_check.setChecked(self.config.get("adaptive", False))
+        settings_layout.addRow("", self.adaptive_check)
+
+        # Kontingente gelten je Base URL und Modell (0 = unbegrenzt)
+        self.rpm_spin = QSpinBox()
+        self.rpm_spin.setRange(0, 1000000)
+        self.rpm_spin.setSpecialValueText("unbegrenzt")
+        settings_layout.addRow("Anfragen/Minute:", self.rpm_spin)
+
+        self.tpm_spin = QSpinBox()
+        self.tpm_spin.setRange(0, 100000000)
+        self.tpm_spin.setSingleStep(10000)
+        self.tpm_spin.setSpecialValueText("unbegrenzt")
+        settings_layout.addRow("Tokens/Minute:", self.tpm_spin)
+
+        # Bereits übersetzte Abschnitte (auch aus anderen Büchern) nicht erneut bezahlen
+        self.cache_check = QCheckBox("Übersetzungsspeicher verwenden")
+        self.cache_check.setChecked(self.config.get("use_cache", True))
+        self.cache_check.setToolTip(str(default_cache_path()))
+        settings_layout.addRow("", self.cache_check)
+
+        # Viele winzige Dateien (Zwischentitel, Epigraphe) mit einer Anfrage übersetzen
+        self.pack_check = QCheckBox("Kleine Kapitel gebündelt übersetzen")
+        self.pack_check.setChecked(self.config.get("pack", False))
+        settings_layout.addRow("", self.pack_check)
+
+        # Fortschritt innerhalb langer Abschnitte; Abbrüche gehen nicht verloren
+        self.stream_check = QCheckBox("Antworten streamen (Fortschritt je Abschnitt)")
+        self.stream_check.setChecked(self.config.get("stream", False))
+        settings_layout.addRow("", self.stream_check)
+
+        # Ausreißer der Latenz abfangen: eine zu langsame Anfrage ein zweites Mal senden
+        self.hedge_check = QCheckBox("Langsame Anfragen doppelt senden (nur Engine async)")
+        self.hedge_check.setChecked(self.config.get("hedge", False))
+        settings_layout.addRow("", self.hedge_check)
+
+        self.load_rate_limits()
+        self.base_url_edit.editingFinished.connect(self.load_rate_limits)
+        self.model_edit.editingFinished.connect(self.load_rate_limits)
+
         settings_group.setLayout(settings_layout)
         main_layout.addWidget(settings_group)
 
@@ -283,14 +368,27 @@ class MainWindow(QMainWindow):
         self.progress_bar.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(self.progress_bar)
 
+        status_layout = QHBoxLayout()
         self.status_label = QLabel("Bereit")
-        main_layout.addWidget(self.status_label)
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        self.chunk_progress_label = QLabel("")
+        status_layout.addWidget(self.chunk_progress_label)
+        self.concurrency_label = QLabel("")
+        status_layout.addWidget(self.concurrency_label)
+        main_layout.addLayout(status_layout)
 
         self.log_view = QTextEdit()
         self.log_view.setReadOnly(True)
         self.log_view.setStyleSheet("font-family: monospace; font-size: 10pt;")
         main_layout.addWidget(self.log_view)
 
+    def load_rate_limits(self):
+        """Zeigt die gespeicherten Kontingente für die eingestellte Base URL und das Modell."""
+        rpm, tpm = lookup_limits(self.config.get("rate_limits"), self.base_url_edit.text(), self.model_edit.text())
+        self.rpm_spin.setValue(rpm or 0)
+        self.tpm_spin.setValue(tpm or 0)
+
     def browse_epub(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
@@ -321,6 +419,14 @@ class MainWindow(QMainWindow):
         base_url = self.base_url_edit.text()
         model_name = self.model_edit.text()
         workers = self.workers_spin.value()
+        engine = self.engine_combo.currentText()
+        adaptive = self.adaptive_check.isChecked()
+        rpm = self.rpm_spin.value()
+        tpm = self.tpm_spin.value()
+        use_cache = self.cache_check.isChecked()
+        pack = self.pack_check.isChecked()
+        stream = self.stream_check.isChecked()
+        hedge = self.hedge_check.isChecked()
 
         if not epub_path or not os.path.exists(epub_path):
             QMessageBox.warning(self, "Fehler", "Bitte eine gültige EPUB Datei auswählen.")
@@ -339,7 +445,14 @@ class MainWindow(QMainWindow):
             "api_key": api_key,
             "base_url": base_url,
             "model_name": model_name,
-            "workers": workers
+            "workers": workers,
+            "engine": engine,
+            "adaptive": adaptive,
+            "use_cache": use_cache,
+            "pack": pack,
+            "stream": stream,
+            "hedge": hedge,
+            "rate_limits": set_limits(self.config.get("rate_limits"), base_url, model_name, rpm, tpm)
         })
         self.save_config()
 
@@ -349,13 +462,18 @@ class MainWindow(QMainWindow):
         self.log_view.clear()
         self.progress_bar.setValue(0)
         self.status_label.setText("Starte...")
+        self.concurrency_label.setText("")
+        self.chunk_progress_label.setText("")
         
         # Worker starten
-        self.worker = Worker(epub_path, output_dir, api_key, base_url, model_name, workers)
+        self.worker = Worker(epub_path, output_dir, api_key, base_url, model_name, workers, engine, adaptive,
+                             rpm or None, tpm or None, use_cache, pack, stream, hedge)
         self.worker.signals.log.connect(self.append_log)
         self.worker.signals.progress.connect(self.update_progress)
         self.worker.signals.finished.connect(self.process_finished)
         self.worker.signals.error.connect(self.process_error)
+        self.worker.signals.concurrency.connect(self.update_concurrency)
+        self.worker.signals.chunk_progress.connect(self.chunk_progress_label.setText)
         
         self.worker.start()
 
@@ -377,8 +495,12 @@ class MainWindow(QMainWindow):
             self.progress_bar.setValue(percentage)
         self.status_label.setText(f"{status_text} ({current}/{total})")
 
+    def update_concurrency(self, level):
+        self.concurrency_label.setText(f"Parallelität: {level}")
+
     def process_finished(self):
         self.status_label.setText("Abgeschlossen.")
+        self.chunk_progress_label.setText("")
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         QMessageBox.information(self, "Erfolg", "Der Vorgang wurde erfolgreich abgeschlossen.")
@@ -417,4 +539,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Nötig für den Prozess-Pool der Extraktion in gepackten Programmen (PyInstaller)
+    freeze_support()
     main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Abgesicherte Anfragen gegen Ausreißer der Latenz (Hedging).
+
+Einzelne Anfragen brauchen ein Vielfaches des Medians und halten am Ende
+eines Laufs das letzte Kapitel auf. Dauert eine Anfrage länger als ein
+Perzentil (Standard: p95) der bisher gemessenen Latenzen, geht dieselbe
+Anfrage ein zweites Mal hinaus; die erste erfolgreiche Antwort gilt, die
+andere wird abgebrochen.
+
+Gemessen wird die Latenz je 1000 Zeichen (kleinere Anfragen zählen wie
+1000 Zeichen), damit lange Teilstücke nicht als Ausreißer gelten. Die
+Messwerte liegen in einem Histogramm mit logarithmischen Klassen. Die
+zusätzlichen Anfragen sind auf einen Anteil der angefragten Tokens
+begrenzt (Standard: 10 %).
+"""
+
+import math
+import threading
+
+HEDGE_PERCENTILE = 0.95
+HEDGE_BUDGET = 0.1
+# Erst ab so vielen Messwerten wird abgesichert
+MIN_SAMPLES = 20
+
+
+class LatencyHistogram:
+    """Häufigkeiten von Messwerten in logarithmischen Klassen (je etwa 9 % breit)."""
+
+    def __init__(self, smallest=0.001, growth=2 ** 0.125):
+        self.smallest = smallest
+        self.growth = growth
+        self.counts = {}
+        self.total = 0
+
+    def add(self, value):
+        index = max(0, math.ceil(math.log(max(value, self.smallest) / self.smallest, self.growth)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+
+    def percentile(self, fraction):
+        """Obere Grenze der Klasse, in der das Perzentil liegt, oder None ohne Messwerte."""
+        if not self.total:
+            return None
+        rank = fraction * self.total
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return self.smallest * self.growth ** index
+        return self.smallest * self.growth ** max(self.counts)
+
+
+class HedgePolicy:
+    """
+    Entscheidet, wann eine Anfrage ein zweites Mal gesendet wird, und zählt
+    die Duplikate (thread-sicher).
+
+    Verwendung:
+        delay = policy.threshold(len(text))    # None: nicht absichern
+        ... nach delay Sekunden ohne Antwort:
+        if policy.fire(tokens): zweite Anfrage senden
+        ... policy.won(tokens), wenn das Duplikat zuerst erfolgreich antwortet
+
+    Attribute:
+        fired (int): Gesendete Duplikate.
+        wins (int): Duplikate, die schneller waren als die erste Anfrage.
+        skipped (int): Wegen des Budgets nicht gesendete Duplikate.
+        extra_tokens (int): Geschätzte Tokens der Duplikate.
+    """
+
+    def __init__(self, percentile=HEDGE_PERCENTILE, budget=HEDGE_BUDGET, min_samples=MIN_SAMPLES,
+                 min_size=1000):
+        """
+        Args:
+            percentile (float): Perzentil der Latenz, ab dem abgesichert wird (0.5 bis 0.999).
+            budget (float): Höchstens dieser Anteil zusätzlicher Tokens (0.1 = 10 %).
+            min_samples (int): Mindestzahl an Messwerten vor dem ersten Duplikat.
+            min_size (int): Kleinere Anfragen zählen wie diese Größe (Zeichen).
+        """
+        if not 0.5 <= percentile < 1:
+            raise ValueError(f"Ungültiges Perzentil für das Hedging: {percentile}")
+        if budget < 0:
+            raise ValueError(f"Ungültiges Budget für das Hedging: {budget}")
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_size = min_size
+        self.histogram = LatencyHistogram()
+        self.fired = 0
+        self.wins = 0
+        self.skipped = 0
+        self.extra_tokens = 0
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def _scale(self, size):
+        return max(size, self.min_size) / 1000
+
+    def record(self, latency, size, tokens=0):
+        """
+        Meldet die Dauer einer erfolgreichen Anfrage und ihre geschätzten Tokens.
+
+        Die Tokens sind die Basis des Budgets und zählen nur für erste Anfragen;
+        für Duplikate ist tokens 0, sonst würde jedes Duplikat das Budget für
+        weitere vergrößern (siehe won).
+        """
+        with self._lock:
+            self.histogram.add(latency / self._scale(size))
+            self._tokens += tokens
+
+    def threshold(self, size):
+        """Wartezeit in Sekunden, nach der eine Anfrage dieser Größe abgesichert wird, oder None."""
+        with self._lock:
+            if self.histogram.total < self.min_samples:
+                return None
+            return self.histogram.percentile(self.percentile) * self._scale(size)
+
+    def fire(self, tokens):
+        """
+        Prüft das Budget für ein Duplikat mit tokens geschätzten Tokens und bucht es.
+
+        Returns:
+            bool: True, wenn das Duplikat gesendet werden soll.
+        """
+        with self._lock:
+            if self.extra_tokens + tokens > self.budget * self._tokens:
+                self.skipped += 1
+                return False
+            self.fired += 1
+            self.extra_tokens += tokens
+            return True
+
+    def won(self, tokens=0):
+        """
+        Das Duplikat hat zuerst geantwortet. Die abgebrochene erste Anfrage hat
+        nichts gemeldet; ihre geschätzten Tokens zählen hier zur Basis des Budgets.
+        """
+        with self._lock:
+            self.wins += 1
+            self._tokens += tokens
+
+    def describe(self):
+        """Zusammenfassung für das Log."""
+        with self._lock:
+            text = (f"{self.fired} Duplikate, {self.wins} davon schneller, "
+                    f"etwa {self.extra_tokens} zusätzliche Tokens")
+            if self.skipped:
+                text += f", {self.skipped} wegen des Budgets ausgelassen"
+            return text
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mehrere kleine Kapitel in einer Anfrage übersetzen (Pakete).
+
+Zerlegte EPUBs bestehen oft aus hunderten Dateien mit wenigen hundert
+Zeichen (Zwischentitel, Epigraphe, kurze Szenen). Einzeln angefragt
+bestimmen Systemprompt und Latenz je Anfrage die Kosten. Ein Paket
+verbindet solche Texte mit nummerierten Trennzeilen:
+
+    <<<#1>>>
+    Erster Text
+    <<<#2>>>
+    Zweiter Text
+    <<<#END>>>
+
+Die Antwort wird an denselben Marken wieder aufgeteilt (auch wenn das
+Modell sie nicht auf eine eigene Zeile setzt). Fehlt eine Marke,
+ist sie doppelt, vertauscht oder ein Teil leer, gilt das Paket als
+unbrauchbar und die Texte werden einzeln übersetzt.
+"""
+
+import re
+
+# Höchstens so viele Texte in einem Paket
+PACK_MAX_FILES = 20
+
+PACK_INSTRUCTIONS = (
+    "The text consists of several independent sections. Each section starts with a "
+    "marker line such as <<<#1>>>, and the text ends with the line <<<#END>>>. "
+    "Translate every section separately and copy every marker line unchanged onto its own "
+    "line, in the same order. Do not merge, drop or reorder sections."
+)
+
+_MARKER = re.compile(r"<<<#(\d+|END)>>>")
+
+
+def _marker(label):
+    return f"<<<#{label}>>>"
+
+
+def pack_texts(texts):
+    """
+    Verbindet Texte zu einem Paket.
+
+    Args:
+        texts (list): Die einzelnen Texte in Reihenfolge.
+
+    Returns:
+        str: Der Pakettext mit Trennzeilen.
+    """
+    lines = []
+    for number, text in enumerate(texts, start=1):
+        lines.append(_marker(number))
+        lines.append(text.strip("\n"))
+    lines.append(_marker("END"))
+    return "\n".join(lines) + "\n"
+
+
+def unpack_texts(packed, count):
+    """
+    Teilt eine Paket-Antwort wieder auf und prüft sie.
+
+    Args:
+        packed (str): Die Antwort auf ein Paket aus pack_texts.
+        count (int): Anzahl der Texte im Paket.
+
+    Returns:
+        list: Die Teile in Reihenfolge oder None, wenn Marken fehlen, doppelt
+              oder vertauscht sind oder ein Teil leer ist.
+    """
+    if not packed:
+        return None
+    matches = list(_MARKER.finditer(packed))
+    expected = [str(number) for number in range(1, count + 1)] + ["END"]
+    if [match.group(1) for match in matches] != expected:
+        return None
+    pieces = []
+    for match, following in zip(matches, matches[1:]):
+        piece = packed[match.end():following.start()].strip()
+        if not piece:
+            return None
+        pieces.append(piece)
+    return pieces
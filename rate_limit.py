@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ratenbegrenzung für die API-Kontingente (Anfragen pro Minute und Tokens pro Minute).
+
+Anbieter wie Moonshot oder OpenAI begrenzen beides gleichzeitig. Der
+RateLimiter verwaltet dafür je einen Token-Bucket, der gleichmäßig knapp
+unter dem Kontingent nachläuft. Vor dem Senden wird eine geschätzte
+Tokenzahl abgebucht, nach der Antwort mit response.usage korrigiert.
+
+Die Kontingente stehen in einer JSON-Liste, je Eintrag optional base_url
+und model (fehlt ein Feld, gilt der Eintrag für alle):
+
+    [
+      {"base_url": "https://api.moonshot.ai/v1", "rpm": 200, "tpm": 2000000},
+      {"base_url": "https://api.moonshot.ai/v1", "model": "kimi-k2.5", "tpm": 1000000}
+    ]
+
+Spezifischere Einträge überschreiben allgemeinere.
+"""
+
+import json
+import time
+import threading
+
+# Anteil des Kontingents, der genutzt wird (Puffer für Uhren und Schätzfehler)
+DEFAULT_HEADROOM = 0.95
+# So viele Sekunden Kontingent dürfen auf einmal verbraucht werden (Burst)
+DEFAULT_BURST_SECONDS = 5
+
+
+class TokenBucket:
+    """
+    Token-Bucket mit Vorausbuchung: Eine Buchung darf den Stand ins Minus
+    ziehen, der Aufrufer wartet dann, bis das Minus wieder nachgelaufen ist.
+    Damit entstehen keine Wettläufe zwischen gleichzeitigen Anfragen.
+    """
+
+    def __init__(self, per_minute, headroom=DEFAULT_HEADROOM, burst_seconds=DEFAULT_BURST_SECONDS):
+        self.rate = per_minute * headroom / 60.0
+        self.capacity = self.rate * burst_seconds
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount, now):
+        """Bucht amount ab und liefert die Wartezeit in Sekunden, bis es gedeckt ist."""
+        self._refill(now)
+        self.level -= amount
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount, now):
+        """Gibt amount zurück (negativ: bucht nach)."""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """
+    Hält Anfragen pro Minute (rpm) und Tokens pro Minute (tpm) ein.
+
+    Verwendung:
+        time.sleep(limiter.reserve(estimated_tokens))     # bzw. await asyncio.sleep(...)
+        response = ...
+        limiter.correct(estimated_tokens, response.usage.total_tokens)
+
+    Thread-sicher; die Wartezeit schläft der Aufrufer selbst, damit die
+    Klasse für Threads und asyncio gleichermaßen taugt.
+    """
+
+    def __init__(self, rpm=None, tpm=None, headroom=DEFAULT_HEADROOM):
+        """
+        Args:
+            rpm (int, optional): Anfragen pro Minute (None/0 = unbegrenzt).
+            tpm (int, optional): Tokens pro Minute (None/0 = unbegrenzt).
+            headroom (float): Genutzter Anteil der Kontingente.
+        """
+        self.rpm = rpm or None
+        self.tpm = tpm or None
+        self._requests = TokenBucket(rpm, headroom) if rpm else None
+        self._tokens = TokenBucket(tpm, headroom) if tpm else None
+        self._lock = threading.Lock()
+        self.waited = 0.0   # Summe aller Wartezeiten in Sekunden
+
+    def reserve(self, tokens):
+        """
+        Bucht eine Anfrage mit geschätzt tokens Tokens ab.
+
+        Returns:
+            float: Sekunden, die vor dem Senden zu warten sind.
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self._requests:
+                delay = max(delay, self._requests.reserve(1, now))
+            if self._tokens:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+            self.waited += delay
+            return delay
+
+    def correct(self, estimated, actual):
+        """Korrigiert eine Buchung um die tatsächliche Tokenzahl (aus response.usage)."""
+        if not self._tokens or actual is None:
+            return
+        with self._lock:
+            self._tokens.refund(estimated - actual, time.monotonic())
+
+    def describe(self):
+        parts = []
+        if self.rpm:
+            parts.append(f"{self.rpm} Anfragen/min")
+        if self.tpm:
+            parts.append(f"{self.tpm} Tokens/min")
+        return ", ".join(parts) or "unbegrenzt"
+
+
+def _matches(entry, base_url, model):
+    entry_url = entry.get("base_url")
+    return ((entry_url is None or entry_url.rstrip("/") == base_url.rstrip("/"))
+            and entry.get("model") in (None, model))
+
+
+def lookup_limits(entries, base_url, model):
+    """
+    Sucht die Kontingente für base_url und model.
+
+    Args:
+        entries (list): Einträge wie in der Moduldokumentation.
+        base_url (str): Basis-URL der API.
+        model (str): Modellname.
+
+    Returns:
+        tuple: (rpm, tpm), jeweils None, wenn nicht festgelegt.
+    """
+    limits = {}
+    matching = [entry for entry in entries or [] if _matches(entry, base_url, model)]
+    # Allgemeine Einträge zuerst, spezifischere überschreiben sie
+    for entry in sorted(matching, key=lambda entry: ("base_url" in entry) + ("model" in entry)):
+        limits.update({key: entry[key] for key in ("rpm", "tpm") if key in entry})
+    return limits.get("rpm") or None, limits.get("tpm") or None
+
+
+def set_limits(entries, base_url, model, rpm, tpm):
+    """
+    Legt die Kontingente für genau base_url und model fest (ersetzt einen vorhandenen Eintrag).
+
+    Returns:
+        list: Die geänderte Liste.
+    """
+    entries = [entry for entry in entries or []
+               if not (entry.get("base_url") == base_url and entry.get("model") == model)]
+    entries.append({"base_url": base_url, "model": model, "rpm": rpm or 0, "tpm": tpm or 0})
+    return entries
+
+
+def load_limits(path):
+    """Liest die Kontingent-Liste aus einer JSON-Datei."""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: Erwartet wird eine Liste von Einträgen.")
+    return entries
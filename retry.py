@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Wartezeiten für wiederholte API-Anfragen.
+
+Exponentieller Backoff mit Jitter, damit sich viele gleichzeitig
+abgewiesene Anfragen nicht im selben Takt wiederholen. Nennt der Server
+eine Wartezeit (Retry-After), wird mindestens so lange gewartet, höchstens
+aber max_delay: ein Header wie "Retry-After: 3600" oder ein weit in der
+Zukunft liegendes Datum würde den Lauf sonst stundenlang anhalten.
+"""
+
+import time
+import random
+from email.utils import parsedate_to_datetime
+
+
+class RetryPolicy:
+    """
+    Attribute:
+        max_retries (int): Wiederholungen nach dem ersten Versuch (0 = keine).
+        base_delay (float): Wartezeit vor der ersten Wiederholung in Sekunden.
+        max_delay (float): Obergrenze des Backoffs und der Wartezeit aus Retry-After
+                           in Sekunden.
+    """
+
+    def __init__(self, max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Wartezeit vor einer Wiederholung.
+
+        Args:
+            attempt (int): Nummer der Wiederholung (1 = erste).
+            retry_after (float, optional): Vom Server verlangte Wartezeit in Sekunden
+                                           (wird auf max_delay begrenzt).
+
+        Returns:
+            float: Sekunden.
+        """
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        # Halb fest, halb zufällig: wächst sicher und streut trotzdem
+        delay = backoff / 2 + random.uniform(0, backoff / 2)
+        if retry_after is not None:
+            retry_after = min(retry_after, self.max_delay)
+            delay = max(delay, retry_after + random.uniform(0, self.base_delay / 2))
+        return delay
+
+
+def retry_after_seconds(error):
+    """
+    Liest die vom Server verlangte Wartezeit aus einer Fehlerantwort.
+
+    Ausgewertet werden 'retry-after-ms' und 'retry-after' (Sekunden oder HTTP-Datum).
+
+    Returns:
+        float: Sekunden oder None, wenn der Server keine nennt.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
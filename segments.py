@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Absätze (Segmente) eines Kapitels mit stabilen IDs.
+
+Der Extractor zerlegt jedes Kapitel an den Leerzeilen in Absätze und speichert
+sie neben der Textdatei als 'Kapitel.segments.jsonl' (eine JSON-Zeile pro
+Absatz). Die ID setzt sich aus Spine-Index, Position im Kapitel und einem
+Hash des Absatzes zusammen, z.B. "0012-00034-3fa9c1d2e4b7". Nachfolgende
+Stufen können so einzelne Absätze adressieren und wiederverwenden.
+
+Die flache Textdatei ist genau die Verkettung der Segmente mit einer
+Leerzeile dazwischen und lässt sich ohne das EPUB daraus neu erzeugen:
+
+    python segments.py rebuild buch_ordner
+"""
+
+import sys
+import json
+import argparse
+
+from book_manifest import content_hash, segments_name
+from workspace import open_workspace
+
+
+SEGMENT_SEPARATOR = "\n\n"
+SEGMENT_HASH_LENGTH = 12
+
+
+def segment_id(spine_index, position, text):
+    """Stabile ID eines Absatzes: Spine-Index, Position und Inhalts-Hash."""
+    return f"{spine_index:04d}-{position:05d}-{content_hash(text)[:SEGMENT_HASH_LENGTH]}"
+
+
+def split_segments(text):
+    """Zerlegt einen Kapiteltext in Absätze (Umkehrung von segments_to_text)."""
+    return text.split(SEGMENT_SEPARATOR) if text else []
+
+
+def iter_segments(pieces):
+    """
+    Wie split_segments, aber für beliebig geschnittene Textstücke (gestreamte Kapitel).
+
+    Yields:
+        str: Die Absätze in Reihenfolge.
+    """
+    rest = ""
+    started = False
+    for piece in pieces:
+        started = started or bool(piece)
+        parts = (rest + piece).split(SEGMENT_SEPARATOR)
+        rest = parts.pop()
+        yield from parts
+    if started:
+        yield rest
+
+
+def make_segments(spine_index, paragraphs):
+    """
+    Vergibt IDs an Absätze.
+
+    Yields:
+        dict: {"id": ..., "text": ...}
+    """
+    for position, text in enumerate(paragraphs):
+        yield {"id": segment_id(spine_index, position, text), "text": text}
+
+
+def dump_segments(segments):
+    """Serialisiert Segmente als JSON-Zeilen (Textstücke zum Schreiben)."""
+    for segment in segments:
+        yield json.dumps(segment, ensure_ascii=False) + "\n"
+
+
+def load_segments(data):
+    """Liest Segmente aus dem Inhalt einer '.segments.jsonl' Datei."""
+    return [json.loads(line) for line in data.splitlines() if line]
+
+
+def segments_to_text(segments):
+    """Erzeugt den flachen Kapiteltext aus den Segmenten."""
+    return SEGMENT_SEPARATOR.join(segment["text"] for segment in segments)
+
+
+def read_segments(workspace, file_name):
+    """
+    Lädt die Segmente eines Kapitels aus einem Arbeitsbereich.
+
+    Args:
+        workspace: DirectoryWorkspace oder WorkspaceStore.
+        file_name (str): Name der Kapiteldatei (z.B. 'Kapitel.txt').
+
+    Returns:
+        list[dict]: Die Segmente in Reihenfolge.
+    """
+    return load_segments(workspace.read_text(segments_name(file_name)))
+
+
+def rebuild_text(workspace, file_name):
+    """
+    Schneller Pfad: schreibt die Textdatei eines Kapitels aus seinen Segmenten
+    neu, ohne das EPUB zu lesen oder HTML zu konvertieren.
+
+    Returns:
+        str: Der geschriebene Text.
+    """
+    text = segments_to_text(read_segments(workspace, file_name))
+    workspace.write_text(file_name, text)
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Erzeugt die Kapitel-Textdateien aus den gespeicherten Segmenten neu."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="Alle Textdateien aus den Segmenten erzeugen.")
+    rebuild_parser.add_argument("ordner", help="Ordner der Extraktion oder Workspace-Datei (.sqlite).")
+
+    args = parser.parse_args()
+
+    try:
+        with open_workspace(args.ordner) as workspace:
+            manifest = workspace.load_manifest()
+            if manifest is None:
+                raise FileNotFoundError(f"Kein Manifest in {workspace}")
+            for chapter in manifest["chapters"]:
+                rebuild_text(workspace, chapter["file"])
+            print(f"{len(manifest['chapters'])} Textdateien aus Segmenten erzeugt.")
+    except Exception as e:
+        print(f"Ein Fehler ist aufgetreten: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
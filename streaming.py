@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gestreamte Antworten (stream=True).
+
+Die Übersetzung eines Teilstücks kommt in vielen kleinen Deltas. Der
+StreamReceiver sammelt sie und gibt sie regelmäßig an einen Puffer auf der
+Platte weiter, damit ein abgebrochener Stream nicht verloren ist und die
+nächste Anfrage ihn fortsetzen kann. Dazu misst er die Zeit bis zum ersten
+Token (TTFT) und den Durchsatz in Tokens pro Sekunde.
+"""
+
+import time
+import threading
+import statistics
+
+from openai import APIError
+
+from token_estimate import estimate_tokens
+
+# So oft (Sekunden) wird der empfangene Text weggeschrieben und der Fortschritt gemeldet
+FLUSH_INTERVAL = 0.5
+
+
+class StreamInterrupted(Exception):
+    """Die Verbindung brach während des Streams ab (vorübergehend, wird wiederholt)."""
+
+
+def iter_stream(stream):
+    """
+    Liefert die Ereignisse eines Streams. Abbrüche der Verbindung (z.B. vom
+    HTTP-Client) werden zu StreamInterrupted; API-Fehler bleiben, wie sie sind.
+    """
+    iterator = iter(stream)
+    while True:
+        try:
+            event = next(iterator)
+        except StopIteration:
+            return
+        except APIError:
+            raise
+        except Exception as e:
+            raise StreamInterrupted(f"Stream abgebrochen: {e}") from e
+        yield event
+
+
+async def aiter_stream(stream):
+    """Wie iter_stream, für AsyncOpenAI."""
+    iterator = stream.__aiter__()
+    while True:
+        try:
+            event = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        except APIError:
+            raise
+        except Exception as e:
+            raise StreamInterrupted(f"Stream abgebrochen: {e}") from e
+        yield event
+
+
+class StreamReceiver:
+    """
+    Sammelt die Deltas einer Antwort.
+
+    Attribute:
+        prefix (str): Bereits vorher empfangener Text, den die Anfrage fortsetzt.
+        usage: response.usage aus dem letzten Ereignis (falls der Server es sendet).
+        first_token (float): Sekunden bis zum ersten Delta oder None.
+        finish_reason (str): Abschlussgrund der Antwort ("stop", "length", ...) oder None.
+    """
+
+    def __init__(self, prefix="", on_flush=None, on_progress=None):
+        """
+        Args:
+            prefix (str): Text aus einem abgebrochenen Versuch.
+            on_flush (callable, optional): Funktion(neuer Text), schreibt ihn in den Puffer.
+            on_progress (callable, optional): Funktion(empfangene Zeichen insgesamt).
+        """
+        self.prefix = prefix or ""
+        self.usage = None
+        self.first_token = None
+        self.finish_reason = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self._parts = []
+        self._flushed = 0
+        self._received = len(self.prefix)
+        self._last_flush = self.started
+        self._on_flush = on_flush
+        self._on_progress = on_progress
+
+    @property
+    def text(self):
+        return self.prefix + "".join(self._parts)
+
+    def add(self, event):
+        """Verarbeitet ein Ereignis (ChatCompletionChunk) des Streams."""
+        if getattr(event, "usage", None) is not None:
+            self.usage = event.usage
+        for choice in event.choices or ():
+            if choice.finish_reason:
+                self.finish_reason = choice.finish_reason
+            content = choice.delta.content if choice.delta else None
+            if not content:
+                continue
+            if self.first_token is None:
+                self.first_token = time.perf_counter() - self.started
+            self._parts.append(content)
+            self._received += len(content)
+        now = time.perf_counter()
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self.flush(now)
+
+    def flush(self, now=None):
+        """Gibt den noch nicht weggeschriebenen Text weiter und meldet den Fortschritt."""
+        self._last_flush = now or time.perf_counter()
+        if self._flushed < len(self._parts):
+            if self._on_flush:
+                self._on_flush("".join(self._parts[self._flushed:]))
+            self._flushed = len(self._parts)
+            if self._on_progress:
+                self._on_progress(self._received)
+
+    def finish(self):
+        """
+        Schließt den Empfang ab.
+
+        Returns:
+            tuple: (Sekunden bis zum ersten Token, erzeugte Tokens, Sekunden danach)
+
+        Raises:
+            StreamInterrupted: Der Stream endete ohne finish_reason (Verbindung
+                               still geschlossen, Antwort unvollständig).
+        """
+        if self.finish_reason is None:
+            raise StreamInterrupted("Stream ohne Abschluss beendet")
+        self.finished = time.perf_counter()
+        tokens = getattr(self.usage, "completion_tokens", None)
+        if tokens is None:
+            tokens = estimate_tokens("".join(self._parts))
+        first_token = self.first_token if self.first_token is not None else self.finished - self.started
+        return first_token, tokens, self.finished - self.started - first_token
+
+
+class StreamMetrics:
+    """Zeit bis zum ersten Token und Tokens pro Sekunde je gestreamter Anfrage (thread-sicher)."""
+
+    def __init__(self):
+        self.requests = []    # (Bezeichnung, TTFT in s, Tokens, Tokens pro Sekunde)
+        self._lock = threading.Lock()
+
+    def record(self, label, first_token, tokens, seconds):
+        rate = tokens / seconds if seconds > 0 else None
+        with self._lock:
+            self.requests.append((label, first_token, tokens, rate))
+
+    def describe(self):
+        """Zusammenfassung für das Log."""
+        with self._lock:
+            first_tokens = sorted(request[1] for request in self.requests)
+            rates = [request[3] for request in self.requests if request[3] is not None]
+        if not first_tokens:
+            return "keine Anfragen"
+        p95 = first_tokens[min(len(first_tokens) - 1, int(len(first_tokens) * 0.95))]
+        text = (f"{len(first_tokens)} Anfragen, erstes Token nach {statistics.median(first_tokens):.2f} s "
+                f"(Median, p95 {p95:.2f} s)")
+        if rates:
+            text += f", {statistics.median(rates):.0f} Tokens/s (Median)"
+        return text
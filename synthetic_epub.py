@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Erzeugt synthetische EPUB-Dateien beliebiger Form für Benchmarks.
+
+Einstellbar sind Kapitelzahl, Kapitelgröße, Verschachtelungstiefe der
+Elemente, Bilder pro Kapitel und ein einzelnes riesiges XHTML-Dokument.
+Der Inhalt ist zufällig, aber bei gleichem Seed reproduzierbar.
+
+Beispiel:
+    python synthetic_epub.py test.epub --chapters 2000 --chapter-size 5000 --giant-mb 50
+"""
+
+import sys
+import argparse
+import math
+import random
+import zipfile
+from pathlib import Path
+
+
+WORDS = (
+    "der die das und nicht ein eine sich mit auf für ist im dem den von zu "
+    "the of and to in that was he for it with as his on be at by had "
+    "Haus Weg Stadt Fluss Morgen Abend Brief Fenster Licht Stimme Hand "
+    "river morning letter window silence garden promise shadow winter"
+).split()
+
+# Einfacher Platzhalter, wird als PNG deklariert (der Extractor liest Bilder nie)
+IMAGE_HEADER = b"\x89PNG\r\n\x1a\n"
+
+_CONTAINER = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+    '<rootfiles><rootfile full-path="OEBPS/content.opf" '
+    'media-type="application/oebps-package+xml"/></rootfiles></container>'
+)
+
+_XHTML_HEAD = (
+    '<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n'
+    '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">'
+    '<head><title>{title}</title><link rel="stylesheet" href="../style.css"/></head>\n<body>\n'
+)
+_XHTML_TAIL = '</body></html>\n'
+
+
+class SyntheticEpubWriter:
+    """
+    Schreibt ein EPUB mit zufälligem, reproduzierbarem Inhalt.
+
+    Attribute:
+        chapters (int): Anzahl normaler Kapitel.
+        chapter_size (int): Ungefähre Textmenge pro Kapitel in Zeichen (Mittelwert).
+        size_sigma (float): Streuung der Kapitelgrößen (Log-Normalverteilung, 0 = alle gleich).
+        depth (int): Verschachtelungstiefe der <div>-Elemente um die Absätze.
+        images (int): Bilder pro Kapitel.
+        image_size (int): Größe eines Bildes in Bytes.
+        giant_mb (float): Größe eines zusätzlichen riesigen Kapitels in MB (0 = keins).
+    """
+
+    def __init__(self, chapters=10, chapter_size=20000, depth=1, images=0, image_size=20000,
+                 giant_mb=0, seed=0, size_sigma=0):
+        self.chapters = chapters
+        self.chapter_size = chapter_size
+        self.depth = max(depth, 0)
+        self.images = images
+        self.image_size = image_size
+        self.giant_mb = giant_mb
+        self.size_sigma = size_sigma
+        self._rng = random.Random(seed)
+        # Vorrat an Absätzen; Wörter einzeln zu würfeln wäre bei 100 MB zu langsam
+        self._paragraphs = [self._make_paragraph() for _ in range(256)]
+
+    def _make_paragraph(self):
+        words = [self._rng.choice(WORDS) for _ in range(self._rng.randint(20, 120))]
+        # Etwas Inline-Markup wie in echten Büchern
+        for _ in range(len(words) // 25):
+            i = self._rng.randrange(len(words))
+            tag = self._rng.choice(("i", "b", "em", "span"))
+            words[i] = f"<{tag}>{words[i]}</{tag}>"
+        words[0] = words[0].capitalize()
+        return " ".join(words) + "."
+
+    def _chapter_size(self):
+        if not self.size_sigma:
+            return self.chapter_size
+        # Wenige lange, viele kurze Kapitel; der Mittelwert bleibt chapter_size
+        factor = self._rng.lognormvariate(0, self.size_sigma) / math.exp(self.size_sigma ** 2 / 2)
+        return int(self.chapter_size * factor)
+
+    def _iter_body(self, size):
+        """Liefert Markup-Stücke mit insgesamt etwa size Zeichen Text."""
+        written = 0
+        while written < size:
+            paragraph = self._rng.choice(self._paragraphs)
+            written += len(paragraph)
+            yield f"<p>{paragraph}</p>\n"
+
+    def _write_chapter(self, zf, name, title, size, image_names=()):
+        with zf.open(name, "w") as f:
+            def write(text):
+                f.write(text.encode("utf-8"))
+
+            write(_XHTML_HEAD.format(title=title))
+            write('<section epub:type="chapter">')
+            write("<div>" * self.depth)
+            write(f"<h1>{title}</h1>\n")
+            pieces = self._iter_body(size)
+            for image_name in image_names:
+                write(next(pieces, ""))
+                write(f'<div class="figure"><img src="../{image_name}" alt="Abbildung"/></div>\n')
+            buffer = []
+            buffered = 0
+            for piece in pieces:
+                buffer.append(piece)
+                buffered += len(piece)
+                if buffered >= 1 << 20:
+                    write("".join(buffer))
+                    buffer = []
+                    buffered = 0
+            write("".join(buffer))
+            write("</div>" * self.depth)
+            write("</section>")
+            write(_XHTML_TAIL)
+
+    def write(self, path):
+        """
+        Schreibt das EPUB.
+
+        Args:
+            path (str): Zieldatei.
+
+        Returns:
+            Path: Die geschriebene Datei.
+        """
+        path = Path(path)
+        manifest = [
+            '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+            '<item id="css" href="style.css" media-type="text/css"/>',
+        ]
+        spine = ['<itemref idref="nav" linear="no"/>']
+        chapter_files = []
+
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+            zf.writestr("META-INF/container.xml", _CONTAINER)
+            zf.writestr("OEBPS/style.css", "p { margin: 0; text-indent: 1em; }\n")
+
+            for number in range(1, self.chapters + 1):
+                image_names = []
+                for image in range(self.images):
+                    image_name = f"Images/img_{number:05d}_{image}.png"
+                    data = IMAGE_HEADER + self._rng.randbytes(max(self.image_size - len(IMAGE_HEADER), 0))
+                    # Bilder sind bereits komprimiert
+                    zf.writestr(f"OEBPS/{image_name}", data, compress_type=zipfile.ZIP_STORED)
+                    manifest.append(f'<item id="img{number}_{image}" href="{image_name}" '
+                                    f'media-type="image/png"/>')
+                    image_names.append(image_name)
+
+                name = f"Text/chapter_{number:05d}.xhtml"
+                self._write_chapter(zf, f"OEBPS/{name}", f"Kapitel {number}", self._chapter_size(),
+                                    image_names)
+                manifest.append(f'<item id="c{number}" href="{name}" media-type="application/xhtml+xml"/>')
+                spine.append(f'<itemref idref="c{number}"/>')
+                chapter_files.append((name, f"Kapitel {number}"))
+
+            if self.giant_mb:
+                name = "Text/giant.xhtml"
+                self._write_chapter(zf, f"OEBPS/{name}", "Riesenkapitel", int(self.giant_mb * 1024 * 1024))
+                manifest.append(f'<item id="giant" href="{name}" media-type="application/xhtml+xml"/>')
+                spine.append('<itemref idref="giant"/>')
+                chapter_files.append((name, "Riesenkapitel"))
+
+            toc = "".join(f'<li><a href="{name}">{title}</a></li>' for name, title in chapter_files)
+            zf.writestr("OEBPS/nav.xhtml", _XHTML_HEAD.format(title="Inhalt")
+                        + f'<nav epub:type="toc"><h1>Inhalt</h1><ol>{toc}</ol></nav>' + _XHTML_TAIL)
+
+            zf.writestr("OEBPS/content.opf", (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="id">'
+                '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+                '<dc:identifier id="id">synthetic</dc:identifier><dc:title>Synthetisches Buch</dc:title>'
+                '<dc:language>de</dc:language></metadata>'
+                f'<manifest>{"".join(manifest)}</manifest><spine>{"".join(spine)}</spine></package>'
+            ))
+        return path
+
+
+def make_epub(path, **shape):
+    """Kurzform: SyntheticEpubWriter(**shape).write(path)."""
+    return SyntheticEpubWriter(**shape).write(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Erzeugt ein synthetisches EPUB für Benchmarks.")
+    parser.add_argument("epub_datei", help="Die zu schreibende .epub Datei.")
+    parser.add_argument("--chapters", type=int, default=10, help="Anzahl Kapitel (Standard: %(default)s).")
+    parser.add_argument("--chapter-size", type=int, default=20000,
+                        help="Text pro Kapitel in Zeichen (Standard: %(default)s).")
+    parser.add_argument("--size-sigma", type=float, default=0,
+                        help="Streuung der Kapitelgrößen (0 = alle gleich, 1 = stark gemischt).")
+    parser.add_argument("--depth", type=int, default=1,
+                        help="Verschachtelungstiefe der Elemente (Standard: %(default)s).")
+    parser.add_argument("--images", type=int, default=0, help="Bilder pro Kapitel (Standard: %(default)s).")
+    parser.add_argument("--image-size", type=int, default=20000,
+                        help="Größe eines Bildes in Bytes (Standard: %(default)s).")
+    parser.add_argument("--giant-mb", type=float, default=0,
+                        help="Zusätzliches riesiges Kapitel dieser Größe in MB (Standard: keins).")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert des Zufallsgenerators.")
+
+    args = parser.parse_args()
+
+    try:
+        path = make_epub(args.epub_datei, chapters=args.chapters, chapter_size=args.chapter_size,
+                         size_sigma=args.size_sigma, depth=args.depth, images=args.images, image_size=args.image_size,
+                         giant_mb=args.giant_mb, seed=args.seed)
+        print(f"Geschrieben: {path} ({path.stat().st_size / (1024 * 1024):.1f} MB)")
+    except Exception as e:
+        print(f"Ein Fehler ist aufgetreten: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Übersetzungsspeicher mit mehreren Endpunkten: Schlüssel des liefernden Endpunkts."""
+
+import pytest
+
+from translate_book import KimiTranslator
+from translation_cache import cache_key
+
+
+def _entry(base_url, model, api_key):
+    return {"base_url": base_url, "api_key": api_key, "model": model, "weight": 1.0,
+            "max_concurrency": None, "rpm": None, "tpm": None, "name": None}
+
+
+@pytest.fixture
+def make_translator(tmp_path):
+    translators = []
+
+    def make(endpoints=None):
+        translator = KimiTranslator(tmp_path, "sk-test", base_url="https://a.example/v1", model_name="modell-a",
+                                    engine="thread", endpoints=endpoints,
+                                    cache_path=tmp_path / "memory.sqlite", log_callback=lambda message: None)
+        translators.append(translator)
+        return translator
+
+    yield make
+    for translator in translators:
+        translator.cache.close()
+
+
+def test_single_endpoint_key_unchanged(make_translator):
+    translator = make_translator()
+    translator._cache_put("Text", "Übersetzung", translator.pool.endpoints[0])
+    key = cache_key("Text", "modell-a", translator.system_prompt, "https://a.example/v1")
+    assert translator.cache.get(key) == "Übersetzung"
+
+
+def test_stored_under_serving_endpoint(make_translator, monkeypatch):
+    translator = make_translator([_entry("https://a.example/v1", "modell-a", "sk-aaaa"),
+                                  _entry("https://b.example/v1", "modell-b", "sk-bbbb")])
+    serving = translator.pool.endpoints[1]
+    monkeypatch.setattr(translator, "_send_chunk", lambda text, label="", partial=None: ("von B", serving))
+
+    assert translator._request_chunk("Text") == "von B"
+    prompt = translator.system_prompt
+    assert translator.cache.get(cache_key("Text", "modell-b", prompt, "https://b.example/v1")) == "von B"
+    assert translator.cache.get(cache_key("Text", "modell-a", prompt, "https://a.example/v1")) is None
+
+
+def test_lookup_covers_pool_and_counts_one_miss(make_translator):
+    translator = make_translator([_entry("https://b.example/v1", "modell-b", "sk-bbbb"),
+                                  _entry("https://a.example/v1", "modell-a", "sk-aaaa"),
+                                  _entry("https://a.example/v1/", "modell-a", "sk-cccc")])
+    assert [endpoint.model for endpoint in translator._cache_endpoints] == ["modell-a", "modell-b"]
+
+    assert translator._cache_get("Text") is None
+    assert translator.cache.misses == 1
+    translator._cache_put("Text", "von B", translator.pool.endpoints[0])
+    assert translator._cache_get("Text") == "von B"
+    assert (translator.cache.hits, translator.cache.misses) == (1, 1)
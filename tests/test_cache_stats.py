@@ -0,0 +1,49 @@
+"""Treffer und Fehlschläge des Übersetzungsspeichers bei Paketen."""
+
+import pytest
+
+from packing import pack_texts
+from translate_book import KimiTranslator, _Bundle, _FileJob
+
+
+@pytest.fixture
+def translator(tmp_path, monkeypatch):
+    source = tmp_path / "buch"
+    source.mkdir()
+    translator = KimiTranslator(source, "sk-test", engine="thread", pack=True,
+                                cache_path=tmp_path / "memory.sqlite", log_callback=lambda message: None)
+    translator.packed_answer = None
+
+    def fake_translate(text_chunk, system_prompt=None, endpoint=None):
+        if system_prompt == translator.pack_prompt:
+            return translator.packed_answer
+        return "DE:" + text_chunk
+
+    monkeypatch.setattr(translator, "_translate_chunk", fake_translate)
+    yield translator
+    translator.cache.close()
+
+
+def _bundle(texts):
+    return _Bundle([(_FileJob(f"Datei {i}", [None], [""]), 0, text, str(i)) for i, text in enumerate(texts)])
+
+
+def test_miss_counted_once_when_pack_falls_back(translator):
+    translator.packed_answer = "ohne Marken"
+    results = translator._request_task(_bundle(["eins", "zwei", "drei"]))
+    assert [text for text, _ in results] == ["DE:eins", "DE:zwei", "DE:drei"]
+    assert (translator.cache.hits, translator.cache.misses) == (0, 3)
+
+
+def test_miss_counted_once_when_pack_succeeds(translator):
+    translator.packed_answer = pack_texts(["EINS", "ZWEI", "DREI"])
+    translator._request_task(_bundle(["eins", "zwei", "drei"]))
+    assert (translator.cache.hits, translator.cache.misses) == (0, 3)
+
+
+def test_hits_and_misses_in_one_bundle(translator):
+    translator._cache_put("eins", "EINS", translator.pool.endpoints[0])
+    translator.packed_answer = "ohne Marken"
+    results = translator._request_task(_bundle(["eins", "zwei", "drei"]))
+    assert [text for text, _ in results] == ["EINS", "DE:zwei", "DE:drei"]
+    assert (translator.cache.hits, translator.cache.misses) == (1, 2)
@@ -0,0 +1,69 @@
+"""Zerlegung in Teilstücke: leere Eingaben, übergroße Absätze und Kontextfenster."""
+
+import pytest
+
+from chunking import chunk_budget, context_tokens, parse_context_tokens, split_into_chunks
+from token_estimate import estimate_tokens
+
+
+def test_empty_text():
+    assert split_into_chunks("", 100) == []
+    assert split_into_chunks("  \n\n ", 1) == ["  \n\n "]
+
+
+@pytest.mark.parametrize("text", [
+    "Satz.\n\n\n\n\n\nSatz.\n\n",
+    " Wort Wort Wort \n\nWort Wort ",
+    "\n\n   \n\nErster Absatz.\n\n\n   \n\nZweiter Absatz.   \n\n",
+])
+@pytest.mark.parametrize("budget", [1, 2, 3, 5, 100])
+def test_no_blank_chunks(text, budget):
+    # Reiner Leerraum würde sonst als eigene (leere) Anfrage gesendet
+    chunks = split_into_chunks(text, budget)
+    assert "".join(chunks) == text
+    assert all(chunk.strip() for chunk in chunks)
+
+
+def test_oversized_paragraph_is_split_at_sentences():
+    sentence = "Dies ist ein mittellanger Satz ohne besondere Merkmale. "
+    paragraph = sentence * 100
+    text = "Kurzer Absatz.\n\n" + paragraph + "\n\nNoch ein kurzer Absatz."
+    chunks = split_into_chunks(text, 100)
+
+    assert "".join(chunks) == text
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+    # Innerhalb des Absatzes wird nur an Satzenden geschnitten
+    assert all(chunk.endswith((". ", "\n\n")) for chunk in chunks[:-1])
+
+
+def test_oversized_word_is_split_hard():
+    url = "https://example.com/" + "x" * 5000
+    chunks = split_into_chunks(url, 50)
+    assert "".join(chunks) == url
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+
+
+def test_budget_fits_context_window():
+    assert chunk_budget("kimi-k2.5", 200) == 1500
+    assert chunk_budget("kimi-k2.5", 200, 4000) == 4000
+    small = chunk_budget("moonshot-v1-8k", 200, 4000)
+    assert small < 4000
+    assert 200 + small * 2.5 <= 8192
+    assert chunk_budget("unbekanntes-modell", 200, 4000) == 4000
+
+
+def test_context_window_overrides():
+    overrides = parse_context_tokens(["llama-3=8192", " kimi-k2 = 4096 "])
+    assert overrides == {"llama-3": 8192, "kimi-k2": 4096}
+    assert context_tokens("llama-3-70b", overrides) == 8192
+    assert context_tokens("kimi-k2.5", overrides) == 4096
+    assert context_tokens("kimi-k2.5") == 131072
+    assert chunk_budget("llama-3-70b", 200, 4000, overrides) < 4000
+
+
+@pytest.mark.parametrize("value", ["llama-3", "llama-3=", "=8192", "llama-3=viel", "llama-3=0"])
+def test_invalid_context_window(value):
+    with pytest.raises(ValueError):
+        parse_context_tokens([value])
@@ -0,0 +1,37 @@
+"""Bereinigung des extrahierten Textes: Kolumnentitel vs. nummerierte Überschriften."""
+
+from extract_book import RunningHeaderDetector, clean_text
+
+# Ein Absatz füllt mit dem Kolumnentitel etwa eine Buchseite (RUNNING_HEADER_MIN_GAP..MAX_GAP)
+PAGE = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 30).strip()
+
+
+def book(lines):
+    return "\n\n".join(part for line in lines for part in (line, PAGE))
+
+
+def test_numbered_headings_survive():
+    headings = ["Day 12", "Day 13", "Day 14", "Day 15",
+                "Letter 4", "Letter 5", "Letter 6",
+                "12. März 1914", "13. März 1914", "14. März 1914"]
+    text = book(headings)
+    assert clean_text(text) == text
+    for heading in headings:
+        assert heading in clean_text(text).split("\n\n")
+
+
+def test_running_headers_only_on_request():
+    text = book(["DER ROMAN 123", "124 Erstes Kapitel", "DER ROMAN 125",
+                 "126 Erstes Kapitel", "DER ROMAN 127", "128 Erstes Kapitel"])
+    assert clean_text(text) == text
+
+    stripped = clean_text(text, strip_headers=True)
+    assert stripped == "\n\n".join([PAGE] * 6)
+
+
+def test_only_leading_or_trailing_page_numbers_are_candidates():
+    assert RunningHeaderDetector.key("DER ROMAN 123") == "DER ROMAN #"
+    assert RunningHeaderDetector.key("123 DER ROMAN") == "# DER ROMAN"
+    assert RunningHeaderDetector.key("12. März 1914") is None
+    assert RunningHeaderDetector.key("Brief 4, Seite 2") is None
+    assert RunningHeaderDetector.key("1914") is None
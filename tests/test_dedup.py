@@ -0,0 +1,40 @@
+"""Wiederholte kurze Absätze werden herausgelöst und nur einmal angefragt."""
+
+from dedup import RepeatedParagraphs, paragraph_key
+from translate_book import KimiTranslator
+
+NOTICE = "Alle Rechte vorbehalten. Nachdruck nur mit Genehmigung."
+DIVIDER = "* * *"
+
+
+def _chapter(number):
+    return (f"Kapitel {number}\n\nDer erste Absatz von Kapitel {number} erzählt etwas anderes.\n\n"
+            f"{DIVIDER}\n\n{NOTICE}\n\nDer letzte Absatz von Kapitel {number}.\n")
+
+
+def test_short_repeated_paragraph_is_found():
+    repeated = RepeatedParagraphs()
+    for number in (1, 2, 3):
+        repeated.add_text(_chapter(number))
+    assert repeated.find() == {paragraph_key(NOTICE)}
+    assert repeated.occurrences == 3
+    assert repeated.repeated_chars == 2 * len(NOTICE)
+
+
+def test_min_chars_includes_dividers():
+    repeated = RepeatedParagraphs(min_chars=1)
+    for number in (1, 2, 3):
+        repeated.add_text(_chapter(number))
+    assert repeated.find() == {paragraph_key(NOTICE), paragraph_key(DIVIDER)}
+
+
+def test_short_repeated_paragraph_is_isolated(tmp_path):
+    for number in (1, 2, 3):
+        (tmp_path / f"Kapitel {number}.txt").write_text(_chapter(number), encoding="utf-8")
+    translator = KimiTranslator(tmp_path, "sk-test", log_callback=lambda message: None)
+    files = sorted(path.name for path in tmp_path.glob("*.txt"))
+    translator._find_repeated(files)
+
+    chunks = [chunk for file_name in files for _, chunk, _, _, _ in translator._file_chunks(file_name)]
+    assert chunks.count(NOTICE) == 3
+    assert sum(NOTICE in chunk for chunk in chunks) == 3
@@ -0,0 +1,41 @@
+"""Pool-Datei: fehlende Felder, Standardgewicht und ungültige Gewichte."""
+
+import json
+
+import pytest
+
+from endpoints import load_endpoints
+
+
+def write_pool(tmp_path, entries):
+    path = tmp_path / "pool.json"
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return path
+
+
+def test_defaults_and_weights(tmp_path):
+    path = write_pool(tmp_path, [
+        {"api_key": "sk-a"},
+        {"api_key": "sk-b", "weight": None},
+        {"api_key": "sk-c", "weight": 2, "model": "anderes-modell"},
+        {"api_key": "sk-d", "weight": "0.5"},
+    ])
+    entries = load_endpoints(path, "https://api.example.com/v1", None, "modell")
+    assert [entry["weight"] for entry in entries] == [1.0, 1.0, 2.0, 0.5]
+    assert [entry["model"] for entry in entries] == ["modell", "modell", "anderes-modell", "modell"]
+    assert all(entry["base_url"] == "https://api.example.com/v1" for entry in entries)
+
+
+@pytest.mark.parametrize("weight", [0, -1, "viel", [1], float("nan")])
+def test_invalid_weight(tmp_path, weight):
+    path = write_pool(tmp_path, [{"api_key": "sk-a"}, {"api_key": "sk-b", "weight": weight}])
+    with pytest.raises(ValueError, match="Eintrag 2: Gewicht"):
+        load_endpoints(path, "https://api.example.com/v1", None, "modell")
+
+
+def test_missing_fields(tmp_path):
+    path = write_pool(tmp_path, [{"api_key": "sk-a"}])
+    with pytest.raises(ValueError, match="Eintrag 1 ohne model"):
+        load_endpoints(path, "https://api.example.com/v1")
+    with pytest.raises(ValueError, match="nicht leere Liste"):
+        load_endpoints(write_pool(tmp_path, []))
@@ -0,0 +1,74 @@
+"""Hedging: Schwelle ab dem Senden, Duplikat nur mit freiem Platz der Parallelität, Budget nur aus ersten Anfragen."""
+
+import asyncio
+
+import pytest
+
+from translate_book import KimiTranslator
+
+
+@pytest.fixture
+def translator(tmp_path, monkeypatch):
+    translator = KimiTranslator(tmp_path, "sk-test", hedge=True, max_workers=2, log_callback=lambda message: None)
+    # Schwelle etwa 0.1 s für kurze Texte, Budget reicht für viele Duplikate
+    for _ in range(translator.hedging.min_samples):
+        translator.hedging.record(0.1, 100, tokens=10 ** 6)
+    translator.latency = 0.01
+    translator.calls = 0
+
+    async def fake_translate(text_chunk, system_prompt=None, endpoint=None):
+        translator.calls += 1
+        await asyncio.sleep(translator.latency if translator.calls == 1 else 0.01)
+        return "DE:" + text_chunk
+
+    monkeypatch.setattr(translator, "_translate_chunk_async", fake_translate)
+    return translator
+
+
+def test_threshold_starts_after_acquisition(translator, monkeypatch):
+    acquire = translator._acquire_endpoint_async
+
+    async def slow_acquire(text_chunk, system_prompt=None):
+        # z.B. Wartezeit auf das Kontingent
+        await asyncio.sleep(0.3)
+        return await acquire(text_chunk, system_prompt)
+
+    monkeypatch.setattr(translator, "_acquire_endpoint_async", slow_acquire)
+    assert asyncio.run(translator._request_chunk_async("Text")) == "DE:Text"
+    assert translator.hedging.fired == 0
+
+
+def test_duplicate_for_slow_request(translator):
+    translator.latency = 1.0
+    assert asyncio.run(translator._request_chunk_async("Text")) == "DE:Text"
+    assert (translator.hedging.fired, translator.hedging.wins) == (1, 1)
+    assert translator.pool.outstanding() == 0
+
+
+def test_duplicate_counts_against_concurrency(translator):
+    translator.max_workers = 1
+    translator.latency = 0.4
+    assert asyncio.run(translator._request_chunk_async("Text")) == "DE:Text"
+    assert translator.hedging.fired == 0
+    assert translator.calls == 1
+
+
+def test_budget_counts_only_first_requests(translator):
+    tokens = translator._estimate_request_tokens("Text", translator.system_prompt)
+    base = translator.hedging._tokens
+    translator.latency = 1.0
+    assert asyncio.run(translator._request_chunk_async("Text")) == "DE:Text"
+    assert translator.hedging.wins == 1
+    # Die abgebrochene erste Anfrage zählt, das Duplikat nicht
+    assert translator.hedging._tokens == base + tokens
+    assert translator.hedging.extra_tokens == tokens
+
+
+def test_duplicate_does_not_grow_budget(translator):
+    tokens = translator._estimate_request_tokens("Text", translator.system_prompt)
+    base = translator.hedging._tokens
+    samples = translator.hedging.histogram.total
+    asyncio.run(translator._attempt_async("Text", None, None, "Text", duplicate=True))
+    assert (translator.hedging._tokens, translator.hedging.histogram.total) == (base, samples + 1)
+    asyncio.run(translator._attempt_async("Text", None, None, "Text"))
+    assert translator.hedging._tokens == base + tokens
@@ -0,0 +1,73 @@
+"""Die Konverter (BeautifulSoup, lxml, Streaming) liefern denselben Text."""
+
+import pytest
+
+from epub_reader import EpubZipReader
+from extract_book import StreamingHtmlConverter, html_to_text_soup, html_to_text_lxml, lxml_html
+from synthetic_epub import make_epub
+
+pytestmark = pytest.mark.skipif(lxml_html is None, reason="lxml ist nicht installiert")
+
+XHTML = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">\n'
+    '<head><title>Buchtitel</title><style>p {{ margin: 0 }}</style></head>\n'
+    '<body>\n{body}\n</body>\n</html>\n'
+)
+
+CORPUS = {
+    "kapitel": '<h1>Kapitel 1</h1>\n  <p>Erster <em>Absatz</em> mit &amp; Entity&#160;hier.</p>\n'
+               '  <p>Zweiter<br/>Zeile zwei.</p>\n  <div><div>Verschachtelt</div> Rest</div>',
+    "liste": '<h2>Liste</h2><ul>\n<li>eins</li>\n<li>zwei</li>\n</ul>',
+    "pre": '<p>Code:</p><pre>  a\n\n    b  </pre><p>danach</p>',
+    "rauschen": '<p>Text<span epub:type="pagebreak">12</span> weiter</p>'
+                '<div style="display:none">versteckt</div><svg><text>Bild</text></svg><p>Ende</p>',
+    "kommentar": '<p>a<!-- Kommentar -->b</p><script>var x = 1;</script><p>c</p>',
+    # Fehlerhaftes Markup
+    "p_offen": '<p>eins<p>zwei<div>drei</div>',
+    "p_offen_am_ende": '<p>eins</p><p>zwei',
+    "li_offen": '<ul><li>a<li>b<li>c</ul>',
+    "block_in_p": '<p>vor<div>mitte</div>nach</p>',
+    "block_in_inline": '<p>x<span>a<div>y</div>b</span>z</p>',
+    "inline_offen": '<p>a<b>fett<p>weiter</p>',
+    "verschachtelt": '<div><div><div>tief</div>mitte</div>außen</div>',
+    "br_folge": '<p>a<br><br><br><br>b</p><p>c<br/> <br/>d</p>',
+    "br_am_rand": '<br><br><p><br>x<br></p><br>',
+    "text_vor_block": 'lose<div>block</div>lose',
+    "leer": '<p></p><div> </div><p>\n</p>',
+}
+
+
+@pytest.mark.parametrize("clean", [False, True])
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_converters_agree(name, clean):
+    html = XHTML.format(body=CORPUS[name])
+    assert html_to_text_lxml(html, clean) == html_to_text_soup(html, clean)
+    assert html_to_text_lxml(html.encode("utf-8"), clean) == html_to_text_soup(html.encode("utf-8"), clean)
+
+
+@pytest.mark.parametrize("size", [1, 7, 64 * 1024])
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_streaming_converter_agrees(name, size):
+    html = XHTML.format(body=CORPUS[name])
+    expected, _, _ = html_to_text_soup(html)
+    chunks = [html[start:start + size] for start in range(0, len(html), size)]
+    assert "".join(StreamingHtmlConverter().paragraphs(chunks)) == expected
+
+
+@pytest.mark.parametrize("body", [CORPUS["p_offen"], CORPUS["li_offen"], CORPUS["block_in_p"]])
+def test_unclosed_blocks_become_paragraphs(body):
+    text, _, _ = html_to_text_soup(XHTML.format(body=body))
+    assert "\n\n" in text
+    assert len(text.split("\n\n")) == 3
+
+
+def test_synthetic_book(tmp_path):
+    path = make_epub(tmp_path / "buch.epub", chapters=5, chapter_size=3000, depth=4, images=1, giant_mb=0)
+    with EpubZipReader(path) as reader:
+        documents = list(reader.documents())
+        assert documents
+        for document in documents:
+            html = document.read()
+            for clean in (False, True):
+                assert html_to_text_lxml(html, clean) == html_to_text_soup(html, clean), document.href
@@ -0,0 +1,89 @@
+"""Wiederholungen: vorübergehende vs. endgültige Fehler, Wartezeiten und Retry-After."""
+
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+from openai import (
+    APIConnectionError, APIStatusError, APITimeoutError, AuthenticationError, RateLimitError
+)
+
+from retry import RetryPolicy, retry_after_seconds
+from streaming import StreamInterrupted
+from translate_book import _is_retryable
+
+
+def _response(status_code, headers=None):
+    # Die Fehlerklassen lesen nur status_code, headers und request
+    return SimpleNamespace(status_code=status_code, headers=headers or {}, request=None)
+
+
+def _status_error(status_code, headers=None, cls=APIStatusError):
+    return cls(f"HTTP {status_code}", response=_response(status_code, headers), body=None)
+
+
+@pytest.mark.parametrize("error", [
+    APIConnectionError(request=None),
+    APITimeoutError(request=None),
+    StreamInterrupted("abgebrochen"),
+    _status_error(429, cls=RateLimitError),
+    _status_error(408),
+    _status_error(409),
+    _status_error(500),
+    _status_error(503),
+], ids=lambda error: type(error).__name__ + str(getattr(error, "status_code", "")))
+def test_transient_errors_are_retried(error):
+    assert _is_retryable(error)
+
+
+@pytest.mark.parametrize("error", [
+    _status_error(400),
+    _status_error(401, cls=AuthenticationError),
+    _status_error(404),
+    _status_error(422),
+    ValueError("Programmfehler"),
+], ids=lambda error: type(error).__name__ + str(getattr(error, "status_code", "")))
+def test_other_errors_are_fatal(error):
+    assert not _is_retryable(error)
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(_status_error(429, {"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(_status_error(429, {"retry-after": "-3"})) == 0.0
+    assert retry_after_seconds(_status_error(429, {"retry-after-ms": "1500", "retry-after": "9"})) == 1.5
+    # Ungültiges retry-after-ms: Rückfall auf retry-after
+    assert retry_after_seconds(_status_error(429, {"retry-after-ms": "bald", "retry-after": "9"})) == 9.0
+
+
+def test_retry_after_http_date():
+    in_30s = retry_after_seconds(_status_error(503, {"retry-after": formatdate(time.time() + 30, usegmt=True)}))
+    assert 25 <= in_30s <= 31
+    past = retry_after_seconds(_status_error(503, {"retry-after": formatdate(time.time() - 60, usegmt=True)}))
+    assert past == 0.0
+
+
+@pytest.mark.parametrize("error", [
+    _status_error(429),
+    _status_error(429, {"retry-after": "irgendwann"}),
+    APIConnectionError(request=None),
+    ValueError("ohne Antwort"),
+])
+def test_retry_after_missing_or_invalid(error):
+    assert retry_after_seconds(error) is None
+
+
+def test_backoff_grows_and_is_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+    for attempt, backoff in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (10, 8.0)]:
+        for _ in range(20):
+            assert backoff / 2 <= policy.delay(attempt) <= backoff
+
+
+def test_retry_after_is_honoured_but_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=60.0)
+    assert 20.0 <= policy.delay(1, retry_after=20.0) <= 20.5
+    # Ein überlanger Wert (oder ein Datum weit in der Zukunft) hält den Lauf nicht an
+    assert policy.delay(1, retry_after=3600.0) <= 60.5
+    far_future = retry_after_seconds(_status_error(503, {"retry-after": formatdate(time.time() + 86400, usegmt=True)}))
+    assert policy.delay(1, retry_after=far_future) <= 60.5
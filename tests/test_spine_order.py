@@ -0,0 +1,87 @@
+"""Beide Backends extrahieren in Lesereihenfolge der Spine, nicht des Manifests; verschobene Kapitel behalten ihre Übersetzung."""
+
+import zipfile
+
+import pytest
+
+from book_manifest import load_manifest, translation_name
+from extract_book import EpubChapterExtractor, ebooklib
+from segments import segments_name
+from workspace import open_workspace
+
+CONTAINER = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+    '<rootfiles><rootfile full-path="OEBPS/content.opf" '
+    'media-type="application/oebps-package+xml"/></rootfiles></container>'
+)
+
+
+def chapter(title):
+    return ('<?xml version="1.0" encoding="utf-8"?>'
+            '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>x</title></head>'
+            f'<body><h1>{title}</h1><p>Text von {title}.</p></body></html>')
+
+
+def write_epub(path, manifest="cab", spine="abc"):
+    # Standard: Manifest c, a, b - Spine a, b, c
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("META-INF/container.xml", CONTAINER)
+        for name in manifest:
+            zf.writestr(f"OEBPS/{name}.xhtml", chapter(name.upper()))
+        zf.writestr("OEBPS/content.opf", (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="2.0" unique-identifier="id">'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+            '<dc:identifier id="id">spine</dc:identifier><dc:title>Spine</dc:title>'
+            '<dc:language>de</dc:language></metadata><manifest>'
+            + "".join(f'<item id="{name}" href="{name}.xhtml" media-type="application/xhtml+xml"/>'
+                      for name in manifest)
+            + '</manifest><spine>' + "".join(f'<itemref idref="{name}"/>' for name in spine) + '</spine>'
+            '</package>'
+        ))
+    return path
+
+
+@pytest.mark.parametrize("backend", [
+    "stream",
+    pytest.param("ebooklib", marks=pytest.mark.skipif(ebooklib is None, reason="ebooklib fehlt")),
+])
+def test_manifest_follows_spine(tmp_path, backend):
+    epub_path = write_epub(tmp_path / "buch.epub")
+    output_dir = tmp_path / backend
+    EpubChapterExtractor(epub_path, output_dir, backend=backend, log_callback=lambda message: None).process()
+    chapters = load_manifest(output_dir)["chapters"]
+    assert [entry["title"] for entry in chapters] == ["A", "B", "C"]
+    assert [entry["spine_index"] for entry in chapters] == sorted(entry["spine_index"] for entry in chapters)
+
+
+@pytest.mark.parametrize("backend", [
+    "stream",
+    pytest.param("ebooklib", marks=pytest.mark.skipif(ebooklib is None, reason="ebooklib fehlt")),
+])
+def test_moved_chapters_keep_translation(tmp_path, backend):
+    output_dir = tmp_path / backend
+    messages = []
+
+    def extract(spine):
+        # Neue Datei mit anderem Zeitstempel, wie eine neue Auflage
+        epub_path = write_epub(tmp_path / f"buch_{spine}.epub", manifest="zabc", spine=spine)
+        EpubChapterExtractor(epub_path, output_dir, backend=backend, log_callback=messages.append).process()
+        return {entry["title"]: entry for entry in load_manifest(output_dir)["chapters"]}
+
+    before = extract("abc")
+    for entry in before.values():
+        (output_dir / translation_name(entry["file"])).write_text("übersetzt", encoding="utf-8")
+
+    # Ein Kapitel vorn eingefügt: alle anderen rücken in der Spine nach hinten
+    after = extract("zabc")
+    assert not [message for message in messages if "Veraltete Übersetzung" in message]
+    for title in "ABC":
+        entry = after[title]
+        assert entry["file"] == before[title]["file"]
+        assert entry["spine_index"] == before[title]["spine_index"] + 1
+        assert (output_dir / translation_name(entry["file"])).read_text(encoding="utf-8") == "übersetzt"
+        segments = open_workspace(output_dir).read_text(segments_name(entry["file"]))
+        assert f'"{entry["spine_index"]:04d}-' in segments
@@ -0,0 +1,95 @@
+"""Ein Abbruch während des Streamings ist kein Fehler der Kapitel."""
+
+from types import SimpleNamespace
+
+import pytest
+
+import streaming
+import translate_book
+from translate_book import KimiTranslator, TranslationCancelled
+
+
+def _event(content=None, finish_reason=None):
+    delta = SimpleNamespace(content=content)
+    return SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+def _events():
+    for word in "Ein langer übersetzter Text in vielen Stücken".split():
+        yield _event(word + " ")
+    yield _event(finish_reason="stop")
+
+
+class _Stream:
+    def __init__(self):
+        self._events = _events()
+
+    def __iter__(self):
+        return self._events
+
+    def close(self):
+        pass
+
+
+class _AsyncStream:
+    def __init__(self):
+        self._events = _events()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._events)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        pass
+
+
+class _Client:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        return _Stream()
+
+
+class _AsyncClient:
+    def __init__(self, **kwargs):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        return _AsyncStream()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+@pytest.mark.parametrize("engine", ["thread", "async"])
+def test_cancel_mid_stream_writes_no_failure(tmp_path, monkeypatch, engine):
+    for number in (1, 2, 3):
+        (tmp_path / f"Kapitel {number}.txt").write_text(f"Text von Kapitel {number}.\n", encoding="utf-8")
+    # Jedes Delta sofort weitergeben, damit der Abbruch mitten im Stream kommt
+    monkeypatch.setattr(streaming, "FLUSH_INTERVAL", 0)
+    monkeypatch.setattr(translate_book, "AsyncOpenAI", _AsyncClient)
+    progress = []
+
+    def chunk_progress(label, received, expected):
+        progress.append(received)
+        if len(progress) >= 2:
+            raise TranslationCancelled("Vom Benutzer abgebrochen.")
+
+    translator = KimiTranslator(tmp_path, "sk-test", engine=engine, max_workers=2, stream=True,
+                                chunk_progress_callback=chunk_progress, log_callback=lambda message: None)
+    translator.pool.endpoints[0].client = _Client()
+    with pytest.raises(TranslationCancelled):
+        translator.process_files()
+
+    assert progress
+    assert not list(tmp_path.glob("*_FAILURE_DE.txt"))
+    assert not list(tmp_path.glob("*_DE.txt"))
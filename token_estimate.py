@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Token-Schätzung und Tokenzählung.
+
+Ohne Tokenizer-Download: Für europäische Sprachen entspricht ein Token im
+Mittel etwa vier Zeichen. Das reicht für Berichte, Kostenabschätzungen und
+die Teilstückgröße. Ist tiktoken installiert, kann stattdessen genau
+gezählt werden (token_counter("tiktoken")).
+"""
+
+# tiktoken ist optional; ohne ihn wird geschätzt
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+
+# "heuristic": Schätzung über die Zeichenzahl, "tiktoken": BPE-Tokenizer (optional)
+TOKENIZERS = ("heuristic", "tiktoken")
+DEFAULT_TIKTOKEN_ENCODING = "o200k_base"
+
+
+def estimate_tokens_from_chars(chars):
+    """Geschätzte Tokenzahl für eine Zeichenanzahl."""
+    if chars <= 0:
+        return 0
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_tokens(text):
+    """Geschätzte Tokenzahl eines Textes."""
+    return estimate_tokens_from_chars(len(text)) if text else 0
+
+
+def token_counter(name="heuristic"):
+    """
+    Liefert eine Funktion, die die Tokens eines Textes zählt.
+
+    Args:
+        name (str): "heuristic" oder "tiktoken", optional mit Kodierung
+                    (z.B. "tiktoken:cl100k_base").
+
+    Returns:
+        tuple: (Funktion text -> Tokenzahl, Beschreibung für das Log). Ist
+               tiktoken nicht installiert oder die Kodierung nicht ladbar,
+               wird auf die Schätzung zurückgegriffen.
+
+    Raises:
+        ValueError: Unbekannter Tokenizer.
+    """
+    name, _, encoding_name = (name or "heuristic").partition(":")
+    if name not in TOKENIZERS:
+        raise ValueError(f"Unbekannter Tokenizer: {name} (erlaubt: {', '.join(TOKENIZERS)})")
+    if name == "heuristic":
+        return estimate_tokens, f"Schätzung mit {CHARS_PER_TOKEN} Zeichen je Token"
+
+    encoding_name = encoding_name or DEFAULT_TIKTOKEN_ENCODING
+    if tiktoken is None:
+        return estimate_tokens, "Schätzung, tiktoken ist nicht installiert"
+    try:
+        # Lädt die Kodierung beim ersten Mal herunter
+        encoding = tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        return estimate_tokens, f"Schätzung, tiktoken {encoding_name} nicht verfügbar: {e}"
+
+    def count(text):
+        return len(encoding.encode(text, disallowed_special=())) if text else 0
+
+    return count, f"tiktoken {encoding_name}"
@@ -1,29 +1,183 @@
-import glob
 import sys
 import argparse
+import asyncio
+import time
+import threading
+import sqlite3
+import contextlib
 from pathlib import Path
-from openai import OpenAI
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from openai import (
+    OpenAI, AsyncOpenAI, RateLimitError, APIStatusError, APITimeoutError, APIConnectionError,
+    AuthenticationError, PermissionDeniedError, NotFoundError
+)
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from book_manifest import content_hash, translation_name, failure_name, TRANSLATION_SUFFIX, FAILURE_SUFFIX
+from workspace import open_workspace
+from token_estimate import estimate_tokens_from_chars, token_counter, TOKENIZERS
+from chunking import (
+    chunk_budget, parse_context_tokens, split_into_chunks, trailing_whitespace, DEFAULT_CHUNK_TOKENS
+)
+from concurrency import AimdController
+from rate_limit import RateLimiter, DEFAULT_HEADROOM, load_limits, lookup_limits
+from retry import RetryPolicy, retry_after_seconds
+from translation_cache import TranslationCache, DEFAULT_MAX_MB, cache_key, default_cache_path
+from dedup import DEDUP_MIN_CHARS, RepeatedParagraphs, normalize_paragraph, paragraph_key
+from segments import split_segments, SEGMENT_SEPARATOR
+from packing import PACK_INSTRUCTIONS, PACK_MAX_FILES, pack_texts, unpack_texts
+from streaming import StreamReceiver, StreamMetrics, StreamInterrupted, iter_stream, aiter_stream
+from endpoints import Endpoint, EndpointPool, POLL_INTERVAL, load_endpoints
+from hedging import HedgePolicy, HEDGE_PERCENTILE, HEDGE_BUDGET
+
+# "async": ein Thread, viele gleichzeitige Anfragen (AsyncOpenAI)
+# "thread": ein blockierender Thread pro gleichzeitiger Anfrage
+ENGINES = ("async", "thread")
+
+# Reihenfolge, in der die Dateien in die Warteschlange kommen:
+# "spine" (Lesereihenfolge), "largest" (LPT, größte zuerst),
+# "smallest" (schnell erste fertige Kapitel)
+SCHEDULES = ("spine", "largest", "smallest")
+SIZE_UNITS = ("tokens", "bytes")
+
+# Fortsetzung eines abgebrochenen Streams bei APIs ohne "Partial Mode"
+CONTINUE_PROMPT = (
+    "The translation above was cut off. Continue it exactly where it stops, without repeating "
+    "anything. Output ONLY the remaining translated text."
+)
+
+
+class TranslationCancelled(Exception):
+    """Der Lauf wird abgebrochen (z.B. aus einem Callback der GUI); kein Fehler eines Teilstücks."""
+
+
+def _overload_reason(error):
+    """Kurzer Grund, wenn der Fehler auf Überlast der API hindeutet (429, 5xx, Timeout), sonst None."""
+    if isinstance(error, RateLimitError):
+        return "429"
+    if isinstance(error, APITimeoutError):
+        return "Timeout"
+    if isinstance(error, APIStatusError) and error.status_code >= 500:
+        return f"HTTP {error.status_code}"
+    return None
+
+
+def _endpoint_fault(error):
+    """
+    Kurzer Grund, wenn der Fehler am Endpunkt liegt (Überlast, Verbindung,
+    ungültiger Key, unbekanntes Modell), sonst None.
+    """
+    reason = _overload_reason(error)
+    if reason:
+        return reason
+    if isinstance(error, (APIConnectionError, StreamInterrupted)):
+        return "Verbindung"
+    if isinstance(error, (AuthenticationError, PermissionDeniedError, NotFoundError)):
+        return f"HTTP {error.status_code}"
+    return None
+
+
+def _is_retryable(error):
+    """
+    True für vorübergehende Fehler: Verbindung/Timeout, 429, 408, 409 und 5xx.
+    Alles andere (Authentifizierung, ungültige Anfrage, Programmfehler) ist endgültig.
+    """
+    if isinstance(error, (APIConnectionError, RateLimitError, StreamInterrupted)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409) or error.status_code >= 500
+    return False
 
 class KimiTranslator:
     def __init__(self, input_dir, api_key, base_url="https://api.moonshot.ai/v1", 
                  model_name="kimi-k2.5", max_workers=3, 
-                 system_prompt=None, log_callback=None, progress_callback=None):
+                 system_prompt=None, log_callback=None, progress_callback=None,
+                 engine="async", schedule="spine", size_unit="tokens",
+                 adaptive=False, min_workers=1, concurrency_callback=None, rpm=None, tpm=None,
+                 max_retries=5, cache_path=None, cache_size_mb=DEFAULT_MAX_MB, dedup=True,
+                 dedup_min_chars=DEDUP_MIN_CHARS, pack=False, chunk_tokens=None, context_tokens=None,
+                 tokenizer="heuristic", stream=False,
+                 chunk_progress_callback=None, endpoints=None, hedge=False,
+                 hedge_percentile=HEDGE_PERCENTILE, hedge_budget=HEDGE_BUDGET):
         self.input_dir = Path(input_dir)
         self.api_key = api_key
         self.base_url = base_url
         self.model_name = model_name
-        self.max_workers = max_workers
+        self.max_workers = max_workers # Gleichzeitige Anfragen an die API
         self.log_callback = log_callback
         self.progress_callback = progress_callback # Funktion(current, total)
+        # Adaptive Parallelität: zwischen min_workers und max_workers (AIMD)
+        self.adaptive = adaptive
+        self.min_workers = min(max(min_workers, 1), max_workers)
+        self.concurrency_callback = concurrency_callback # Funktion(aktuelle Parallelität)
+        self.concurrency = None
+        self._limit_changed = None
+        # Kontingente der API (Anfragen bzw. Tokens pro Minute), None = unbegrenzt
+        self.rate_limiter = RateLimiter(rpm, tpm) if rpm or tpm else None
+        # Wiederholungen je Teilstück bei vorübergehenden Fehlern
+        self.retry_policy = RetryPolicy(max_retries)
+        # Beendet wartende Wiederholungen der Thread-Engine beim Abbruch
+        self._stop_event = threading.Event()
+        self._log_lock = threading.Lock()
+        # Übersetzungsspeicher über Läufe und Bücher hinweg (None = aus)
+        self.cache = TranslationCache(cache_path, cache_size_mb) if cache_path else None
+        # Wiederholte Absätze und gleiche Teilstücke nur einmal anfragen
+        self.dedup = dedup
+        self.dedup_min_chars = dedup_min_chars  # Mindestlänge eines wiederholten Absatzes (Zeichen)
+        self._repeated_keys = set()     # paragraph_key der wiederholten Absätze
+        self._isolated_hashes = set()   # Hashes der als eigenes Teilstück herausgelösten Absätze
+        self._shared_translations = {}  # Hash -> Übersetzung eines herausgelösten Absatzes
+        self._waiting = {}              # Hash -> [(_FileJob, Index)], die auf dieselbe Anfrage warten
+        self._dedup_stats = [0, 0, 0]   # eingesparte Teilstücke, eingesparte Zeichen, offene Zeichen
+        # Kleine Dateien gebündelt in einer Anfrage übersetzen
+        self.pack = pack
+        self._pack_stats = [0, 0, 0]    # Pakete, Dateien darin, einzeln wiederholte Pakete
+        # Antworten streamen: Teilpuffer im Workspace, Fortschritt je Teilstück, TTFT
+        self.stream = stream
+        self.chunk_progress_callback = chunk_progress_callback # Funktion(Teilstück, empfangen, Länge)
+        self.stream_metrics = StreamMetrics()
+        # Langsame Anfragen ein zweites Mal senden (nur Engine "async"); je Lauf neu
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self.hedging = HedgePolicy(hedge_percentile, hedge_budget) if hedge else None  # prüft die Werte
 
-        if not self.input_dir.exists():
+        if engine not in ENGINES:
+            raise ValueError(f"Unbekannte Engine: {engine} (erlaubt: {', '.join(ENGINES)})")
+        self.engine = engine
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Unbekannte Reihenfolge: {schedule} (erlaubt: {', '.join(SCHEDULES)})")
+        if size_unit not in SIZE_UNITS:
+            raise ValueError(f"Unbekannte Größeneinheit: {size_unit} (erlaubt: {', '.join(SIZE_UNITS)})")
+        self.schedule = schedule
+        self.size_unit = size_unit
+
+        # Ordner mit Textdateien oder Workspace-Datei (.sqlite)
+        self.workspace = open_workspace(self.input_dir)
+        if not self.workspace.exists():
             raise FileNotFoundError(f"Verzeichnis nicht gefunden: {self.input_dir}")
 
+        # Wiederholungen übernimmt _request_chunk (mit Backoff, Retry-After und
+        # Meldung an die adaptive Parallelität), nicht der Client
         self.client = OpenAI(
             api_key=self.api_key,
             base_url=self.base_url,
+            max_retries=0,
         )
+        # Wird in der Event-Loop des Laufs erzeugt (nur Engine "async")
+        self.async_client = None
+        # Pool der Endpunkte (Einträge wie aus endpoints.load_endpoints); ohne
+        # Angabe nur der eine Zugang oben
+        if endpoints:
+            pool = [Endpoint(**entry) for entry in endpoints]
+            for endpoint in pool:
+                endpoint.client = OpenAI(api_key=endpoint.api_key, base_url=endpoint.base_url, max_retries=0)
+        else:
+            pool = [Endpoint(self.base_url, self.api_key, self.model_name)]
+            pool[0].client = self.client
+        self.pool = EndpointPool(pool, on_change=self._log)
+        # Übersetzungen aller Endpunkte gelten im Speicher: je (Base URL, Modell) einer
+        self._cache_endpoints = [endpoint for _, endpoint in sorted(
+            {(endpoint.base_url.rstrip("/"), endpoint.model): endpoint for endpoint in pool}.items())]
 
         self.system_prompt = system_prompt
         if not self.system_prompt:
@@ -32,137 +186,1197 @@ class KimiTranslator:
                 "from the original language into German. Maintain the original tone, style, and formatting. "
                 "Output ONLY the translated text, no introductory or concluding remarks."
             )
-        self.max_chunk_size = 3000
+        self.pack_prompt = f"{self.system_prompt}\n\n{PACK_INSTRUCTIONS}"
+        # Teilstücke nach Tokens: höchstens chunk_tokens, passend zum Kontextfenster des Modells
+        # (context_tokens: eigene Fenster je Modellpräfix, ergänzt chunking.MODEL_CONTEXT_TOKENS)
+        self.count_tokens, self.tokenizer_info = token_counter(tokenizer)
+        self.chunk_tokens = min(chunk_budget(endpoint.model, self.count_tokens(self.pack_prompt), chunk_tokens,
+                                             context_tokens)
+                                for endpoint in self.pool.endpoints)
+        # Dateinamen im Eingabeordner (einmal pro Lauf gelesen, statt exists() je Datei)
+        self._existing_names = set()
+        # Manifest-Einträge nach Dateiname (für Größenangaben)
+        self._chapters = {}
+        # Dauer des letzten Laufs in Sekunden
+        self.makespan = None
 
     def _log(self, message):
-        if self.log_callback:
-            self.log_callback(message)
-        else:
-            print(message)
-
-    def _split_text_into_chunks(self, text, max_size):
-        lines = text.splitlines(keepends=True)
-        chunks = []
-        current_chunk = []
-        current_length = 0
-
-        for line in lines:
-            if current_length + len(line) > max_size:
-                chunks.append("".join(current_chunk))
-                current_chunk = []
-                current_length = 0
+        # Wiederholungen und Parallelität melden sich auch aus Worker-Threads
+        with self._log_lock:
+            if self.log_callback:
+                self.log_callback(message)
+            else:
+                print(message)
 
-            current_chunk.append(line)
-            current_length += len(line)
+    def _split_text_into_chunks(self, text):
+        return split_into_chunks(text, self.chunk_tokens, self.count_tokens)
 
-        if current_chunk:
-            chunks.append("".join(current_chunk))
-
-        return chunks
+    def _messages(self, text_chunk, system_prompt=None, prefix=None, base_url=None):
+        messages = [
+            {"role": "system", "content": system_prompt or self.system_prompt},
+            {"role": "user", "content": text_chunk}
+        ]
+        if prefix and "moonshot" in (base_url or self.base_url):
+            # "Partial Mode" der Kimi-API: die Antwort setzt den Text nahtlos fort
+            messages.append({"role": "assistant", "content": prefix, "partial": True})
+        elif prefix:
+            messages.append({"role": "assistant", "content": prefix})
+            messages.append({"role": "user", "content": CONTINUE_PROMPT})
+        return messages
 
-    def _translate_chunk(self, text_chunk):
+    def _translate_chunk(self, text_chunk, system_prompt=None, endpoint=None):
+        system_prompt = system_prompt or self.system_prompt
+        endpoint = endpoint or self.pool.endpoints[0]
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": text_chunk}
-                ]
+            response = endpoint.client.chat.completions.create(
+                model=endpoint.model,
+                messages=self._messages(text_chunk, system_prompt, base_url=endpoint.base_url)
             )
+            self._record_usage(text_chunk, response, system_prompt, endpoint)
             return response.choices[0].message.content
         except Exception as e:
             raise e
 
-    def _process_single_file(self, file_path):
+    async def _translate_chunk_async(self, text_chunk, system_prompt=None, endpoint=None):
+        system_prompt = system_prompt or self.system_prompt
+        endpoint = endpoint or self.pool.endpoints[0]
+        response = await endpoint.async_client.chat.completions.create(
+            model=endpoint.model,
+            messages=self._messages(text_chunk, system_prompt, base_url=endpoint.base_url)
+        )
+        self._record_usage(text_chunk, response, system_prompt, endpoint)
+        return response.choices[0].message.content
+
+    def _stream_chunk(self, text_chunk, system_prompt=None, partial=None, label="", endpoint=None):
+        """
+        Übersetzt ein Teilstück mit stream=True. Der empfangene Text wird laufend
+        in den Teilpuffer des Workspace geschrieben; liegt dort schon Text aus
+        einem abgebrochenen Versuch, setzt die Anfrage ihn fort.
+        """
+        endpoint = endpoint or self.pool.endpoints[0]
+        receiver = self._stream_receiver(text_chunk, partial, label)
+        stream = endpoint.client.chat.completions.create(
+            model=endpoint.model,
+            messages=self._messages(text_chunk, system_prompt, receiver.prefix, endpoint.base_url),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        try:
+            for event in iter_stream(stream):
+                receiver.add(event)
+        finally:
+            receiver.flush()
+            stream.close()
+        return self._stream_finished(text_chunk, system_prompt, partial, label, receiver, endpoint)
+
+    async def _stream_chunk_async(self, text_chunk, system_prompt=None, partial=None, label="", endpoint=None):
+        """Wie _stream_chunk, für die Engine "async"."""
+        endpoint = endpoint or self.pool.endpoints[0]
+        receiver = self._stream_receiver(text_chunk, partial, label)
+        stream = await endpoint.async_client.chat.completions.create(
+            model=endpoint.model,
+            messages=self._messages(text_chunk, system_prompt, receiver.prefix, endpoint.base_url),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        try:
+            async for event in aiter_stream(stream):
+                receiver.add(event)
+        finally:
+            receiver.flush()
+            await stream.close()
+        return self._stream_finished(text_chunk, system_prompt, partial, label, receiver, endpoint)
+
+    def _stream_receiver(self, text_chunk, partial, label):
+        """StreamReceiver mit dem Teilpuffer (file_name, Index, Hash) und dem Fortschritts-Callback."""
+        prefix = None
+        if partial is None:
+            on_flush = None
+        else:
+            file_name, index, chunk_hash = partial
+            prefix = self.workspace.load_partial(file_name, index, chunk_hash)
+            if prefix:
+                self._log(f"Setze fort nach {len(prefix)} Zeichen: {label}")
+            written = bool(prefix)
+
+            def on_flush(text):
+                nonlocal written
+                self.workspace.append_partial(file_name, index, chunk_hash, text, start=not written)
+                written = True
+
+        if self.chunk_progress_callback is None:
+            on_progress = None
+        else:
+            def on_progress(received):
+                self.chunk_progress_callback(label, received, len(text_chunk))
+
+        return StreamReceiver(prefix, on_flush, on_progress)
+
+    def _stream_finished(self, text_chunk, system_prompt, partial, label, receiver, endpoint=None):
+        """Verbucht Verbrauch und Messwerte einer vollständigen gestreamten Antwort."""
+        first_token, tokens, seconds = receiver.finish()
+        self.stream_metrics.record(label, first_token, tokens, seconds)
+        self._record_usage(text_chunk, receiver, system_prompt, endpoint)
+        if partial is not None:
+            file_name, index, _ = partial
+            self.workspace.clear_partial(file_name, index)
+        return receiver.text
+
+    def _estimate_request_tokens(self, text_chunk, system_prompt=None):
+        # Eingabe (Systemprompt + Text) plus eine etwa gleich lange Übersetzung
+        return self.count_tokens(system_prompt or self.system_prompt) + 2 * self.count_tokens(text_chunk)
+
+    def _quota_delay(self, text_chunk, system_prompt=None, limiter=None):
+        """
+        Bucht die geschätzten Kosten einer Anfrage ab; liefert die Wartezeit in Sekunden.
+
+        Args:
+            limiter (RateLimiter, optional): Kontingent eines Endpunkts statt des gemeinsamen.
+        """
+        limiter = limiter or self.rate_limiter
+        if limiter is None:
+            return 0
+        return limiter.reserve(self._estimate_request_tokens(text_chunk, system_prompt))
+
+    def _record_usage(self, text_chunk, response, system_prompt=None, endpoint=None):
+        """Korrigiert die Schätzung mit dem tatsächlichen Verbrauch aus response.usage."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        for limiter in (self.rate_limiter, endpoint.rate_limiter if endpoint else None):
+            if limiter is not None:
+                limiter.correct(self._estimate_request_tokens(text_chunk, system_prompt), usage.total_tokens)
+
+    def _retry_delay(self, error, attempt, label, endpoint=None):
         """
-        Diese Funktion wird parallel ausgeführt.
+        Entscheidet über eine Wiederholung nach einem Fehler. Liegt der Fehler
+        am Endpunkt (z.B. ungültiger Key) und hat der Pool noch andere, wird
+        auch ein sonst endgültiger Fehler dort wiederholt.
+
+        Returns:
+            float: Wartezeit in Sekunden oder None, wenn der Fehler endgültig ist
+                   bzw. keine Wiederholungen mehr übrig sind.
+        """
+        retryable = _is_retryable(error) or (
+            endpoint is not None and _endpoint_fault(error) is not None and self.pool.has_alternative(endpoint))
+        if not retryable or attempt > self.retry_policy.max_retries:
+            return None
+        delay = self.retry_policy.delay(attempt, retry_after_seconds(error))
+        where = f" ({endpoint})" if endpoint is not None and len(self.pool) > 1 else ""
+        self._log(f"Wiederholung {attempt}/{self.retry_policy.max_retries} in {delay:.1f} s: "
+                  f"{label}{where} -> {error}")
+        return delay
+
+    def _cache_get(self, text_chunk, count_miss=True):
         """
-        file_name = file_path.name
-        target_file = file_path.parent / f"{file_path.stem}_DE.txt"
-        failure_file = file_path.parent / f"{file_path.stem}_FAILURE_DE.txt"
+        Sucht ein Teilstück im Übersetzungsspeicher. Mit mehreren Modellen
+        bzw. Base URLs im Pool gilt die Übersetzung jedes davon; gesucht wird
+        in fester Reihenfolge (sortiert nach Base URL und Modell).
 
-        if target_file.exists():
-            return f"Übersprungen (existiert): {file_name}"
+        Args:
+            text_chunk (str): Der Text.
+            count_miss (bool): Fehlschlag zählen (False, wenn noch einmal gesucht wird).
 
+        Returns:
+            str: Übersetzung oder None (auch ohne Speicher).
+        """
+        if self.cache is None:
+            return None
+        last = len(self._cache_endpoints) - 1
+        for number, endpoint in enumerate(self._cache_endpoints):
+            try:
+                cached = self.cache.get(self._cache_key(text_chunk, endpoint), count_miss and number == last)
+            except sqlite3.Error as e:
+                self._disable_cache(e)
+                return None
+            if cached is not None:
+                return cached
+        return None
+
+    def _cache_key(self, text_chunk, endpoint):
+        """Schlüssel einer Übersetzung durch diesen Endpunkt (sein Modell, seine Base URL)."""
+        return cache_key(text_chunk, endpoint.model, self.system_prompt, endpoint.base_url)
+
+    def _cache_put(self, text_chunk, translated_text, endpoint):
+        """Speichert die Übersetzung unter dem Schlüssel des Endpunkts, der sie geliefert hat."""
+        if self.cache is None:
+            return
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            self.cache.put(self._cache_key(text_chunk, endpoint), translated_text)
+        except sqlite3.Error as e:
+            self._disable_cache(e)
+
+    def _disable_cache(self, error):
+        # Ein defekter oder gesperrter Speicher darf die Übersetzung nicht aufhalten
+        self._log(f"Übersetzungsspeicher deaktiviert: {error}")
+        cache, self.cache = self.cache, None
+        if cache is not None:
+            cache.close()
+
+    def _request_chunk(self, text_chunk, label="", partial=None):
+        """
+        Übersetzt ein Teilstück in einem Worker-Thread: fragt zuerst den
+        Übersetzungsspeicher, sonst die API (_send_chunk).
+
+        Args:
+            text_chunk (str): Der Text.
+            label (str): Bezeichnung für das Log.
+            partial (tuple, optional): (file_name, Index, Hash) des Teilpuffers beim Streaming.
+        """
+        cached = self._cache_get(text_chunk)
+        if cached is not None:
+            return cached
+        translated_text, endpoint = self._send_chunk(text_chunk, label, partial=partial)
+        self._cache_put(text_chunk, translated_text, endpoint)
+        return translated_text
+
+    def _send_chunk(self, text_chunk, label="", system_prompt=None, partial=None):
+        """
+        Sendet ein Teilstück an den Pool: wartet auf das Kontingent, wiederholt
+        vorübergehende Fehler und meldet jeden Versuch an die adaptive
+        Parallelität.
 
-            if not content.strip():
-                return f"Übersprungen (leer): {file_name}"
+        Args:
+            system_prompt (str, optional): Abweichender Systemprompt (Pakete).
+            Übrige wie _request_chunk.
 
-            chunks = self._split_text_into_chunks(content, self.max_chunk_size)
-            translated_parts = []
+        Returns:
+            tuple: (Übersetzung, Endpunkt, der sie geliefert hat)
+        """
+        attempt = 0
+        while True:
+            endpoint = self._acquire_endpoint(text_chunk, system_prompt)
+            error = None
+            completed = False
+            try:
+                token = self.concurrency.started() if self.concurrency else None
+                started = time.perf_counter()
+                try:
+                    if self.stream:
+                        translated_text = self._stream_chunk(text_chunk, system_prompt, partial, label, endpoint)
+                    else:
+                        translated_text = self._translate_chunk(text_chunk, system_prompt, endpoint)
+                except TranslationCancelled:
+                    raise
+                except Exception as e:
+                    error = e
+                completed = True
+            finally:
+                self._release_endpoint(endpoint, error, completed)
+            self._request_finished(token, started, text_chunk, error)
+            if error is not None:
+                attempt += 1
+                delay = self._retry_delay(error, attempt, label, endpoint)
+                if delay is None:
+                    raise error
+                if self._stop_event.wait(delay):
+                    raise TranslationCancelled("Übersetzung abgebrochen.") from error
+                continue
+            return translated_text, endpoint
+
+    async def _request_chunk_async(self, text_chunk, label="", partial=None):
+        """Wie _request_chunk, für die Engine "async"."""
+        cached = self._cache_get(text_chunk)
+        if cached is not None:
+            return cached
+        translated_text, endpoint = await self._send_chunk_async(text_chunk, label, partial=partial)
+        self._cache_put(text_chunk, translated_text, endpoint)
+        return translated_text
+
+    async def _send_chunk_async(self, text_chunk, label="", system_prompt=None, partial=None):
+        """Wie _send_chunk, für die Engine "async"."""
+        attempt = 0
+        while True:
+            if self.hedging is not None:
+                translated_text, error, endpoint = await self._hedged_attempt_async(
+                    text_chunk, system_prompt, partial, label)
+            else:
+                translated_text, error, endpoint = await self._attempt_async(text_chunk, system_prompt, partial,
+                                                                             label)
+            if error is not None:
+                attempt += 1
+                delay = self._retry_delay(error, attempt, label, endpoint)
+                if delay is None:
+                    raise error
+                await asyncio.sleep(delay)
+                continue
+            return translated_text, endpoint
+
+    async def _attempt_async(self, text_chunk, system_prompt, partial, label, sent=None, duplicate=False):
+        """
+        Ein Versuch an einem Endpunkt des Pools.
 
-            for chunk in chunks:
-                translated_text = self._translate_chunk(chunk)
-                translated_parts.append(translated_text)
+        Args:
+            sent (asyncio.Event, optional): Wird gesetzt, sobald die Anfrage
+                Kontingent und Endpunkt hat und hinausgeht.
+            duplicate (bool): Duplikat des Hedgings; seine Tokens zählen nicht
+                zur Basis des Hedging-Budgets.
 
-            full_translation = "\n".join(translated_parts)
+        Returns:
+            tuple: (Übersetzung, Fehler, Endpunkt); genau eins von beiden ist None.
+        """
+        endpoint = await self._acquire_endpoint_async(text_chunk, system_prompt)
+        if sent is not None:
+            sent.set()
+        translated_text = error = None
+        completed = False
+        try:
+            token = self.concurrency.started() if self.concurrency else None
+            started = time.perf_counter()
+            try:
+                if self.stream:
+                    translated_text = await self._stream_chunk_async(text_chunk, system_prompt, partial, label,
+                                                                     endpoint)
+                else:
+                    translated_text = await self._translate_chunk_async(text_chunk, system_prompt, endpoint)
+            except TranslationCancelled:
+                raise
+            except Exception as e:
+                error = e
+            completed = True
+        finally:
+            self._release_endpoint(endpoint, error, completed)
+        self._request_finished(token, started, text_chunk, error)
+        if error is None and self.hedging is not None:
+            self.hedging.record(time.perf_counter() - started, len(text_chunk),
+                                0 if duplicate else self._estimate_request_tokens(text_chunk, system_prompt))
+        return translated_text, error, endpoint
 
-            with open(target_file, 'w', encoding='utf-8') as f:
-                f.write(full_translation)
+    async def _hedged_attempt_async(self, text_chunk, system_prompt, partial, label):
+        """
+        Wie _attempt_async, abgesichert: Antwortet der Endpunkt nicht innerhalb
+        der Schwelle der Hedging-Strategie, geht dieselbe Anfrage ein zweites Mal
+        hinaus (ohne Teilpuffer). Die erste erfolgreiche Antwort gilt, die andere
+        Anfrage wird abgebrochen.
 
-            return f"ERFOLG: {file_name}"
+        Die Schwelle zählt ab dem Senden, nicht ab dem Warten auf Kontingent
+        und Endpunkt. Das Duplikat belegt einen Platz der Parallelität wie jede
+        andere Anfrage: Es geht erst hinaus, wenn weniger Anfragen offen sind,
+        als die (adaptive) Parallelität gerade erlaubt.
+        """
+        sent = asyncio.Event()
+        primary = asyncio.ensure_future(self._attempt_async(text_chunk, system_prompt, partial, label, sent))
+        attempts = [primary]
+        waiting = None
+        try:
+            threshold = self.hedging.threshold(len(text_chunk))
+            if threshold is None:
+                return await primary
+            waiting = asyncio.ensure_future(sent.wait())
+            await asyncio.wait([primary, waiting], return_when=asyncio.FIRST_COMPLETED)
+            started = time.perf_counter()
+            done, _ = await asyncio.wait(attempts, timeout=threshold)
+            limit = self.concurrency.limit if self.concurrency else self.max_workers
+            while not done and self.pool.outstanding() >= limit:
+                done, _ = await asyncio.wait(attempts, timeout=POLL_INTERVAL)
+                limit = self.concurrency.limit if self.concurrency else self.max_workers
+            if done or not self.hedging.fire(self._estimate_request_tokens(text_chunk, system_prompt)):
+                return await primary
+            self._log(f"Keine Antwort nach {time.perf_counter() - started:.1f} s, sende Duplikat: {label}")
+            attempts.append(asyncio.ensure_future(self._attempt_async(text_chunk, system_prompt, None, label,
+                                                                      duplicate=True)))
+            pending = attempts
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Bevorzugt die erste Anfrage, wenn beide zugleich fertig sind
+                succeeded = [attempt for attempt in attempts if attempt in done and attempt.result()[1] is None]
+                if succeeded:
+                    if succeeded[0] is not primary:
+                        self.hedging.won(self._estimate_request_tokens(text_chunk, system_prompt))
+                    return succeeded[0].result()
+                if not pending:
+                    return primary.result()
+        finally:
+            if waiting is not None:
+                waiting.cancel()
+            for attempt in attempts:
+                attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
 
+    def _acquire_endpoint(self, text_chunk, system_prompt=None):
+        """
+        Wartet auf das Kontingent und einen freien Endpunkt des Pools (Thread-Engine).
+
+        Der Endpunkt wird erst belegt, wenn die Anfrage sofort hinausgehen darf:
+        Muss sie auf sein eigenes Kontingent warten, bleibt er in der Zeit für
+        andere Anfragen frei und wird danach wieder genommen.
+        """
+        delay = self._quota_delay(text_chunk, system_prompt)
+        if delay and self._stop_event.wait(delay):
+            raise TranslationCancelled("Übersetzung abgebrochen.")
+        reserved = None
+        try:
+            while True:
+                endpoint, reserved, delay = self._next_endpoint(text_chunk, system_prompt, reserved)
+                if endpoint is not None:
+                    return endpoint
+                if self._stop_event.wait(delay):
+                    raise TranslationCancelled("Übersetzung abgebrochen.")
+        except BaseException:
+            if reserved is not None:
+                self.pool.cancel_wait(reserved)
+            raise
+
+    async def _acquire_endpoint_async(self, text_chunk, system_prompt=None):
+        """Wie _acquire_endpoint, für die Engine "async"."""
+        delay = self._quota_delay(text_chunk, system_prompt)
+        if delay:
+            await asyncio.sleep(delay)
+        reserved = None
+        try:
+            while True:
+                endpoint, reserved, delay = self._next_endpoint(text_chunk, system_prompt, reserved)
+                if endpoint is not None:
+                    return endpoint
+                await asyncio.sleep(delay)
+        except BaseException:
+            if reserved is not None:
+                self.pool.cancel_wait(reserved)
+            raise
+
+    def _next_endpoint(self, text_chunk, system_prompt, reserved):
+        """
+        Ein Schritt von _acquire_endpoint.
+
+        Returns:
+            tuple: (belegter Endpunkt oder None, Endpunkt mit gebuchtem Kontingent
+                   oder None, Wartezeit bis zum nächsten Schritt)
+        """
+        endpoint = self.pool.acquire(reserved)
+        if endpoint is None:
+            return None, reserved, POLL_INTERVAL
+        if endpoint is reserved or endpoint.rate_limiter is None:
+            return endpoint, None, 0
+        delay = self._quota_delay(text_chunk, system_prompt, endpoint.rate_limiter)
+        if not delay:
+            return endpoint, None, 0
+        # Während der Wartezeit auf sein Kontingent bleibt der Endpunkt für andere frei
+        self.pool.give_back(endpoint)
+        return None, endpoint, delay
+
+    def _release_endpoint(self, endpoint, error, completed):
+        """
+        Gibt den Endpunkt zurück und meldet dem Pool, ob er versagt hat. Eine
+        abgebrochene Anfrage (completed=False) sagt nichts über ihn aus.
+        """
+        if not completed:
+            self.pool.release(endpoint, completed=False)
+        else:
+            self.pool.release(endpoint, _endpoint_fault(error) if error is not None else None)
+
+    def _request_task(self, task):
+        """
+        Übersetzt einen Auftrag aus _iter_chunk_tasks in einem Worker-Thread.
+
+        Returns:
+            str: Übersetzung eines Teilstücks bzw. für ein _Bundle eine Liste
+                 (Übersetzung, Fehler) je Datei.
+        """
+        if not isinstance(task, _Bundle):
+            job, index, chunk, chunk_hash = task
+            return self._request_chunk(chunk, self._chunk_label(job, index),
+                                       partial=(job.file_name, index, chunk_hash))
+        results, open_items = self._bundle_lookup(task)
+        if len(open_items) > 1:
+            texts = [task.tasks[i][2] for i in open_items]
+            packed, endpoint = self._send_chunk(pack_texts(texts), task.label(), self.pack_prompt)
+            if self._bundle_unpacked(task, results, open_items, packed, endpoint):
+                return results
+        # Einzeln: Paket unbrauchbar oder nur noch eine Datei offen
+        for i in open_items:
+            job, index, chunk, chunk_hash = task.tasks[i]
+            try:
+                results[i] = (self._request_chunk(chunk, self._chunk_label(job, index),
+                                                  partial=(job.file_name, index, chunk_hash)), None)
+            except TranslationCancelled:
+                raise
+            except Exception as e:
+                results[i] = (None, e)
+        return results
+
+    async def _request_task_async(self, task):
+        """Wie _request_task, für die Engine "async"."""
+        if not isinstance(task, _Bundle):
+            job, index, chunk, chunk_hash = task
+            return await self._request_chunk_async(chunk, self._chunk_label(job, index),
+                                                   partial=(job.file_name, index, chunk_hash))
+        results, open_items = self._bundle_lookup(task)
+        if len(open_items) > 1:
+            texts = [task.tasks[i][2] for i in open_items]
+            packed, endpoint = await self._send_chunk_async(pack_texts(texts), task.label(), self.pack_prompt)
+            if self._bundle_unpacked(task, results, open_items, packed, endpoint):
+                return results
+        for i in open_items:
+            job, index, chunk, chunk_hash = task.tasks[i]
+            try:
+                results[i] = (await self._request_chunk_async(chunk, self._chunk_label(job, index),
+                                                              partial=(job.file_name, index, chunk_hash)),
+                              None)
+            except TranslationCancelled:
+                raise
+            except Exception as e:
+                results[i] = (None, e)
+        return results
+
+    def _bundle_lookup(self, bundle):
+        """
+        Sucht die Dateien eines Pakets im Übersetzungsspeicher. Fehlschläge
+        zählen erst bei der letzten Suche: nach dem Paket in _bundle_unpacked,
+        beim einzelnen Übersetzen in _request_chunk.
+
+        Returns:
+            tuple: (Ergebnisliste mit (Übersetzung, None) für Treffer, sonst None;
+                    Positionen der offenen Dateien)
+        """
+        results = [None] * len(bundle.tasks)
+        open_items = []
+        for i, (_, _, chunk, _) in enumerate(bundle.tasks):
+            cached = self._cache_get(chunk, count_miss=False)
+            if cached is not None:
+                results[i] = (cached, None)
+            else:
+                open_items.append(i)
+        return results, open_items
+
+    def _bundle_unpacked(self, bundle, results, open_items, packed, endpoint):
+        """
+        Verteilt die Antwort auf ein Paket auf seine Dateien. Gespeichert wird
+        je Datei unter dem Schlüssel des Endpunkts, der das Paket übersetzt hat.
+
+        Returns:
+            bool: True, wenn jede Datei ihren Teil erhalten hat; sonst bleibt
+                  results unverändert und die Dateien werden einzeln übersetzt.
+        """
+        pieces = unpack_texts(packed, len(open_items))
+        if pieces is None:
+            self._pack_stats[2] += 1
+            self._log(f"Paket unvollständig, übersetze einzeln: {bundle.label()}")
+            return False
+        if self.cache is not None:
+            self.cache.count_misses(len(open_items))
+        for i, piece in zip(open_items, pieces):
+            results[i] = (piece, None)
+            # Je Datei speichern: gilt auch für spätere Läufe ohne Pakete
+            self._cache_put(bundle.tasks[i][2], piece, endpoint)
+        return True
+
+    def _file_chunks(self, file_name):
+        """
+        Liest eine Quelldatei und zerlegt sie in Teilstücke.
+
+        Returns:
+            list: (Index, Teilstück, Hash, Übersetzung oder None, Trennung) je
+                  Teilstück; None, wenn die Datei leer ist. Übersetzungen stammen
+                  aus einem abgebrochenen Lauf (Journal bzw. Workspace-Store),
+                  die Trennung ist der Leerraum bis zum nächsten Teilstück.
+        """
+        content = self.workspace.read_text(file_name)
+
+        if not content.strip():
+            return None
+
+        chunks = self._split_content(content)
+        done_chunks = self.workspace.load_chunks(file_name)
+        result = []
+        for index, (chunk, separator) in enumerate(chunks):
+            chunk_hash = content_hash(chunk)
+            done = done_chunks.get(index)
+            result.append((index, chunk, chunk_hash, done[1] if done and done[0] == chunk_hash else None,
+                           separator))
+        return result
+
+    def _split_content(self, content):
+        """
+        Zerlegt einen Kapiteltext in Teilstücke. Wiederholte Absätze werden
+        (normalisiert) zu eigenen Teilstücken, damit sie überall gleich lauten
+        und nur einmal angefragt werden.
+
+        Returns:
+            list: (Teilstück, Trennung zum nächsten Teilstück)
+        """
+        if not self._repeated_keys:
+            return [(chunk, trailing_whitespace(chunk)) for chunk in self._split_text_into_chunks(content)]
+        chunks = []
+        run = []
+
+        def flush():
+            pieces = self._split_text_into_chunks(SEGMENT_SEPARATOR.join(run))
+            run.clear()
+            if pieces:
+                chunks.extend((chunk, trailing_whitespace(chunk)) for chunk in pieces[:-1])
+                chunks.append((pieces[-1], SEGMENT_SEPARATOR))
+
+        for paragraph in split_segments(content):
+            if paragraph_key(paragraph) not in self._repeated_keys:
+                run.append(paragraph)
+                continue
+            flush()
+            chunk = normalize_paragraph(paragraph)
+            self._isolated_hashes.add(content_hash(chunk))
+            chunks.append((chunk, SEGMENT_SEPARATOR))
+        flush()
+        # Das letzte Teilstück endet wie das Kapitel
+        chunks[-1] = (chunks[-1][0], trailing_whitespace(content))
+        return chunks
+
+    def _find_repeated(self, files_to_process):
+        """
+        Erster Durchgang über alle Kapitel: wiederholte Absätze finden. Auch
+        fertige Kapitel zählen mit, damit ein fortgesetzter Lauf genauso
+        zerlegt wie der abgebrochene und sein Journal weiter passt.
+        """
+        repeated = RepeatedParagraphs(self.dedup_min_chars)
+        for file_name in files_to_process:
+            try:
+                repeated.add_text(self.workspace.read_text(file_name))
+            except Exception:
+                # Lesefehler meldet _iter_chunk_tasks
+                continue
+        self._repeated_keys = repeated.find()
+        if self._repeated_keys:
+            share = repeated.repeated_chars / repeated.total_chars if repeated.total_chars else 0
+            self._log(f"Deduplizierung: {len(self._repeated_keys)} Absätze wiederholen sich "
+                      f"({repeated.occurrences} Vorkommen, {share:.1%} des Textes).")
+
+    def _save_failure(self, file_name, error):
+        try:
+            original_content = self.workspace.read_text(file_name)
+            self.workspace.write_text(failure_name(file_name), original_content)
+            return f"FEHLER (Original kopiert): {file_name} -> {error}"
+        except Exception as io_e:
+            return f"KRITISCHER FEHLER: {file_name} -> {io_e}"
+
+    def _finish_job(self, job):
+        try:
+            # Übersetzungen ohne eigenen Leerraum am Ende, dazwischen die Trennung aus dem Original
+            text = "".join(part.rstrip() + separator for part, separator in zip(job.parts, job.separators))
+            self.workspace.write_text(translation_name(job.file_name), text)
+        except Exception as e:
+            return self._save_failure(job.file_name, e)
+        try:
+            # Die Teilstücke stecken jetzt in der fertigen Übersetzung
+            self.workspace.clear_chunks(job.file_name)
         except Exception as e:
+            self._log(f"Journal nicht entfernt: {job.file_name} -> {e}")
+        return f"ERFOLG: {job.file_name}"
+
+    def _iter_chunk_tasks(self, files_to_process, file_done):
+        """
+        Zerlegt die Dateien nacheinander in offene Teilstücke. Die Dateien werden
+        erst gelesen, wenn ihre Teilstücke an der Reihe sind.
+
+        Dateien, für die nichts zu übersetzen ist (existiert, leer, vollständig
+        aus einem abgebrochenen Lauf), werden sofort über file_done gemeldet.
+
+        Mit pack werden kleine Dateien (ein Teilstück bis zur halben
+        Teilstückgröße) zu einem _Bundle zusammengefasst.
+
+        Yields:
+            tuple: (_FileJob, Index, Teilstück, Hash) oder _Bundle
+        """
+        bundle = []
+        bundle_size = 0
+        for file_name in files_to_process:
+            if translation_name(file_name) in self._existing_names:
+                file_done(f"Übersprungen (existiert): {file_name}")
+                continue
             try:
-                with open(file_path, 'r', encoding='utf-8') as f_src:
-                    original_content = f_src.read()
-                with open(failure_file, 'w', encoding='utf-8') as f_dest:
-                    f_dest.write(original_content)
-                return f"FEHLER (Original kopiert): {file_name} -> {e}"
-            except Exception as io_e:
-                return f"KRITISCHER FEHLER: {file_name} -> {io_e}"
+                chunks = self._file_chunks(file_name)
+            except Exception as e:
+                file_done(self._save_failure(file_name, e))
+                continue
+            if chunks is None:
+                file_done(f"Übersprungen (leer): {file_name}")
+                continue
 
-    def process_files(self):
-        files = list(self.input_dir.glob("*.txt"))
+            job = _FileJob(file_name, [translated_text for _, _, _, translated_text, _ in chunks],
+                           [separator for _, _, _, _, separator in chunks])
+            if not job.pending:
+                file_done(self._finish_job(job))
+                continue
+            for index, chunk, chunk_hash, translated_text, _ in chunks:
+                if translated_text is not None:
+                    continue
+                self._dedup_stats[2] += len(chunk)
+                shared = self._shared_translations.get(chunk_hash)
+                waiting = self._waiting.get(chunk_hash)
+                if shared is not None or waiting is not None:
+                    self._dedup_stats[0] += 1
+                    self._dedup_stats[1] += len(chunk)
+                    if shared is not None:
+                        file_done(self._chunk_done(job, index, chunk_hash, shared))
+                    else:
+                        waiting.append((job, index))
+                    continue
+                if self.dedup:
+                    self._waiting[chunk_hash] = []
+                tokens = self.count_tokens(chunk) if self.pack and len(chunks) == 1 else None
+                if tokens is not None and tokens <= self.chunk_tokens // 2:
+                    # Kleine Datei: mit weiteren in einem Paket bis zum Tokenbudget
+                    if bundle and (bundle_size + tokens > self.chunk_tokens
+                                   or len(bundle) >= PACK_MAX_FILES):
+                        yield self._bundle_task(bundle)
+                        bundle, bundle_size = [], 0
+                    bundle.append((job, index, chunk, chunk_hash))
+                    bundle_size += tokens
+                    continue
+                yield job, index, chunk, chunk_hash
+        if bundle:
+            yield self._bundle_task(bundle)
+
+    def _bundle_task(self, tasks):
+        """Ein Paket aus mehreren Dateien; eine einzelne Datei bleibt ein normales Teilstück."""
+        if len(tasks) == 1:
+            return tasks[0]
+        self._pack_stats[0] += 1
+        self._pack_stats[1] += len(tasks)
+        return _Bundle(tasks)
+
+    def _chunk_done(self, job, index, chunk_hash, translated_text=None, error=None):
+        """
+        Verbucht ein fertiges Teilstück. Ist es das letzte seiner Datei, wird die
+        Datei in Originalreihenfolge zusammengesetzt und geschrieben.
+
+        Ein endgültig gescheitertes Teilstück (error) bricht die übrigen
+        Teilstücke der Datei nicht ab: Sie werden weiter übersetzt und
+        gespeichert, damit ein neuer Lauf nur die gescheiterten wiederholt.
+        Die Datei selbst gilt dann als fehlgeschlagen.
+
+        Returns:
+            str: Ergebnismeldung, wenn die Datei damit fertig ist, sonst None.
+        """
+        if error is not None:
+            if job.error is None:
+                job.error = f"Teil {index + 1}/{len(job.parts)}: {error}"
+        else:
+            self.workspace.save_chunk(job.file_name, index, chunk_hash, translated_text)
+            job.parts[index] = translated_text
+        job.pending -= 1
+        if job.pending:
+            return None
+        if job.error is not None:
+            return self._save_failure(job.file_name, job.error)
+        return self._finish_job(job)
+
+    def _chunk_finished(self, job, index, chunk_hash, file_done, translated_text=None, error=None):
+        """Verbucht ein angefragtes Teilstück und alle gleichen Teilstücke, die darauf warten."""
+        if error is None and chunk_hash in self._isolated_hashes:
+            self._shared_translations[chunk_hash] = translated_text
+        file_done(self._chunk_done(job, index, chunk_hash, translated_text, error))
+        for other_job, other_index in self._waiting.pop(chunk_hash, ()):
+            file_done(self._chunk_done(other_job, other_index, chunk_hash, translated_text, error))
+
+    def _task_finished(self, task, file_done, result=None, error=None):
+        """Verbucht das Ergebnis eines Auftrags aus _iter_chunk_tasks (Teilstück oder Paket)."""
+        if not isinstance(task, _Bundle):
+            job, index, _, chunk_hash = task
+            self._chunk_finished(job, index, chunk_hash, file_done, result, error)
+            return
+        results = result if error is None else [(None, error)] * len(task.tasks)
+        for (job, index, _, chunk_hash), (translated_text, item_error) in zip(task.tasks, results):
+            self._chunk_finished(job, index, chunk_hash, file_done, translated_text, item_error)
 
-        # Filter
-        files_to_process = [
-            f for f in files
-            if not f.name.endswith("_DE.txt") and not f.name.endswith("_FAILURE_DE.txt")
+    @staticmethod
+    def _chunk_label(job, index):
+        return f"{job.file_name} (Teil {index + 1}/{len(job.parts)})"
+
+    def _discover_files(self):
+        """
+        Liefert die zu übersetzenden Quelldateien.
+
+        Mit Manifest (Normalfall) in Lesereihenfolge, ohne Verzeichnissuche.
+        Ältere Extraktionen ohne Manifest werden wie bisher per Dateiendung erkannt.
+        """
+        self._existing_names = self.workspace.names()
+
+        manifest = self.workspace.load_manifest()
+        if manifest is not None:
+            self._chapters = {chapter["file"]: chapter for chapter in manifest["chapters"]}
+            return [chapter["file"] for chapter in manifest["chapters"]]
+
+        self._log("Kein Manifest gefunden, suche Textdateien im Ordner...")
+        return [
+            name for name in sorted(self._existing_names)
+            if name.endswith(".txt")
+            and not name.endswith(TRANSLATION_SUFFIX) and not name.endswith(FAILURE_SUFFIX)
         ]
 
+    def _file_size(self, file_name):
+        """Größe einer Quelldatei in Bytes oder geschätzten Tokens (aus dem Manifest, sonst gemessen)."""
+        chapter = self._chapters.get(file_name)
+        if chapter is not None:
+            if self.size_unit == "bytes":
+                return chapter["bytes"]
+            return estimate_tokens_from_chars(chapter["chars"])
+        size = self.workspace.size(file_name)
+        return size if self.size_unit == "bytes" else estimate_tokens_from_chars(size)
+
+    def _schedule_files(self, files_to_process):
+        """Sortiert die Dateien gemäß der Scheduling-Strategie (stabil, sonst Lesereihenfolge)."""
+        if self.schedule == "spine":
+            return files_to_process
+        # Bereits übersetzte Dateien kosten nichts und werden vorne sofort gemeldet
+        sizes = {
+            file_name: 0 if translation_name(file_name) in self._existing_names else self._file_size(file_name)
+            for file_name in files_to_process
+        }
+        if self.schedule == "largest":
+            return sorted(files_to_process, key=lambda file_name: (sizes[file_name] == 0, sizes[file_name]),
+                          reverse=True)
+        return sorted(files_to_process, key=sizes.get)
+
+    def process_files(self):
+        try:
+            self._process_files()
+        finally:
+            self.workspace.close()
+            if self.cache is not None:
+                self.cache.close()
+
+    def _process_files(self):
+        files_to_process = self._discover_files()
+
         total_files = len(files_to_process)
-        self._log(f"Starte parallele Übersetzung für {total_files} Dateien mit {self.max_workers} Workern...")
+        self._log(f"Starte parallele Übersetzung für {total_files} Dateien mit {self.max_workers} "
+                  f"gleichzeitigen Anfragen (Engine: {self.engine}, Reihenfolge: {self.schedule})...")
 
         if total_files == 0:
             return
 
+        files_to_process = self._schedule_files(files_to_process)
+        self.concurrency = None
+        if self.adaptive:
+            self.concurrency = AimdController(self.min_workers, self.max_workers,
+                                              on_change=self._concurrency_changed)
+            self._log(f"Adaptive Parallelität: {self.min_workers} bis {self.max_workers}, "
+                      f"Start mit {self.concurrency.limit}.")
+            if self.concurrency_callback:
+                self.concurrency_callback(self.concurrency.limit)
+        self._log(f"Teilstücke: bis {self.chunk_tokens} Tokens, Zählung: {self.tokenizer_info}.")
+        if self.rate_limiter:
+            self._log(f"Kontingent: {self.rate_limiter.describe()} (Auslastung bis "
+                      f"{DEFAULT_HEADROOM:.0%}).")
+        if len(self.pool) > 1:
+            self._log(f"Endpunkte: {'; '.join(endpoint.describe() for endpoint in self.pool.endpoints)}.")
+        self.hedging = None
+        if self.hedge and self.engine != "async":
+            self._log("Hedging ist nur mit der Engine async möglich und bleibt aus.")
+        elif self.hedge:
+            self.hedging = HedgePolicy(self.hedge_percentile, self.hedge_budget)
+            self._log(f"Hedging: Duplikat ab dem {self.hedge_percentile:.0%}-Perzentil der Latenz, "
+                      f"höchstens {self.hedge_budget:.0%} zusätzliche Tokens.")
+        self._repeated_keys = set()
+        self._isolated_hashes = set()
+        self._shared_translations = {}
+        self._waiting = {}
+        self._dedup_stats = [0, 0, 0]
+        self._pack_stats = [0, 0, 0]
+        self.stream_metrics = StreamMetrics()
+        if self.dedup:
+            self._find_repeated(files_to_process)
+        start_time = time.perf_counter()
+
         completed_count = 0
 
+        def file_done(result_message):
+            nonlocal completed_count
+            if result_message is None:
+                return
+            self._log(result_message)
+
+            completed_count += 1
+            if self.progress_callback:
+                self.progress_callback(completed_count, total_files)
+
+        # Alle offenen Teilstücke aller Dateien in einer gemeinsamen Warteschlange:
+        # ein langes Kapitel wird von allen Workern gleichzeitig übersetzt.
+        tasks = self._iter_chunk_tasks(files_to_process, file_done)
+        if self.engine == "async":
+            asyncio.run(self._run_async(tasks, file_done))
+        else:
+            self._run_threads(tasks, file_done)
+
+        self.makespan = time.perf_counter() - start_time
+        self._log(f"Übersetzung beendet nach {self.makespan:.1f} s.")
+        if self.rate_limiter:
+            self._log(f"Wartezeit wegen Kontingent (Summe aller Anfragen): {self.rate_limiter.waited:.1f} s.")
+        saved_chunks, saved_chars, pending_chars = self._dedup_stats
+        if saved_chunks:
+            ratio = saved_chars / pending_chars
+            self._log(f"Deduplizierung: {saved_chunks} Teilstücke ({saved_chars} Zeichen, {ratio:.1%}) "
+                      f"nicht erneut angefragt.")
+        if self.stream:
+            self._log(f"Streaming: {self.stream_metrics.describe()}.")
+        if len(self.pool) > 1:
+            self._log(f"Endpunkte: {self.pool.describe()}.")
+        if self.hedging is not None:
+            self._log(f"Hedging: {self.hedging.describe()}.")
+        bundles, packed_files, unpacked = self._pack_stats
+        if bundles:
+            self._log(f"Pakete: {packed_files} kleine Dateien in {bundles} Anfragen, "
+                      f"{unpacked} Pakete einzeln wiederholt.")
+        if self.cache is not None:
+            self._log(f"Übersetzungsspeicher: {self.cache.describe()}.")
+
+    def _concurrency_changed(self, old, new, reason):
+        self._log(f"Parallelität: {old} -> {new} ({reason})")
+        if self.concurrency_callback:
+            self.concurrency_callback(new)
+        if self._limit_changed is not None:
+            # Wartende Koroutinen der Engine "async" prüfen ihr Limit neu
+            self._limit_changed.set()
+
+    def _request_finished(self, token, started, chunk, error):
+        """Meldet Dauer bzw. Überlast einer Anfrage an die adaptive Parallelität."""
+        if self.concurrency is None:
+            return
+        if error is None:
+            self.concurrency.succeeded(token, time.perf_counter() - started, len(chunk))
+            return
+        reason = _overload_reason(error)
+        if reason:
+            self.concurrency.overloaded(token, reason)
+
+    def _run_threads(self, tasks, file_done):
+        """
+        Übersetzt die Teilstücke mit einem Thread-Pool. Es sind höchstens
+        2 * max_workers Aufträge gleichzeitig eingereicht, bei adaptiver
+        Parallelität genau so viele, wie der Regler gerade erlaubt.
+        """
+        pending = {}
+
+        def limit():
+            return self.concurrency.limit if self.concurrency else 2 * self.max_workers
+
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_file = {
-                executor.submit(self._process_single_file, f): f
-                for f in files_to_process
-            }
-
-            for future in as_completed(future_to_file):
-                result_message = future.result()
-                self._log(result_message)
-                
-                completed_count += 1
-                if self.progress_callback:
-                    self.progress_callback(completed_count, total_files)
+            def submit_next():
+                task = next(tasks, None)
+                if task is None:
+                    return False
+                pending[executor.submit(self._request_task, task)] = task
+                return True
+
+            self._stop_event.clear()
+            try:
+                while len(pending) < limit() and submit_next():
+                    pass
+
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task = pending.pop(future)
+                        try:
+                            result, error = future.result(), None
+                        except TranslationCancelled:
+                            raise
+                        except Exception as e:
+                            result, error = None, e
+                        self._task_finished(task, file_done, result, error)
+                    while len(pending) < limit() and submit_next():
+                        pass
+            finally:
+                # Beim Abbruch nicht auf laufende Wiederholungen warten
+                self._stop_event.set()
+                for future in pending:
+                    future.cancel()
+
+    async def _run_async(self, tasks, file_done):
+        """
+        Übersetzt die Teilstücke in einer Event-Loop: max_workers Koroutinen holen
+        sich nacheinander Teilstücke aus der gemeinsamen Warteschlange.
+
+        Log- und Fortschritts-Callbacks laufen im aufrufenden Thread. Wirft ein
+        Callback (z.B. Abbruch in der GUI), werden die offenen Anfragen abgebrochen.
+
+        Bei adaptiver Parallelität arbeiten nur die Koroutinen mit einer
+        Nummer unterhalb des aktuellen Limits, die übrigen warten.
+        """
+        limit_changed = self._limit_changed = asyncio.Event()
+        exhausted = False
+
+        async def worker(slot):
+            nonlocal exhausted
+            while True:
+                while self.concurrency and slot >= self.concurrency.limit and not exhausted:
+                    limit_changed.clear()
+                    await limit_changed.wait()
+                task = next(tasks, None)
+                if task is None:
+                    break
+                try:
+                    result = await self._request_task_async(task)
+                except TranslationCancelled:
+                    raise
+                except Exception as e:
+                    self._task_finished(task, file_done, error=e)
+                    continue
+                self._task_finished(task, file_done, result)
+            # Keine Teilstücke mehr: wartende Koroutinen beenden sich
+            exhausted = True
+            limit_changed.set()
+
+        async with contextlib.AsyncExitStack() as clients:
+            for endpoint in self.pool.endpoints:
+                endpoint.async_client = await clients.enter_async_context(
+                    AsyncOpenAI(api_key=endpoint.api_key, base_url=endpoint.base_url, max_retries=0))
+            self.async_client = self.pool.endpoints[0].async_client
+            workers = [asyncio.create_task(worker(slot)) for slot in range(self.max_workers)]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                for endpoint in self.pool.endpoints:
+                    endpoint.async_client = None
+                self.async_client = None
+                self._limit_changed = None
+
+
+class _FileJob:
+    """Übersetzungsstand einer Datei: Teilübersetzungen in Originalreihenfolge."""
+
+    __slots__ = ("file_name", "parts", "separators", "pending", "error")
+
+    def __init__(self, file_name, parts, separators):
+        self.file_name = file_name
+        self.parts = parts
+        self.separators = separators  # Leerraum hinter jedem Teilstück im Original
+        self.pending = sum(part is None for part in parts)
+        self.error = None     # Erster endgültiger Fehler eines Teilstücks
+
+
+class _Bundle:
+    """Mehrere kleine Dateien, die in einer Anfrage übersetzt werden."""
+
+    __slots__ = ("tasks",)
+
+    def __init__(self, tasks):
+        self.tasks = tasks    # (_FileJob, Index, Teilstück, Hash) je Datei
+
+    def label(self):
+        first, last = self.tasks[0][0].file_name, self.tasks[-1][0].file_name
+        return f"Paket mit {len(self.tasks)} Dateien ({first} bis {last})"
 
 def main():
     parser = argparse.ArgumentParser(description="Übersetzt Textdateien parallel mit Kimi.")
-    parser.add_argument("ordner", help="Pfad zum Ordner mit den extrahierten Textdateien.")
-    parser.add_argument("--api_key", required=True, help="Der API Key.")
+    parser.add_argument("ordner", help="Pfad zum Ordner mit den extrahierten Textdateien "
+                                       "oder zur Workspace-Datei (.sqlite).")
+    parser.add_argument("--api_key", default=None, help="Der API Key (mit --endpoints optional).")
     parser.add_argument("--base_url", default="https://api.moonshot.ai/v1", help="Basis URL der API.")
     parser.add_argument("--model", default="kimi-k2.5", help="Modellname.")
-    parser.add_argument("--workers", type=int, default=3, help="Anzahl Arbeiter.")
+    parser.add_argument("--workers", type=int, default=3,
+                        help="Anzahl gleichzeitiger Anfragen (async: auch 50-200 möglich).")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Parallelität automatisch anpassen (AIMD): wächst bei stabiler Latenz, "
+                             "sinkt bei 429/5xx oder Latenzsprüngen. --workers ist dann die Obergrenze.")
+    parser.add_argument("--min-workers", type=int, default=1,
+                        help="Untergrenze der Parallelität mit --adaptive (Standard: %(default)s).")
+    parser.add_argument("--rpm", type=int, default=None,
+                        help="Kontingent: Anfragen pro Minute (überschreibt --rate-limits).")
+    parser.add_argument("--tpm", type=int, default=None,
+                        help="Kontingent: Tokens pro Minute (überschreibt --rate-limits).")
+    parser.add_argument("--rate-limits", default=None,
+                        help="JSON-Datei mit Kontingenten je base_url/Modell (siehe rate_limit.py).")
+    parser.add_argument("--endpoints", default=None,
+                        help="JSON-Datei mit mehreren Endpunkten bzw. API-Keys (base_url, api_key, model, "
+                             "weight, max_concurrency, rpm, tpm; siehe endpoints.py). Die Anfragen werden "
+                             "nach Gewicht und offenen Anfragen verteilt, versagende Endpunkte gesperrt.")
+    parser.add_argument("--retries", type=int, default=5,
+                        help="Wiederholungen je Teilstück bei vorübergehenden Fehlern "
+                             "(429, 5xx, Timeout; Standard: %(default)s).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Übersetzungsspeicher weder lesen noch füllen (jedes Teilstück neu anfragen).")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="Übersetzungsspeicher vor dem Lauf leeren.")
+    parser.add_argument("--cache", default=None,
+                        help=f"Datei des Übersetzungsspeichers (Standard: {default_cache_path()}).")
+    parser.add_argument("--cache-size-mb", type=float, default=DEFAULT_MAX_MB,
+                        help="Maximale Größe des Übersetzungsspeichers in MB (Standard: %(default)s).")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Wiederholte Absätze nicht zusammenfassen (jedes Vorkommen einzeln übersetzen).")
+    parser.add_argument("--dedup-min-chars", type=int, default=DEDUP_MIN_CHARS,
+                        help="Mindestlänge wiederholter Absätze in Zeichen (Standard: %(default)s; "
+                             "z.B. 1 auch für Trennzeilen wie \"* * *\").")
+    parser.add_argument("--pack", action="store_true",
+                        help="Kleine Dateien (z.B. Zwischentitel, Epigraphe) gebündelt in einer Anfrage "
+                             "übersetzen; unvollständige Antworten werden einzeln wiederholt.")
+    parser.add_argument("--chunk-tokens", type=int, default=None,
+                        help=f"Tokenbudget je Teilstück (Standard: {DEFAULT_CHUNK_TOKENS}, bei Modellen mit "
+                             f"kleinem Kontextfenster entsprechend weniger).")
+    parser.add_argument("--context-tokens", action="append", default=[], metavar="MODELL=TOKENS",
+                        help="Kontextfenster eines Modells (bzw. aller Modelle mit diesem Präfix) in "
+                             "Tokens, z.B. für eigene oder lokale Modelle; mehrfach angebbar.")
+    parser.add_argument("--tokenizer", default="heuristic",
+                        help=f"Tokenzählung: {' oder '.join(TOKENIZERS)} (optional mit Kodierung, z.B. "
+                             f"tiktoken:cl100k_base; Standard: Schätzung ohne Download).")
+    parser.add_argument("--stream", action="store_true",
+                        help="Antworten streamen: Fortschritt je Teilstück, Zeit bis zum ersten Token; "
+                             "ein abgebrochener Stream wird beim nächsten Versuch fortgesetzt.")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Anfragen, die länger als üblich dauern, ein zweites Mal senden; die erste "
+                             "Antwort gilt, die andere wird abgebrochen (nur Engine async).")
+    parser.add_argument("--hedge-percentile", type=float, default=HEDGE_PERCENTILE * 100,
+                        help="Perzentil der bisherigen Latenzen, ab dem dupliziert wird (Standard: %(default)g).")
+    parser.add_argument("--hedge-budget", type=float, default=HEDGE_BUDGET * 100,
+                        help="Höchstens so viel Prozent zusätzliche Tokens für Duplikate (Standard: %(default)g).")
+    parser.add_argument("--engine", choices=ENGINES, default="async",
+                        help="'async' (eine Event-Loop, viele Anfragen) oder 'thread' (ein Thread pro Worker).")
+    parser.add_argument("--schedule", choices=SCHEDULES, default="spine",
+                        help="Reihenfolge der Dateien: 'spine' (Lesereihenfolge), 'largest' (größte "
+                             "zuerst, LPT) oder 'smallest' (schnell erste fertige Kapitel).")
+    parser.add_argument("--size-unit", choices=SIZE_UNITS, default="tokens",
+                        help="Größenmaß für --schedule: geschätzte Tokens oder Bytes.")
     
     args = parser.parse_args()
+    if not args.api_key and not args.endpoints:
+        parser.error("--api_key ist erforderlich (oder --endpoints mit Keys je Eintrag).")
 
     try:
+        cache_path = args.cache or default_cache_path()
+        if args.clear_cache:
+            with TranslationCache(cache_path) as cache:
+                cache.clear()
+            print(f"Übersetzungsspeicher geleert: {cache_path}")
+
+        rpm, tpm = None, None
+        limits = load_limits(args.rate_limits) if args.rate_limits else None
+        endpoints = None
+        if args.endpoints:
+            endpoints = load_endpoints(args.endpoints, args.base_url, args.api_key, args.model)
+            # Eigene Kontingente je Endpunkt; fehlen sie, gelten die aus --rate-limits
+            for entry in endpoints:
+                if limits and entry["rpm"] is None and entry["tpm"] is None:
+                    entry["rpm"], entry["tpm"] = lookup_limits(limits, entry["base_url"], entry["model"])
+        elif limits:
+            rpm, tpm = lookup_limits(limits, args.base_url, args.model)
         translator = KimiTranslator(
             input_dir=args.ordner,
-            api_key=args.api_key,
+            api_key=args.api_key or endpoints[0]["api_key"],
             base_url=args.base_url,
             model_name=args.model,
-            max_workers=args.workers
+            max_workers=args.workers,
+            engine=args.engine,
+            schedule=args.schedule,
+            size_unit=args.size_unit,
+            adaptive=args.adaptive,
+            min_workers=args.min_workers,
+            rpm=args.rpm if args.rpm is not None else rpm,
+            tpm=args.tpm if args.tpm is not None else tpm,
+            max_retries=args.retries,
+            cache_path=None if args.no_cache else cache_path,
+            cache_size_mb=args.cache_size_mb,
+            dedup=not args.no_dedup,
+            dedup_min_chars=args.dedup_min_chars,
+            pack=args.pack,
+            chunk_tokens=args.chunk_tokens,
+            context_tokens=parse_context_tokens(args.context_tokens),
+            tokenizer=args.tokenizer,
+            stream=args.stream,
+            endpoints=endpoints,
+            hedge=args.hedge,
+            hedge_percentile=args.hedge_percentile / 100,
+            hedge_budget=args.hedge_budget / 100
         )
         translator.process_files()
     except Exception as e:
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Übersetzungsspeicher (Translation Memory) über Bücher und Läufe hinweg.
+
+Eine SQLite-Datei ordnet jedem Teilstück seine Übersetzung zu. Der Schlüssel
+ist ein SHA-256 über Quelltext, Modell, Systemprompt und Base URL: Dieselbe
+Anfrage an dieselbe API wird nie zweimal bezahlt, etwa bei einer
+korrigierten Neuauflage oder einem erneuten Lauf mit anderem Ausgabeformat.
+
+Die Größe ist begrenzt; es werden die am längsten nicht benutzten Einträge
+entfernt (LRU). Mehrere Prozesse können den Speicher gleichzeitig nutzen
+(WAL-Modus, Schreibzugriffe in kurzen Transaktionen).
+
+    python translation_cache.py stats
+    python translation_cache.py clear
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import sqlite3
+import threading
+from pathlib import Path
+
+
+DEFAULT_MAX_MB = 500
+# Nach so vielen neuen Einträgen wird die Größe geprüft
+_EVICT_INTERVAL = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    translation TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+
+def default_cache_path():
+    """Speicherort im Cache-Ordner des Benutzers (XDG bzw. LOCALAPPDATA)."""
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "epub_translation" / "translation_memory.sqlite"
+
+
+def cache_key(text, model_name, system_prompt, base_url):
+    """SHA-256 über alles, was die Übersetzung bestimmt."""
+    payload = json.dumps([base_url.rstrip("/"), model_name, system_prompt, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """
+    Attribute:
+        path (Path): Die SQLite-Datei.
+        max_bytes (int): Obergrenze für die Summe der gespeicherten Übersetzungen.
+        hits (int): Treffer in diesem Prozess.
+        misses (int): Fehlschläge in diesem Prozess.
+    """
+
+    def __init__(self, path=None, max_mb=DEFAULT_MAX_MB):
+        self.path = Path(path) if path else default_cache_path()
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.RLock()
+        self._puts = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                if self._puts % _EVICT_INTERVAL:
+                    # Auch nach kurzen Läufen die Obergrenze einhalten
+                    try:
+                        self.evict()
+                    except sqlite3.Error:
+                        pass
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # isolation_level=None: Transaktionen werden explizit geöffnet
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key, count_miss=True):
+        """
+        Liefert die gespeicherte Übersetzung und markiert sie als benutzt.
+
+        Args:
+            key (str): Schlüssel aus cache_key().
+            count_miss (bool): False, wenn ein Fehlschlag erst bei einer
+                               späteren Suche bzw. mit count_misses() zählt.
+
+        Returns:
+            str: Übersetzung oder None.
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT translation FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+            conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def count_misses(self, count):
+        """Zählt Fehlschläge aus get(count_miss=False) nachträglich."""
+        with self._lock:
+            self.misses += count
+
+    def put(self, key, translation):
+        """Speichert eine Übersetzung; gelegentlich werden alte Einträge verdrängt."""
+        if not translation:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO entries (key, translation, size, last_used) "
+                         "VALUES (?, ?, ?, ?)",
+                         (key, translation, len(translation.encode("utf-8")), time.time()))
+            self._puts += 1
+            if self._puts % _EVICT_INTERVAL == 0:
+                self.evict()
+
+    def evict(self):
+        """
+        Entfernt die am längsten nicht benutzten Einträge, bis die Größe unter
+        max_bytes liegt.
+
+        Returns:
+            int: Anzahl entfernter Einträge.
+        """
+        with self._lock:
+            conn = self._connection()
+            # BEGIN IMMEDIATE: nur ein Prozess zur Zeit räumt auf
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                removed = 0
+                if total > self.max_bytes:
+                    excess = total - self.max_bytes
+                    freed = 0
+                    keys = []
+                    for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+                        keys.append((key,))
+                        freed += size
+                        if freed >= excess:
+                            break
+                    conn.executemany("DELETE FROM entries WHERE key = ?", keys)
+                    removed = len(keys)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return removed
+
+    def clear(self):
+        """Löscht alle Einträge."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM entries")
+            conn.execute("VACUUM")
+
+    def stats(self):
+        """
+        Returns:
+            dict: Anzahl Einträge und Größe der Übersetzungen in Bytes.
+        """
+        with self._lock:
+            count, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": size}
+
+    def describe(self):
+        """Zusammenfassung der Treffer dieses Prozesses für das Log."""
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0
+        return f"{self.hits} Treffer, {self.misses} neu übersetzt ({rate:.0%} aus dem Speicher)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verwaltet den Übersetzungsspeicher.")
+    parser.add_argument("befehl", choices=("stats", "clear"), help="'stats' zeigt die Größe, 'clear' leert ihn.")
+    parser.add_argument("--cache", default=None, help=f"Die Speicherdatei (Standard: {default_cache_path()}).")
+
+    args = parser.parse_args()
+
+    try:
+        with TranslationCache(args.cache) as cache:
+            if args.befehl == "clear":
+                cache.clear()
+                print(f"Übersetzungsspeicher geleert: {cache.path}")
+            else:
+                stats = cache.stats()
+                print(f"{cache.path}: {stats['entries']} Einträge, "
+                      f"{stats['bytes'] / (1024 * 1024):.1f} MB")
+    except Exception as e:
+        print(f"Ein Fehler ist aufgetreten: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Arbeitsbereich der Pipeline (Extraktion -> Übersetzung -> Zusammenfügen).
+
+Standard ist ein Ordner mit einer Textdatei pro Kapitel ('Kapitel.txt',
+'Kapitel_DE.txt', 'Kapitel_FAILURE_DE.txt') und 'manifest.json'. Solange
+ein Kapitel übersetzt wird, hält 'Kapitel.chunks.jsonl' jedes fertige
+Teilstück fest (nur angehängt), damit ein Neustart dort weitermacht; beim
+Streaming sammelt 'Kapitel.0003.partial' den bisher empfangenen Text eines
+Teilstücks. Optional
+liegt alles in einer einzigen SQLite-Datei (WAL-Modus): Quelltexte,
+Übersetzungen, übersetzte Teilstücke und Status. Das spart bei Büchern mit
+tausenden Kapiteln die vielen Dateien und Verzeichnissuchen, z.B. auf
+Netzlaufwerken.
+
+Beide Varianten bieten dieselbe Schnittstelle und arbeiten mit denselben
+Dateinamen; die Stufen merken keinen Unterschied. Ein Store lässt sich
+jederzeit in das Ordner-Layout exportieren:
+
+    python workspace.py export buch.sqlite buch_ordner
+"""
+
+import os
+import sys
+import json
+import argparse
+import sqlite3
+import threading
+from glob import escape as glob_escape
+from pathlib import Path
+
+from book_manifest import (
+    MANIFEST_VERSION, TRANSLATION_SUFFIX, FAILURE_SUFFIX, SEGMENTS_SUFFIX,
+    load_manifest, save_manifest, translation_name, failure_name, segments_name, journal_name,
+    partial_name, PARTIAL_SUFFIX,
+)
+
+
+# Dateiendungen, an denen ein Workspace-Store erkannt wird
+STORE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+STATUS_EXTRACTED = "extracted"
+STATUS_TRANSLATED = "translated"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    file TEXT PRIMARY KEY,
+    position INTEGER,
+    entry TEXT,
+    text TEXT,
+    status TEXT NOT NULL DEFAULT 'extracted',
+    translation TEXT,
+    segments TEXT
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    file TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    source_sha256 TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    PRIMARY KEY (file, chunk_index)
+);
+CREATE TABLE IF NOT EXISTS partials (
+    file TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    source_sha256 TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (file, chunk_index)
+);
+"""
+
+
+def _split_name(name):
+    """
+    Ordnet einen Dateinamen einem Kapitel zu.
+
+    Returns:
+        tuple: (Kapiteldatei, Art) mit Art "text", "segments", "translation" oder "failure".
+    """
+    if name.endswith(SEGMENTS_SUFFIX):
+        return name[:-len(SEGMENTS_SUFFIX)] + ".txt", "segments"
+    if name.endswith(FAILURE_SUFFIX):
+        return name[:-len(FAILURE_SUFFIX)] + ".txt", "failure"
+    if name.endswith(TRANSLATION_SUFFIX):
+        return name[:-len(TRANSLATION_SUFFIX)] + ".txt", "translation"
+    return name, "text"
+
+
+class DirectoryWorkspace:
+    """
+    Das klassische Ordner-Layout: eine Textdatei pro Kapitel und Übersetzung.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def __str__(self):
+        return str(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        pass
+
+    def exists(self):
+        return self.path.is_dir()
+
+    def prepare(self):
+        """Legt den Ordner an, falls nötig."""
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def names(self):
+        """Menge aller vorhandenen Dateinamen (ein einziger Verzeichnis-Scan)."""
+        return set(os.listdir(self.path))
+
+    def load_manifest(self):
+        return load_manifest(self.path)
+
+    def save_manifest(self, chapters, source=None, extraction=None):
+        save_manifest(self.path, chapters, source=source, extraction=extraction)
+
+    def read_text(self, name):
+        """Liest einen Text. FileNotFoundError, wenn er nicht existiert."""
+        with open(self.path / name, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def write_text(self, name, text):
+        """
+        Schreibt atomar, damit nie eine halb geschriebene Datei liegen bleibt: erst
+        eine temporäre Datei bis auf die Platte, dann umbenennen.
+        """
+        target = self.path / name
+        tmp_file = target.with_name(target.name + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, target)
+
+    def remove(self, name):
+        (self.path / name).unlink()
+
+    def size(self, name):
+        """Größe eines Textes in Bytes."""
+        return (self.path / name).stat().st_size
+
+    def temp_path(self, name):
+        """Pfad für eine temporäre Datei, die später per import_file übernommen wird."""
+        return self.path / name
+
+    def import_file(self, tmp_file, name):
+        """Übernimmt eine fertig geschriebene temporäre Datei unter dem Namen name."""
+        os.replace(tmp_file, self.path / name)
+
+    def load_chunks(self, file_name):
+        """
+        Bereits übersetzte Teilstücke eines Kapitels aus dem Journal.
+
+        Eine unvollständige letzte Zeile (Absturz beim Schreiben) wird
+        ignoriert; bei mehrfachen Einträgen gilt der letzte.
+
+        Returns:
+            dict: chunk_index -> (SHA-256 des Quelltextes, Übersetzung)
+        """
+        chunks = {}
+        try:
+            f = open(self.path / journal_name(file_name), 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return chunks
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    chunks[record["index"]] = (record["sha256"], record["translation"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return chunks
+
+    def save_chunk(self, file_name, chunk_index, source_sha256, translation):
+        """Hängt ein übersetztes Teilstück an das Journal an (sofort auf die Platte)."""
+        record = {"index": chunk_index, "sha256": source_sha256, "translation": translation}
+        with open(self.path / journal_name(file_name), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear_chunks(self, file_name):
+        """Entfernt Journal und Teilpuffer, wenn die Übersetzung fertig geschrieben ist."""
+        try:
+            (self.path / journal_name(file_name)).unlink()
+        except FileNotFoundError:
+            pass
+        pattern = f"{glob_escape(Path(file_name).stem)}.[0-9][0-9][0-9][0-9]{PARTIAL_SUFFIX}"
+        for partial in self.path.glob(pattern):
+            partial.unlink(missing_ok=True)
+
+    def load_partial(self, file_name, chunk_index, source_sha256):
+        """
+        Bisher empfangener Text eines gestreamten Teilstücks.
+
+        Returns:
+            str: Der Text oder None, wenn keiner vorliegt oder er zu einem
+                 anderen Quelltext gehört.
+        """
+        try:
+            with open(self.path / partial_name(file_name, chunk_index), 'r', encoding='utf-8',
+                      newline='') as f:
+                sha, _, text = f.read().partition("\n")
+        except FileNotFoundError:
+            return None
+        return text if sha == source_sha256 and text else None
+
+    def append_partial(self, file_name, chunk_index, source_sha256, text, start=False):
+        """
+        Hängt empfangenen Text an den Teilpuffer an (start=True beginnt ihn neu).
+        Die erste Zeile der Datei ist der SHA-256 des Quelltextes.
+        """
+        path = self.path / partial_name(file_name, chunk_index)
+        with open(path, 'w' if start else 'a', encoding='utf-8', newline='') as f:
+            if start:
+                f.write(source_sha256 + "\n")
+            f.write(text)
+
+    def clear_partial(self, file_name, chunk_index):
+        try:
+            (self.path / partial_name(file_name, chunk_index)).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class WorkspaceStore:
+    """
+    Der Arbeitsbereich in einer SQLite-Datei (WAL-Modus).
+
+    Pro Kapitel eine Zeile mit Manifest-Eintrag, Quelltext, Segmenten, Status
+    ("extracted", "translated", "failed") und Übersetzung; dazu die
+    übersetzten Teilstücke, damit ein abgebrochenes Kapitel nicht von vorne
+    übersetzt werden muss. Die Dateinamen des Ordner-Layouts werden auf diese
+    Spalten abgebildet ('Kapitel_DE.txt' ist die Übersetzung von 'Kapitel.txt').
+
+    Die Verbindung wird von mehreren Übersetzer-Threads geteilt und ist durch
+    ein Lock geschützt; mehrere Prozesse arbeiten dank WAL nebeneinander.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def __str__(self):
+        return str(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(chapters)")}
+            if "segments" not in columns:
+                # Stores aus der Zeit vor den Segmenten
+                conn.execute("ALTER TABLE chapters ADD COLUMN segments TEXT")
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute(sql, params).fetchall()
+
+    def exists(self):
+        return self.path.is_file()
+
+    def prepare(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._connection()
+
+    def names(self):
+        names = set()
+        for file_name, has_text, has_segments, status in self._execute(
+                "SELECT file, text IS NOT NULL, segments IS NOT NULL, status FROM chapters"):
+            if has_text:
+                names.add(file_name)
+            if has_segments:
+                names.add(segments_name(file_name))
+            if status == STATUS_TRANSLATED:
+                names.add(translation_name(file_name))
+            elif status == STATUS_FAILED:
+                names.add(failure_name(file_name))
+        return names
+
+    def load_manifest(self):
+        meta = dict(self._execute("SELECT key, value FROM meta"))
+        if "version" not in meta:
+            return None
+        rows = self._execute("SELECT entry FROM chapters WHERE position IS NOT NULL "
+                             "ORDER BY position")
+        return {
+            "version": int(meta["version"]),
+            "source": json.loads(meta.get("source", "null")),
+            "extraction": json.loads(meta.get("extraction", "{}")),
+            "chapters": [json.loads(entry) for entry, in rows],
+        }
+
+    def save_manifest(self, chapters, source=None, extraction=None):
+        """
+        Speichert das Manifest in einer Transaktion. Kapitel, die nicht mehr zum
+        Buch gehören, werden samt Übersetzung entfernt.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                    ("version", str(MANIFEST_VERSION)),
+                    ("source", json.dumps(source, ensure_ascii=False)),
+                    ("extraction", json.dumps(extraction or {}, ensure_ascii=False)),
+                ])
+                conn.execute("UPDATE chapters SET position = NULL, entry = NULL")
+                conn.executemany(
+                    "INSERT INTO chapters (file, position, entry) VALUES (?, ?, ?) "
+                    "ON CONFLICT(file) DO UPDATE SET position = excluded.position, entry = excluded.entry",
+                    [(chapter["file"], position, json.dumps(chapter, ensure_ascii=False))
+                     for position, chapter in enumerate(chapters)])
+                conn.execute("DELETE FROM chunks WHERE file IN "
+                             "(SELECT file FROM chapters WHERE position IS NULL)")
+                conn.execute("DELETE FROM partials WHERE file IN "
+                             "(SELECT file FROM chapters WHERE position IS NULL)")
+                conn.execute("DELETE FROM chapters WHERE position IS NULL")
+
+    def read_text(self, name):
+        file_name, kind = _split_name(name)
+        rows = self._execute("SELECT text, status, translation, segments FROM chapters "
+                             "WHERE file = ?", (file_name,))
+        if rows:
+            text, status, translation, segments = rows[0]
+            if kind == "text" and text is not None:
+                return text
+            if kind == "segments" and segments is not None:
+                return segments
+            if kind == "translation" and status == STATUS_TRANSLATED:
+                return translation
+            if kind == "failure" and status == STATUS_FAILED:
+                # Wie im Ordner-Layout: die Fehlerdatei enthält das Original
+                return text
+        raise FileNotFoundError(f"Nicht im Workspace: {name}")
+
+    def write_text(self, name, text):
+        file_name, kind = _split_name(name)
+        if kind == "text":
+            self._execute("INSERT INTO chapters (file, text) VALUES (?, ?) "
+                          "ON CONFLICT(file) DO UPDATE SET text = excluded.text",
+                          (file_name, text))
+        elif kind == "segments":
+            self._execute("INSERT INTO chapters (file, segments) VALUES (?, ?) "
+                          "ON CONFLICT(file) DO UPDATE SET segments = excluded.segments",
+                          (file_name, text))
+        elif kind == "translation":
+            self._execute("INSERT INTO chapters (file, status, translation) VALUES (?, ?, ?) "
+                          "ON CONFLICT(file) DO UPDATE SET status = excluded.status, "
+                          "translation = excluded.translation",
+                          (file_name, STATUS_TRANSLATED, text))
+        else:
+            self._execute("INSERT INTO chapters (file, status) VALUES (?, ?) "
+                          "ON CONFLICT(file) DO UPDATE SET status = excluded.status, translation = NULL",
+                          (file_name, STATUS_FAILED))
+
+    def remove(self, name):
+        file_name, kind = _split_name(name)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                if kind == "text":
+                    conn.execute("DELETE FROM chapters WHERE file = ?", (file_name,))
+                elif kind == "segments":
+                    conn.execute("UPDATE chapters SET segments = NULL WHERE file = ?", (file_name,))
+                    return
+                else:
+                    conn.execute("UPDATE chapters SET status = ?, translation = NULL WHERE file = ?",
+                                 (STATUS_EXTRACTED, file_name))
+                conn.execute("DELETE FROM chunks WHERE file = ?", (file_name,))
+                conn.execute("DELETE FROM partials WHERE file = ?", (file_name,))
+
+    def size(self, name):
+        file_name, kind = _split_name(name)
+        column = {"segments": "segments", "translation": "translation"}.get(kind, "text")
+        rows = self._execute(f"SELECT length(CAST({column} AS BLOB)) FROM chapters WHERE file = ?",
+                             (file_name,))
+        if not rows or rows[0][0] is None:
+            raise FileNotFoundError(f"Nicht im Workspace: {name}")
+        return rows[0][0]
+
+    def temp_path(self, name):
+        return self.path.with_name(f"{self.path.name}.{name}")
+
+    def import_file(self, tmp_file, name):
+        """Übernimmt eine temporäre Datei in den Store (liest sie dazu einmal komplett)."""
+        with open(tmp_file, 'r', encoding='utf-8') as f:
+            self.write_text(name, f.read())
+        os.unlink(tmp_file)
+
+    def load_chunks(self, file_name):
+        """
+        Bereits übersetzte Teilstücke eines Kapitels.
+
+        Returns:
+            dict: chunk_index -> (SHA-256 des Quelltextes, Übersetzung)
+        """
+        rows = self._execute("SELECT chunk_index, source_sha256, translation FROM chunks "
+                             "WHERE file = ?", (file_name,))
+        return {index: (sha, translation) for index, sha, translation in rows}
+
+    def save_chunk(self, file_name, chunk_index, source_sha256, translation):
+        self._execute("INSERT OR REPLACE INTO chunks (file, chunk_index, source_sha256, translation) "
+                      "VALUES (?, ?, ?, ?)", (file_name, chunk_index, source_sha256, translation))
+
+    def clear_chunks(self, file_name):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM chunks WHERE file = ?", (file_name,))
+                conn.execute("DELETE FROM partials WHERE file = ?", (file_name,))
+
+    def load_partial(self, file_name, chunk_index, source_sha256):
+        rows = self._execute("SELECT text FROM partials WHERE file = ? AND chunk_index = ? "
+                             "AND source_sha256 = ?", (file_name, chunk_index, source_sha256))
+        return rows[0][0] if rows and rows[0][0] else None
+
+    def append_partial(self, file_name, chunk_index, source_sha256, text, start=False):
+        if start:
+            self._execute("INSERT OR REPLACE INTO partials (file, chunk_index, source_sha256, text) "
+                          "VALUES (?, ?, ?, ?)", (file_name, chunk_index, source_sha256, text))
+        else:
+            self._execute("UPDATE partials SET text = text || ? WHERE file = ? AND chunk_index = ?",
+                          (text, file_name, chunk_index))
+
+    def clear_partial(self, file_name, chunk_index):
+        self._execute("DELETE FROM partials WHERE file = ? AND chunk_index = ?", (file_name, chunk_index))
+
+
+def is_store_path(path):
+    """True, wenn path ein Workspace-Store ist (Dateiendung oder SQLite-Datei)."""
+    path = Path(path)
+    if path.suffix.lower() in STORE_SUFFIXES:
+        return True
+    if path.is_file():
+        with open(path, 'rb') as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    return False
+
+
+def open_workspace(path):
+    """
+    Öffnet einen Arbeitsbereich: SQLite-Store oder Ordner.
+
+    Args:
+        path (str): Ordner oder Store-Datei (Endung .sqlite, .sqlite3 oder .db).
+
+    Returns:
+        DirectoryWorkspace | WorkspaceStore
+    """
+    if is_store_path(path):
+        return WorkspaceStore(path)
+    return DirectoryWorkspace(path)
+
+
+def _pipeline_names(workspace):
+    """Namen der Kapitel- und Übersetzungstexte (ohne Protokolle u.ä.)."""
+    names = workspace.names()
+    manifest = workspace.load_manifest()
+    if manifest is None:
+        return sorted(name for name in names if name.endswith(".txt"))
+    result = []
+    for chapter in manifest["chapters"]:
+        for name in (chapter["file"], segments_name(chapter["file"]),
+                     translation_name(chapter["file"]), failure_name(chapter["file"])):
+            if name in names:
+                result.append(name)
+    return result
+
+
+def copy_workspace(source, target, log_callback=print):
+    """
+    Kopiert Kapitel, Übersetzungen und Manifest von einem Arbeitsbereich in einen
+    anderen (Export eines Stores in Dateien oder Import eines Ordners).
+
+    Returns:
+        int: Anzahl kopierter Texte.
+    """
+    target.prepare()
+    names = _pipeline_names(source)
+    for name in names:
+        target.write_text(name, source.read_text(name))
+    manifest = source.load_manifest()
+    if manifest is not None:
+        target.save_manifest(manifest["chapters"], source=manifest.get("source"),
+                             extraction=manifest.get("extraction"))
+    log_callback(f"{len(names)} Texte von {source} nach {target} kopiert.")
+    return len(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export/Import zwischen Workspace-Store (SQLite) und Ordner mit Textdateien."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Store in einen Ordner mit .txt-Dateien exportieren.")
+    export_parser.add_argument("store", help="Die Store-Datei (.sqlite).")
+    export_parser.add_argument("ordner", help="Zielordner.")
+    import_parser = subparsers.add_parser("import", help="Ordner mit .txt-Dateien in einen Store übernehmen.")
+    import_parser.add_argument("ordner", help="Ordner einer Extraktion.")
+    import_parser.add_argument("store", help="Die Store-Datei (.sqlite).")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            source, target = WorkspaceStore(args.store), DirectoryWorkspace(args.ordner)
+        else:
+            source, target = DirectoryWorkspace(args.ordner), WorkspaceStore(args.store)
+        if not source.exists():
+            raise FileNotFoundError(f"Nicht gefunden: {source}")
+        with source, target:
+            copy_workspace(source, target)
+    except Exception as e:
+        print(f"Ein Fehler ist aufgetreten: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()